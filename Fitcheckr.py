@@ -7,11 +7,19 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sentence_transformers import SentenceTransformer, util
 import math
 import numpy as np
-import en_core_web_sm
+import os
+import hashlib
+import copy
+from ats_core import ATSScorer, rethreshold, threshold_curve
+from ats_store import ATSStore, DEFAULT_DB_PATH, content_hash
+from jd_profile import compile_jd_profile
+from keyword_demand import DEFAULT_DEMAND_PATH, KeywordDemandIndex
+from memory_governor import MemoryGovernor
+from session_artifacts import DEFAULT_MAX_BYTES, DEFAULT_SESSION_QUOTA, DEFAULT_SESSION_TTL, SessionArtifacts
+from resume_store import RESUME_SECTIONS, ResumeStore
+from speculative import SpeculativeTasks
 
 # Page configuration
 st.set_page_config(
@@ -174,6 +182,89 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+SCORING_MODE_LABELS = {
+    "semantic": "Semantic (MiniLM)",
+    "ngram": "Fast (character n-grams)"
+}
+
+# Keyed editor widgets keep their own state across reruns, so undo/redo clears
+# it and the editors re-read the restored version
+EDITOR_WIDGET_PREFIXES = (
+    "company_", "role_", "team_", "loc_", "time_", "detail_title_", "detail_desc_",
+    "school_", "school_loc_", "degree_", "edu_time_", "proj_title_", "proj_desc_"
+)
+
+
+def apply_edits(item: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
+    """``item`` with the editor widget ``values`` that differ from it.
+
+    Fields the editors do not show are kept, and a field the item lacks is
+    only added once its widget is filled in, so rendering an editor over
+    uploaded data leaves that data unchanged.
+    """
+    changed = {key: value for key, value in values.items()
+               if (item[key] != value if key in item else bool(value))}
+    return {**item, **changed}
+
+
+@st.cache_resource
+def get_scorer() -> ATSScorer:
+    """Load the spaCy pipeline and embedder once per process instead of on every rerun"""
+    return ATSScorer(keyword_source=os.environ.get("FITCHECKR_KEYWORDS", "spacy"))
+
+
+@st.cache_resource
+def get_session_artifacts() -> SessionArtifacts:
+    """Per-session analysis results, held process-wide so they can be spilled, trimmed and expired"""
+    budget_mb = os.environ.get("FITCHECKR_ARTIFACT_BUDGET_MB")
+    quota_mb = os.environ.get("FITCHECKR_SESSION_QUOTA_MB")
+    return SessionArtifacts(
+        max_bytes=int(float(budget_mb) * 2**20) if budget_mb else DEFAULT_MAX_BYTES,
+        session_quota=int(float(quota_mb) * 2**20) if quota_mb else DEFAULT_SESSION_QUOTA,
+        session_ttl=float(os.environ.get("FITCHECKR_SESSION_TTL_SECONDS", DEFAULT_SESSION_TTL)),
+        spill_dir=os.environ.get("FITCHECKR_ARTIFACT_DIR") or None
+    )
+
+
+@st.cache_resource
+def get_governor() -> MemoryGovernor:
+    """Unload idle models and evict caches; configured through environment variables"""
+    budget_mb = os.environ.get("FITCHECKR_MEMORY_BUDGET_MB")
+    governor = MemoryGovernor(
+        budget_bytes=int(float(budget_mb) * 2**20) if budget_mb else None,
+        idle_seconds=float(os.environ.get("FITCHECKR_MODEL_IDLE_SECONDS", 900))
+    )
+    for component in get_scorer().memory_components():
+        governor.register(component)
+    governor.register(get_session_artifacts().memory_component())
+    governor.start()
+    return governor
+
+
+@st.cache_resource
+def get_demand() -> KeywordDemandIndex:
+    """Process-wide keyword demand index, fed by every analysed job description"""
+    return KeywordDemandIndex(os.environ.get("FITCHECKR_DEMAND_DB", DEFAULT_DEMAND_PATH))
+
+
+@st.cache_resource
+def get_speculative() -> SpeculativeTasks:
+    """Background pre-analysis of the resume and pasted JD, shared by all sessions"""
+    return SpeculativeTasks(activity=get_scorer().activity)
+
+
+def current_session_id() -> str:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+
+@st.cache_resource
+def get_store() -> ATSStore:
+    """Process-wide SQLite store shared by all sessions"""
+    return ATSStore(os.environ.get("FITCHECKR_DB", DEFAULT_DB_PATH))
+
+
 class ResumeEditor:
     def __init__(self):
         self.sections = [
@@ -189,20 +280,53 @@ class ResumeEditor:
             "Projects": "proj.json"
         }
 
-        self.nlp = en_core_web_sm.load()
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.scorer = get_scorer()
+        self.store = get_store()
+        self.artifacts = get_session_artifacts()
+        self.governor = get_governor()
+        self.speculative = get_speculative()
+        self.demand = get_demand()
+        
+        # All resume sections live in one versioned store per session
+        if 'resume_store' not in st.session_state:
+            st.session_state['resume_store'] = ResumeStore()
+        self.resume = st.session_state['resume_store']
+    
+    @staticmethod
+    def section_key(section: str) -> str:
+        return section.lower().replace(' ', '_')
     
     def load_json_from_session(self, section: str) -> List[Dict]:
-        key = f"{section.lower().replace(' ', '_')}_data"
-        return st.session_state.get(key, [])
+        return self.resume.get(self.section_key(section))
 
     def save_json_to_session(self, section: str, data: List[Dict]):
-        key = f"{section.lower().replace(' ', '_')}_data"
-        st.session_state[key] = data
+        self.resume.set(self.section_key(section), data)
+
+    @staticmethod
+    def pending_upload(uploader_key: str, uploaded_file) -> bool:
+        """Whether the uploader holds a file not yet applied from it.
+
+        Removing the file from the uploader forgets it, so uploading the same
+        file again applies it again (e.g. to reset later edits).
+        """
+        if uploaded_file is None:
+            st.session_state.pop(f"applied_{uploader_key}", None)
+            return False
+        digest = hashlib.sha1(uploaded_file.getvalue()).hexdigest()
+        if st.session_state.get(f"applied_{uploader_key}") == digest:
+            st.caption("This file is already loaded. Remove it and upload it again to load it afresh.")
+            return False
+        return True
+
+    @staticmethod
+    def mark_upload_applied(uploader_key: str, uploaded_file):
+        st.session_state[f"applied_{uploader_key}"] = hashlib.sha1(uploaded_file.getvalue()).hexdigest()
+
+    def get_combined_data(self) -> Dict[str, Any]:
+        return self.resume.combined()
 
     def export_json(self, section: str):
-        data = self.load_json_from_session(section)
-        json_str = json.dumps(data, indent=2, ensure_ascii=False)
+        json_str = self.resume.export_json(self.section_key(section))
         st.download_button(
             label=f"Export {section} as JSON",
             data=json_str,
@@ -231,16 +355,19 @@ class ResumeEditor:
                 help="JSON file should have keys: personal, experience, education, projects"
             )
             
-            if combined_file:
+            # The uploader keeps the file across reruns; apply each upload once so a
+            # later Undo is not overwritten by the same file
+            if self.pending_upload("upload_combined", combined_file):
                 try:
                     combined_data = json.load(combined_file)
                     if not isinstance(combined_data, dict):
                         st.error("Combined JSON must be an object with section keys.")
                     else:
-                        # Extract and save each section
+                        # Collect every section and save them as one version (one undo step)
+                        updates = {}
                         sections_uploaded = []
                         for section in self.sections:
-                            section_key = section.lower().replace(' ', '_')
+                            section_key = self.section_key(section)
                             # Special handling for Personal Information: support both 'personal' and 'personal_information'
                             if section == "Personal Information":
                                 personal_data = None
@@ -249,14 +376,16 @@ class ResumeEditor:
                                 elif "personal" in combined_data:
                                     personal_data = combined_data["personal"]
                                 if personal_data is not None:
-                                    self.save_json_to_session(section, personal_data)
+                                    updates[section_key] = personal_data
                                     sections_uploaded.append(section)
                             else:
                                 if section_key in combined_data:
-                                    self.save_json_to_session(section, combined_data[section_key])
+                                    updates[section_key] = combined_data[section_key]
                                     sections_uploaded.append(section)
                         
                         if sections_uploaded:
+                            self.resume.update(updates)
+                            self.mark_upload_applied("upload_combined", combined_file)
                             st.success(f"✅ Successfully uploaded sections: {', '.join(sections_uploaded)}")
                         else:
                             st.warning("No valid sections found in the combined JSON file.")
@@ -277,13 +406,14 @@ class ResumeEditor:
                     help=f"Upload JSON file for {section} section"
                 )
                 
-                if uploaded_file:
+                if self.pending_upload(f"upload_{section}", uploaded_file):
                     try:
                         data = json.load(uploaded_file)
                         if not isinstance(data, list):
                             st.error(f"{section} JSON must be a list of objects.")
                         else:
                             self.save_json_to_session(section, data)
+                            self.mark_upload_applied(f"upload_{section}", uploaded_file)
                             st.success(f"✅ {section} data uploaded successfully!")
                     except Exception as e:
                         st.error(f"Error reading {section} JSON: {str(e)}")
@@ -308,101 +438,17 @@ class ResumeEditor:
         st.info("Uploaded data will be available for manual editing and ATS analysis.")
 
     def extract_keywords(self, text):
-        doc = self.nlp(text.lower())
-        keywords = set()
-
-        for chunk in doc.noun_chunks:
-            tok = chunk.root
-            if tok.pos_ in {"NOUN", "PROPN"} and len(chunk.text.strip()) > 2:
-                keywords.add(chunk.text.strip().lower())
-
-        for ent in doc.ents:
-            if ent.label_ in {"ORG", "PRODUCT", "GPE", "PERSON"}:
-                keywords.add(ent.text.strip().lower())
-
-        return list(keywords)
+        return self.scorer.extract_keywords(text)
 
     def get_tfidf_keywords(self, jd_text, top_n=30):
-        vec = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), max_features=300)
-        tfidf_matrix = vec.fit_transform([jd_text])
-        feature_names = vec.get_feature_names_out()
-        scores = tfidf_matrix.toarray().flatten()
-        top_indices = scores.argsort()[::-1][:top_n]
-        return [(feature_names[i], scores[i]) for i in top_indices]
-
-    def calculate_ats_score(self, resume_text, jd_text, threshold=0.75):
-        jd_keywords_weighted = self.get_tfidf_keywords(jd_text)
-        resume_keywords = self.extract_keywords(resume_text)
-        resume_emb = self.embedder.encode(resume_keywords, convert_to_tensor=True)
-
-        matched = []
-        missing = []
-
-        for keyword, weight in jd_keywords_weighted:
-            kw_emb = self.embedder.encode(keyword, convert_to_tensor=True)
-            cos_scores = util.cos_sim(kw_emb, resume_emb)
-            max_score = cos_scores.max().item()  # ✅
-
-
-            if max_score >= threshold:
-                matched.append({"keyword": keyword, "score": round(max_score, 2), "weight": round(weight, 2)})
-            else:
-                missing.append({"keyword": keyword, "score": round(max_score, 2), "weight": round(weight, 2)})
-
-        total_weight = sum(weight for _, weight in jd_keywords_weighted)
-        matched_weight = sum(m['weight'] for m in matched)
+        return self.scorer.get_tfidf_keywords(jd_text, top_n=top_n)
 
-        score = (matched_weight / total_weight * 100) if total_weight else 0
-
-        return {
-            "score": round(score, 1),
-            "matched_keywords": matched,
-            "missing_keywords": missing,
-            "match_percentage": round(score, 1),
-            "total_keywords": len(jd_keywords_weighted),
-            "matched_count": len(matched)
-        }
+    def calculate_ats_score(self, resume_text, jd_text, threshold=None, mode="semantic"):
+        return self.scorer.calculate_ats_score(resume_text, jd_text, threshold=threshold, mode=mode)
     
     def get_resume_text(self) -> str:
-        """Extract all text from resume data"""
-        text_parts = []
-        
-        # Personal info
-        personal_data = self.load_json_from_session("Personal Information")
-        if personal_data:
-            personal = personal_data[0]
-            text_parts.append(f"{personal.get('name', '')} {personal.get('email', '')}")
-            
-            # Languages
-            languages = [lang.get('language', '') for lang in personal.get('languages', [])]
-            text_parts.append(' '.join(languages))
-            
-            # Technologies
-            technologies = [tech.get('technology', '') for tech in personal.get('technologies', [])]
-            text_parts.append(' '.join(technologies))
-            
-            # Certifications
-            certifications = [cert.get('certification', '') for cert in personal.get('certifications', [])]
-            text_parts.append(' '.join(certifications))
-        
-        # Experience
-        exp_data = self.load_json_from_session("Experience")
-        for exp in exp_data:
-            text_parts.append(f"{exp.get('role', '')} {exp.get('company', '')}")
-            for detail in exp.get('details', []):
-                text_parts.append(f"{detail.get('title', '')} {detail.get('description', '')}")
-        
-        # Education
-        edu_data = self.load_json_from_session("Education")
-        for edu in edu_data:
-            text_parts.append(f"{edu.get('degree', '')} {edu.get('school', '')}")
-        
-        # Projects
-        proj_data = self.load_json_from_session("Projects")
-        for proj in proj_data:
-            text_parts.append(f"{proj.get('title', '')} {proj.get('description', '')}")
-        
-        return ' '.join(text_parts)
+        """Extract all text from resume data (memoized per resume version)"""
+        return self.resume.text()
     
     def run(self):
         """Main application"""
@@ -412,31 +458,104 @@ class ResumeEditor:
         st.sidebar.title("Navigation")
         page = st.sidebar.selectbox(
             "Choose a section:",
-            ["Upload Data"] + ["ATS Score Analyzer"] + self.sections
+            ["Upload Data"] + ["ATS Score Analyzer", "Multi-JD Comparison", "Saved Analyses"] + self.sections
         )
         
+        self.history_panel()
+        self.memory_panel()
+        
         if page == "Upload Data":
             self.upload_page()
         elif page == "ATS Score Analyzer":
             self.ats_analyzer_page()
+        elif page == "Multi-JD Comparison":
+            self.multi_jd_page()
+        elif page == "Saved Analyses":
+            self.saved_analyses_page()
         else:
             self.form_editor_page(page)
     
+    def history_panel(self):
+        """Sidebar undo/redo for resume edits and a diff against earlier versions"""
+        undo_col, redo_col = st.sidebar.columns(2)
+        with undo_col:
+            undo = st.button("↶ Undo", key="undo_edit", disabled=not self.resume.can_undo,
+                             use_container_width=True)
+        with redo_col:
+            redo = st.button("↷ Redo", key="redo_edit", disabled=not self.resume.can_redo,
+                             use_container_width=True)
+        if undo or redo:
+            if undo:
+                self.resume.undo()
+            else:
+                self.resume.redo()
+            for key in list(st.session_state.keys()):
+                if key.startswith(EDITOR_WIDGET_PREFIXES):
+                    del st.session_state[key]
+            st.rerun()
+        
+        history = self.resume.history()
+        if len(history) < 2:
+            return
+        with st.sidebar.expander("🕘 Edit History"):
+            earlier = [entry['version'] for entry in history if entry['version'] != self.resume.version]
+            labels = {
+                entry['version']: f"v{entry['version']}: "
+                                  + (", ".join(s.replace('_', ' ') for s in entry['sections']) or "empty resume")
+                for entry in history
+            }
+            st.write(f"**Current:** {labels[self.resume.version]}")
+            compare_to = st.selectbox("Compare with", earlier[::-1], format_func=labels.get, key="history_compare")
+            changes = self.resume.diff(compare_to)
+            if not changes:
+                st.write("No differences")
+            for change in changes:
+                item = change['after'] if change['after'] is not None else change['before']
+                name = next((item.get(field) for field in ('role', 'school', 'title', 'name') if item.get(field)), "")
+                line = f"{change['section'].replace('_', ' ').title()} #{change['index'] + 1} {change['change']}"
+                if change['change'] == 'changed':
+                    fields = sorted(key for key in set(change['before']) | set(change['after'])
+                                    if change['before'].get(key) != change['after'].get(key))
+                    line += f" ({', '.join(fields)})"
+                st.write(f"- {line}" + (f": {name}" if name else ""))
+    
+    def memory_panel(self):
+        """Sidebar view of process memory and what the governor is tracking"""
+        with st.sidebar.expander("🧠 Memory"):
+            report = self.governor.report()
+            budget = report['budget_bytes']
+            st.write(f"**Process RSS:** {report['rss_bytes'] / 2**20:.0f} MB"
+                     + (f" / {budget / 2**20:.0f} MB budget" if budget else ""))
+            for component in report['components']:
+                st.write(f"{component['component']}: {component['bytes'] / 2**20:.1f} MB "
+                         f"(idle {component['idle_seconds']:.0f}s)")
+
+            # Artifacts held per session, in memory and spilled to disk
+            sessions = self.artifacts.session_report()
+            st.write(f"**Session artifacts:** {len(sessions)} sessions, "
+                     f"{self.artifacts.nbytes() / 2**20:.1f} MB in memory, "
+                     f"{self.artifacts.disk_bytes() / 2**20:.1f} MB on disk")
+            # Other sessions' ids and activity are for operators only
+            if sessions and os.environ.get("FITCHECKR_ADMIN") == "1":
+                session_id = current_session_id()
+                st.dataframe(pd.DataFrame({
+                    'Session': [row['session_id'][:8] + (" (you)" if row['session_id'] == session_id else "")
+                                for row in sessions],
+                    'Entries': [row['entries'] for row in sessions],
+                    'Memory MB': [round(row['memory_bytes'] / 2**20, 2) for row in sessions],
+                    'Disk MB': [round(row['disk_bytes'] / 2**20, 2) for row in sessions],
+                    'Idle s': [round(row['idle_seconds']) for row in sessions],
+                }), hide_index=True, use_container_width=True)
+    
     def ats_analyzer_page(self):
         """ATS Score Analyzer page"""
         st.markdown('<h2 class="section-header">🎯 ATS Score Analyzer</h2>', unsafe_allow_html=True)
         
         # Export full JSON data button
         if st.button("Export Full Resume JSON"):
-            combined_data = {
-                "personal_information": self.load_json_from_session("Personal Information"),
-                "experience": self.load_json_from_session("Experience"),
-                "education": self.load_json_from_session("Education"),
-                "projects": self.load_json_from_session("Projects")
-            }
             st.download_button(
                 label="Download Combined Resume JSON",
-                data=json.dumps(combined_data, indent=2, ensure_ascii=False),
+                data=self.resume.export_json(),
                 file_name="combined_resume.json",
                 mime="application/json"
             )
@@ -451,10 +570,21 @@ class ResumeEditor:
                 placeholder="Enter the job description to analyze against your resume..."
             )
             
+            scoring_mode = st.radio(
+                "Scoring mode:",
+                list(SCORING_MODE_LABELS),
+                format_func=SCORING_MODE_LABELS.get,
+                horizontal=True,
+                help="Fast mode compares character n-grams instead of loading the embedding model"
+            )
+            self.prepare_analysis(job_description, scoring_mode)
+            
             if st.button("Analyze ATS Score", type="primary"):
                 if job_description.strip():
                     st.session_state['analyze_ats'] = True
                     st.session_state['job_description'] = job_description
+                    st.session_state['scoring_mode'] = scoring_mode
+                    st.session_state['persist_analysis'] = True
                     st.rerun()
                 else:
                     st.warning("Please enter a job description to analyze.")
@@ -475,10 +605,93 @@ class ResumeEditor:
                 self.perform_ats_analysis(st.session_state['job_description'])
                 # Do NOT reset analyze_ats here; only reset when a new analysis is triggered
 
+    def prepare_analysis(self, job_description: str, scoring_mode: str):
+        """Start the resume- and JD-side work in the background before "Analyze" is clicked.
+
+        The text area only reports a new value once editing settles, so each
+        submission is a settled input; a changed resume or JD supersedes the
+        pending task for its slot and stale results are never used.
+        """
+        session_id = current_session_id()
+        self.speculative.submit(session_id, "resume", (self.resume.content_hash(), scoring_mode),
+                                self.scorer.prepare_resume, self.get_resume_text(), scoring_mode)
+        if job_description.strip():
+            jd_key = (hashlib.sha1(job_description.encode("utf-8")).hexdigest(), scoring_mode)
+            self.speculative.submit(session_id, "jd_profile", jd_key, compile_jd_profile, self.scorer,
+                                    job_description, None, scoring_mode == "semantic")
+
+    def record_demand(self, jd_text: str, result: Dict[str, Any]):
+        """Count a freshly analysed JD's keywords in the demand index"""
+        try:
+            self.demand.record(content_hash(jd_text), zip(result["keywords"], result["weights"]))
+        except Exception as e:
+            st.warning(f"Could not update keyword demand: {str(e)}")
+
+    def keyword_demand_table(self, keywords: List[str]):
+        """Share of recently analysed JDs asking for each keyword, with its monthly trend"""
+        total = self.demand.total_postings(days=30)
+        if not total:
+            st.info("No job descriptions analysed in the last 30 days yet.")
+            return
+        demand = self.demand.demand(keywords, days=30)
+        trend = self.demand.trend(keywords, months=6)
+        table = pd.DataFrame({
+            'Keyword': keywords,
+            'JDs (30 days)': [demand[kw]['share'] * 100 for kw in keywords],
+            'Previous 30 days': [demand[kw]['previous_share'] * 100 for kw in keywords],
+            'Trend (6 months)': [[point['share'] * 100 for point in trend[kw]] for kw in keywords],
+        }).sort_values('JDs (30 days)', ascending=False)
+        st.dataframe(
+            table,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'JDs (30 days)': st.column_config.NumberColumn(format="%.1f%%"),
+                'Previous 30 days': st.column_config.NumberColumn(format="%.1f%%"),
+                'Trend (6 months)': st.column_config.LineChartColumn(y_min=0),
+            }
+        )
+        st.caption(f"Share of the {total} job description{'s' if total != 1 else ''} analysed in the last 30 days "
+                   "that ask for each keyword.")
+
     def perform_ats_analysis(self, job_description: str):
         """Perform ATS analysis and display results"""
         resume_text = self.get_resume_text()
-        ats_results = self.calculate_ats_score(resume_text, job_description)
+        scoring_mode = st.session_state.get('scoring_mode', 'semantic')
+        
+        # Reruns (e.g. "Show more") reuse the cached result instead of re-embedding
+        analysis_key = ("ats_result", scoring_mode, self.resume.content_hash(),
+                        hashlib.sha1(job_description.encode("utf-8")).hexdigest())
+        ats_results = self.artifacts.get(current_session_id(), analysis_key)
+        if ats_results is None:
+            # Use the background JD profile only if it is already finished for these inputs;
+            # anything still queued is cancelled and computed inline instead. The resume
+            # task only warms caches, so there is nothing to wait for.
+            session_id = current_session_id()
+            self.speculative.cancel(session_id, "resume")
+            profile = self.speculative.result(session_id, "jd_profile", (analysis_key[3], scoring_mode))
+            # Show a rising estimate in place while the remaining keywords are embedded
+            progress = st.empty()
+            for ats_results in self.scorer.iter_ats_score(resume_text, job_description, mode=scoring_mode,
+                                                          profile=profile):
+                if not ats_results.get("complete", True):
+                    progress.info(
+                        f"Estimated ATS score: at least {ats_results['score']}/100 "
+                        f"({ats_results['matched_count']} keywords matched so far, "
+                        f"{len(ats_results['pending_keywords'])} still being compared)..."
+                    )
+            progress.empty()
+            self.artifacts.put(current_session_id(), analysis_key, ats_results)
+            self.record_demand(job_description, ats_results)
+        
+        # Persist only freshly requested analyses, not every rerun of the results view
+        if st.session_state.pop('persist_analysis', False):
+            try:
+                self.store.record_analysis(self.get_combined_data(), resume_text, job_description,
+                                           ats_results, threshold=ats_results['threshold'],
+                                           resume_digest=self.resume.content_hash())
+            except Exception as e:
+                st.warning(f"Could not save analysis: {str(e)}")
         
         # Custom CSS for full width
         st.markdown("""
@@ -497,6 +710,20 @@ class ResumeEditor:
         st.markdown("---")
         st.markdown('<h3 class="section-header">📊 ATS Analysis Results</h3>', unsafe_allow_html=True)
         
+        # Re-threshold the cached similarities; moving the slider never calls the model
+        threshold = st.slider(
+            "Match threshold",
+            min_value=0.0,
+            max_value=1.0,
+            value=float(ats_results['threshold']),
+            step=0.01,
+            key=f"threshold_{scoring_mode}",
+            help="Minimum similarity for a job description keyword to count as matched"
+        )
+        base_results = ats_results
+        if threshold != ats_results['threshold']:
+            ats_results = rethreshold(ats_results, threshold)
+        
         # Score display
         col1, col2, col3 = st.columns(3)
         
@@ -517,6 +744,11 @@ class ResumeEditor:
         with col3:
             st.metric("Match Percentage", f"{ats_results['match_percentage']}%")
         
+        st.caption(
+            f"{ats_results.get('prefiltered_count', 0)} of {ats_results['total_keywords']} keywords matched exactly "
+            f"without the embedding model ({self.scorer.prefilter_rate():.0%} of model lookups avoided since startup)"
+        )
+        
         # Matched and Missing Keywords as horizontal chips with show more
         st.markdown("<style>\n.chip-row { display: flex; flex-wrap: wrap; gap: 8px; margin-bottom: 8px; }\n.chip { padding: 6px 14px; border-radius: 16px; font-size: 1rem; font-weight: 500; background: #e0f7fa; color: #006064; border: none; }\n.chip-missing { background: #ffebee; color: #b71c1c; }\n@media (prefers-color-scheme: dark) { .chip { background: #263238; color: #80deea; } .chip-missing { background: #311111; color: #ff8a80; } }\n</style>", unsafe_allow_html=True)
         
@@ -571,6 +803,16 @@ class ResumeEditor:
         else:
             st.success("All keywords found!")
         
+        with st.expander("📉 Score sensitivity to the match threshold"):
+            thresholds = np.round(np.arange(0.0, 1.001, 0.01), 2)
+            curve = pd.DataFrame({
+                'Threshold': thresholds,
+                'ATS Score': threshold_curve(base_results, thresholds)
+            })
+            fig = px.line(curve, x='Threshold', y='ATS Score', title="ATS Score vs. Match Threshold")
+            fig.add_vline(x=threshold, line_dash="dash")
+            st.plotly_chart(fig, use_container_width=True)
+        
         # Recommendations
         st.subheader("💡 Recommendations")
         if ats_results['score'] < 60:
@@ -584,28 +826,55 @@ class ResumeEditor:
             st.write("Consider adding a few more relevant keywords to improve your score.")
         else:
             st.success("Excellent! Your resume is well-aligned with the job description.")
-        
+
+        if missing_keywords:
+            with st.expander("📍 Where to add missing keywords"):
+                items = self.resume.items()
+                if not items:
+                    st.info("Add experience details or projects to get placement suggestions.")
+                else:
+                    # Item embeddings are cached by content, so only edited bullets are re-encoded
+                    placements = self.scorer.suggest_placements(missing_keywords[:10], items, mode=scoring_mode)
+                    for keyword, targets in placements.items():
+                        where = "; ".join(
+                            f"{'Experience' if t['section'] == 'experience' else 'Project'}: {t['label']} ({t['score']:.2f})"
+                            for t in targets
+                        )
+                        st.markdown(f"**{keyword}** → {where}")
+
+            with st.expander("📈 Market demand for missing keywords"):
+                self.keyword_demand_table(missing_keywords[:10])
+
         # Keyword frequency analysis
         st.subheader("📈 Keyword Frequency Analysis")
-        resume_keywords = self.extract_keywords(resume_text)
-        job_keywords = self.extract_keywords(job_description)
+        jd_keywords = sorted(
+            ats_results['matched_keywords'] + ats_results['missing_keywords'],
+            key=lambda x: x['weight'],
+            reverse=True
+        )
+        jd_keywords = [kw['keyword'] for kw in jd_keywords]
         
-        if resume_keywords and job_keywords:
-            # Create frequency data
-            resume_freq = Counter(resume_keywords)
-            job_freq = Counter(job_keywords)
+        if jd_keywords:
+            # Real occurrence counts from one phrase-matcher pass over each text,
+            # reusing the resume doc parsed during scoring
+            job_freq, resume_freq = self.scorer.count_keyword_occurrences(
+                jd_keywords, [job_description, resume_text]
+            )
             
-            # Get top keywords from job description
-            top_job_keywords = dict(job_freq.most_common(10))
+            # Most frequent JD keywords (ties broken by TF-IDF weight)
+            top_job_keywords = sorted(
+                (kw for kw in jd_keywords if job_freq[kw]),
+                key=lambda kw: job_freq[kw],
+                reverse=True
+            )[:10]
             
             # Create comparison data
             comparison_data = []
-            for keyword, job_count in top_job_keywords.items():
-                resume_count = resume_freq.get(keyword, 0)
+            for keyword in top_job_keywords:
                 comparison_data.append({
                     'Keyword': keyword,
-                    'Job Description': job_count,
-                    'Resume': resume_count
+                    'Job Description': job_freq[keyword],
+                    'Resume': resume_freq[keyword]
                 })
             
             if comparison_data:
@@ -616,6 +885,139 @@ class ResumeEditor:
                 st.plotly_chart(fig, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
+    def multi_jd_page(self):
+        """Score the resume against several job descriptions at once"""
+        st.markdown('<h2 class="section-header">🧮 Multi-JD Comparison</h2>', unsafe_allow_html=True)
+        
+        jd_input = st.text_area(
+            "Paste job descriptions, separated by a line containing only ---",
+            height=300,
+            placeholder="First job description...\n---\nSecond job description..."
+        )
+        scoring_mode = st.radio(
+            "Scoring mode:",
+            list(SCORING_MODE_LABELS),
+            format_func=SCORING_MODE_LABELS.get,
+            horizontal=True,
+            key="multi_jd_scoring_mode"
+        )
+        
+        jd_texts = [jd.strip() for jd in re.split(r"^\s*---+\s*$", jd_input, flags=re.MULTILINE) if jd.strip()]
+        if not st.button("Compare Job Descriptions", type="primary") and not st.session_state.get('compare_jds'):
+            return
+        if not jd_texts:
+            st.warning("Please enter at least one job description.")
+            return
+        st.session_state['compare_jds'] = True
+        
+        resume_text = self.get_resume_text()
+        comparison_key = ("jd_comparison", scoring_mode, self.resume.content_hash(),
+                          hashlib.sha1("\0".join(jd_texts).encode("utf-8")).hexdigest())
+        results = self.artifacts.get(current_session_id(), comparison_key)
+        if results is None:
+            with st.spinner(f"Scoring {len(jd_texts)} job descriptions..."):
+                results = self.scorer.compare_jds(resume_text, jd_texts, mode=scoring_mode)
+            self.artifacts.put(current_session_id(), comparison_key, results)
+            for jd_text, result in zip(jd_texts, results):
+                self.record_demand(jd_text, result)
+        
+        labels = []
+        for i, jd in enumerate(jd_texts, 1):
+            first_line = jd.splitlines()[0].strip()
+            labels.append(f"JD {i}: {first_line[:40]}{'…' if len(first_line) > 40 else ''}")
+        
+        st.subheader("Ranking")
+        ranking = pd.DataFrame({
+            'Job Description': labels,
+            'Score': [r['score'] for r in results],
+            'Matched': [r['matched_count'] for r in results],
+            'Keywords': [r['total_keywords'] for r in results],
+            'Top Missing': [', '.join(m['keyword'] for m in r['missing_keywords'][:5]) for r in results]
+        }).sort_values('Score', ascending=False)
+        st.dataframe(ranking, use_container_width=True, hide_index=True)
+        
+        # Keywords asked for by the most JDs first, then by total TF-IDF weight
+        demand = Counter()
+        weight = Counter()
+        for r in results:
+            for keyword, w in zip(r['keywords'], r['weights']):
+                demand[keyword] += 1
+                weight[keyword] += w
+        top_n = len(demand)
+        if top_n > 5:
+            top_n = st.slider("Keywords shown", min_value=5, max_value=top_n, value=min(30, top_n))
+        top_keywords = sorted(demand, key=lambda kw: (-demand[kw], -weight[kw]))[:top_n]
+        
+        # Cell = the keyword's similarity for that JD; blank where the JD does not ask for it
+        coverage = np.full((len(top_keywords), len(results)), np.nan)
+        row_of = {kw: row for row, kw in enumerate(top_keywords)}
+        for col, r in enumerate(results):
+            for keyword, similarity in zip(r['keywords'], r['similarities']):
+                if keyword in row_of:
+                    coverage[row_of[keyword], col] = similarity
+        
+        st.subheader("Keyword Coverage")
+        fig = px.imshow(
+            coverage,
+            x=[f"JD {i}" for i in range(1, len(results) + 1)],
+            y=top_keywords,
+            color_continuous_scale="RdYlGn",
+            zmin=0,
+            zmax=1,
+            aspect="auto",
+            labels=dict(x="Job Description", y="Keyword", color="Similarity")
+        )
+        fig.update_layout(height=max(400, 22 * len(top_keywords)))
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"Threshold {results[0]['threshold']:.2f}: cells at or above it count as matched; "
+                   "blank cells are keywords that job description does not mention.")
+    
+    def saved_analyses_page(self):
+        """Search previously saved ATS analyses"""
+        st.markdown('<h2 class="section-header">🗄️ Saved Analyses</h2>', unsafe_allow_html=True)
+        
+        counts = self.store.counts()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Resumes", counts['resumes'])
+        col2.metric("Job Descriptions", counts['job_descriptions'])
+        col3.metric("Analyses", counts['ats_results'])
+        
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            query = st.text_input("Job descriptions mentioning:", placeholder="e.g. kafka")
+        with col2:
+            max_score = st.slider("Score below", min_value=0, max_value=100, value=100)
+        
+        rows = self.store.search_results(query, max_score=max_score if max_score < 100 else None)
+        if not rows:
+            st.info("No saved analyses match your search.")
+            return
+        
+        df = pd.DataFrame(rows)
+        df['created_at'] = pd.to_datetime(df['created_at'], unit='s')
+        st.dataframe(
+            df[['result_id', 'title', 'score', 'matched_count', 'total_keywords', 'created_at']],
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        result_id = st.selectbox("Inspect analysis", [row['result_id'] for row in rows])
+        selected = next(row for row in rows if row['result_id'] == result_id)
+        keywords = self.store.result_keywords(result_id)
+        matched = [kw['keyword'] for kw in keywords if kw['matched']]
+        missing = [kw['keyword'] for kw in keywords if not kw['matched']]
+        st.write(f"**Matched:** {', '.join(matched) or 'None'}")
+        st.write(f"**Missing:** {', '.join(missing) or 'None'}")
+        
+        with st.expander("Job description"):
+            st.write(self.store.get_jd_text(selected['jd_id']))
+        
+        if st.button("Load this resume into the editor"):
+            resume_data = self.store.get_resume(selected['resume_id']) or {}
+            # All sections as one version, so a single Undo restores the previous resume
+            self.resume.update({key: resume_data.get(key, []) for key in RESUME_SECTIONS})
+            st.success("✅ Resume loaded from saved analysis")
+    
     def form_editor_page(self, section_name: str):
         """Form-based editor page for each section"""
         st.markdown(f'<h2 class="section-header">✏️ {section_name} Editor</h2>', unsafe_allow_html=True)
@@ -649,7 +1051,7 @@ class ResumeEditor:
         if not data or len(data) == 0:
             personal = {}
         else:
-            personal = data[0] if isinstance(data[0], dict) else {}
+            personal = copy.deepcopy(data[0]) if isinstance(data[0], dict) else {}
         
         st.subheader("Basic Information")
         
@@ -663,20 +1065,32 @@ class ResumeEditor:
             website = st.text_input("Website", value=personal.get('website', ''))
             linkedin = st.text_input("LinkedIn", value=personal.get('linkedin', ''))
         
-        # Initialize session state for dynamic lists
-        if 'languages' not in st.session_state:
-            st.session_state['languages'] = personal.get('languages', [])
-        if 'technologies' not in st.session_state:
-            st.session_state['technologies'] = personal.get('technologies', [])
-        if 'certifications' not in st.session_state:
-            st.session_state['certifications'] = personal.get('certifications', [])
+        # Dynamic lists are edited on the copy and written back to the resume store
+        languages = personal.get('languages', [])
+        if not isinstance(languages, list):
+            languages = []
+        technologies = personal.get('technologies', [])
+        if not isinstance(technologies, list):
+            technologies = []
+        certifications = personal.get('certifications', [])
+        if not isinstance(certifications, list):
+            certifications = []
+        
+        def save_personal():
+            self.save_json_to_session(filename, [apply_edits(personal, {
+                "name": name,
+                "email": email,
+                "phone": phone,
+                "website": website,
+                "linkedin": linkedin,
+                "languages": languages,
+                "technologies": technologies,
+                "certifications": certifications
+            })])
         
         # Languages
         st.subheader("Languages & Skills")
         
-        languages = st.session_state['languages']
-        if not isinstance(languages, list):
-            languages = []
         
         st.write("Languages:")
         
@@ -722,7 +1136,7 @@ class ResumeEditor:
         
         if remove_lang_idx is not None:
             languages.pop(remove_lang_idx)
-            st.session_state['languages'] = languages
+            save_personal()
             st.rerun()
         
         # Add new language input (Enter key to add)
@@ -733,14 +1147,11 @@ class ResumeEditor:
             # Check if this is a new entry (not just page reload)
             if 'last_language' not in st.session_state or st.session_state['last_language'] != new_language:
                 languages.append({"language": new_language.strip()})
-                st.session_state['languages'] = languages
+                save_personal()
                 st.session_state['last_language'] = new_language
                 st.rerun()
         
         # Technologies
-        technologies = st.session_state['technologies']
-        if not isinstance(technologies, list):
-            technologies = []
         
         st.write("Technologies:")
         
@@ -786,7 +1197,7 @@ class ResumeEditor:
         
         if remove_tech_idx is not None:
             technologies.pop(remove_tech_idx)
-            st.session_state['technologies'] = technologies
+            save_personal()
             st.rerun()
         
         # Add new technology input (Enter key to add)
@@ -797,16 +1208,13 @@ class ResumeEditor:
             # Check if this is a new entry (not just page reload)
             if 'last_technology' not in st.session_state or st.session_state['last_technology'] != new_technology:
                 technologies.append({"technology": new_technology.strip()})
-                st.session_state['technologies'] = technologies
+                save_personal()
                 st.session_state['last_technology'] = new_technology
                 st.rerun()
         
         # Certifications
         st.subheader("Certifications")
         
-        certifications = st.session_state['certifications']
-        if not isinstance(certifications, list):
-            certifications = []
         
         # Initialize remove_cert_idx to avoid UnboundLocalError
         remove_cert_idx = None
@@ -850,7 +1258,7 @@ class ResumeEditor:
         
         if remove_cert_idx is not None:
             certifications.pop(remove_cert_idx)
-            st.session_state['certifications'] = certifications
+            save_personal()
             st.rerun()
         
         # Add new certification input (Enter key to add)
@@ -861,10 +1269,16 @@ class ResumeEditor:
             # Check if this is a new entry (not just page reload)
             if 'last_certification' not in st.session_state or st.session_state['last_certification'] != new_certification:
                 certifications.append({"certification": new_certification.strip()})
-                st.session_state['certifications'] = certifications
+                save_personal()
                 st.session_state['last_certification'] = new_certification
                 st.rerun()
         
+        # Write back only what the widgets changed; a plain render is not an edit
+        if apply_edits(personal, {
+            "name": name, "email": email, "phone": phone, "website": website, "linkedin": linkedin
+        }) != personal:
+            save_personal()
+        
         # Save button
         # (Remove the following block for Personal Information)
         # if st.button("Save Personal Information", type="primary"):
@@ -892,13 +1306,8 @@ class ResumeEditor:
     
     def edit_experience(self, data: List[Dict], filename: str):
         """Edit experience with forms"""
-        # Initialize session state for experience
-        if 'experiences' not in st.session_state:
-            st.session_state['experiences'] = data if isinstance(data, list) else []
-        
-        experiences = st.session_state['experiences']
-        if not isinstance(experiences, list):
-            experiences = []
+        # Edit a copy; changes are written back to the resume store
+        experiences = copy.deepcopy(data) if isinstance(data, list) else []
         
         st.subheader("Work Experience")
         
@@ -926,14 +1335,13 @@ class ResumeEditor:
                         time_duration = st.text_input("Time Duration", value=exp.get('time_duration', ''), key=f"time_{i}")
                     
                     # Update experience data
-                    experiences[i] = {
+                    experiences[i] = apply_edits(exp, {
                         "company": company,
                         "company_location": company_location,
                         "role": role,
                         "team": team,
-                        "time_duration": time_duration,
-                        "details": exp.get('details', [])
-                    }
+                        "time_duration": time_duration
+                    })
                     
                     # Experience details
                     st.write("**Experience Details:**")
@@ -960,22 +1368,22 @@ class ResumeEditor:
                             with desc_col:
                                 description = st.text_area("Description", value=detail.get('description', ''), key=f"detail_desc_{i}_{j}")
                             # Update the detail in the list
-                            details[j] = {
+                            details[j] = apply_edits(detail, {
                                 "title": title,
                                 "description": description
-                            }
+                            })
                     
                     # Remove detail if requested
                     if remove_detail_idx is not None:
                         details.pop(remove_detail_idx)
                         experiences[i]["details"] = details
-                        st.session_state['experiences'] = experiences
+                        self.save_json_to_session(filename, experiences)
                         st.rerun()
                     
                     if st.button("Add Detail", key=f"add_detail_{i}"):
                         details.append({"title": "", "description": ""})
                         experiences[i]["details"] = details
-                        st.session_state['experiences'] = experiences
+                        self.save_json_to_session(filename, experiences)
                         st.rerun()
             
             with col2:
@@ -986,7 +1394,7 @@ class ResumeEditor:
         # Remove experience if requested
         if remove_exp_idx is not None:
             experiences.pop(remove_exp_idx)
-            st.session_state['experiences'] = experiences
+            self.save_json_to_session(filename, experiences)
             st.rerun()
         
         if st.button("Add New Experience"):
@@ -998,9 +1406,13 @@ class ResumeEditor:
                 "time_duration": "",
                 "details": []
             })
-            st.session_state['experiences'] = experiences
+            self.save_json_to_session(filename, experiences)
             st.rerun()
         
+        # Write back only what the widgets changed; a plain render is not an edit
+        if experiences != data:
+            self.save_json_to_session(filename, experiences)
+        
         # Save button
         # (Remove the following block for Experience)
         # if st.button("Save Experience", type="primary"):
@@ -1034,13 +1446,8 @@ class ResumeEditor:
     
     def edit_education(self, data: List[Dict], filename: str):
         """Edit education with forms"""
-        # Initialize session state for education
-        if 'education' not in st.session_state:
-            st.session_state['education'] = data if isinstance(data, list) else []
-        
-        education = st.session_state['education']
-        if not isinstance(education, list):
-            education = []
+        # Edit a copy; changes are written back to the resume store
+        education = copy.deepcopy(data) if isinstance(data, list) else []
         
         st.subheader("Education")
         
@@ -1067,12 +1474,12 @@ class ResumeEditor:
                         time_period = st.text_input("Time Period", value=edu.get('time_period', ''), key=f"edu_time_{i}")
                     
                     # Update education data
-                    education[i] = {
+                    education[i] = apply_edits(edu, {
                         "school": school,
                         "school_location": school_location,
                         "degree": degree,
                         "time_period": time_period
-                    }
+                    })
             
             with col2:
                 # Remove education button aligned with expander
@@ -1082,7 +1489,7 @@ class ResumeEditor:
         # Remove education if requested
         if remove_edu_idx is not None:
             education.pop(remove_edu_idx)
-            st.session_state['education'] = education
+            self.save_json_to_session(filename, education)
             st.rerun()
         
         if st.button("Add New Education"):
@@ -1092,9 +1499,13 @@ class ResumeEditor:
                 "degree": "",
                 "time_period": ""
             })
-            st.session_state['education'] = education
+            self.save_json_to_session(filename, education)
             st.rerun()
         
+        # Write back only what the widgets changed; a plain render is not an edit
+        if education != data:
+            self.save_json_to_session(filename, education)
+        
         # Save button
         # (Remove the following block for Education)
         # if st.button("Save Education", type="primary"):
@@ -1113,13 +1524,8 @@ class ResumeEditor:
     
     def edit_projects(self, data: List[Dict], filename: str):
         """Edit projects with forms"""
-        # Initialize session state for projects
-        if 'projects' not in st.session_state:
-            st.session_state['projects'] = data if isinstance(data, list) else []
-        
-        projects = st.session_state['projects']
-        if not isinstance(projects, list):
-            projects = []
+        # Edit a copy; changes are written back to the resume store
+        projects = copy.deepcopy(data) if isinstance(data, list) else []
         
         st.subheader("Projects")
         
@@ -1138,10 +1544,10 @@ class ResumeEditor:
                     description = st.text_area("Project Description", value=proj.get('description', ''), key=f"proj_desc_{i}")
                     
                     # Update project data
-                    projects[i] = {
+                    projects[i] = apply_edits(proj, {
                         "title": title,
                         "description": description
-                    }
+                    })
             
             with col2:
                 # Remove project button aligned with expander
@@ -1151,7 +1557,7 @@ class ResumeEditor:
         # Remove project if requested
         if remove_proj_idx is not None:
             projects.pop(remove_proj_idx)
-            st.session_state['projects'] = projects
+            self.save_json_to_session(filename, projects)
             st.rerun()
         
         if st.button("Add New Project"):
@@ -1159,9 +1565,13 @@ class ResumeEditor:
                 "title": "",
                 "description": ""
             })
-            st.session_state['projects'] = projects
+            self.save_json_to_session(filename, projects)
             st.rerun()
         
+        # Write back only what the widgets changed; a plain render is not an edit
+        if projects != data:
+            self.save_json_to_session(filename, projects)
+        
         # Save button
         # (Remove the following block for Projects)
         # if st.button("Save Projects", type="primary"):
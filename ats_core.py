@@ -0,0 +1,812 @@
+import hashlib
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from spacy.matcher import PhraseMatcher
+import en_core_web_sm
+
+from embedding_cache import LRUEmbeddingCache
+from memory_governor import Component, current_rss
+from model_bundle import DEFAULT_MODEL_BUNDLE, ModelBundle
+from skill_extractor import get_skill_extractor
+
+EMBEDDER_MODEL = 'all-MiniLM-L6-v2'
+
+# Scoring modes: "semantic" compares MiniLM embeddings, "ngram" compares character
+# n-gram TF-IDF vectors and never loads the SentenceTransformer.
+SCORING_MODES = ("semantic", "ngram")
+# Resume keyword sources: spaCy noun chunks/entities, the skill-dictionary automaton, or both
+KEYWORD_SOURCES = ("spacy", "skills", "both")
+DEFAULT_THRESHOLDS = {
+    "semantic": 0.75,
+    # Char n-gram cosine runs lower than MiniLM cosine for the same pair. Not yet
+    # calibrated on a corpus: run benchmarks/bench_scoring_modes.py and record the
+    # chosen value with the corpus and agreement it reports (also whenever keyword
+    # extraction changes).
+    "ngram": 0.6,
+}
+_NON_TERM_CHARS = re.compile(r"[^\w+#./ -]|(?<!\w)[./-]|[./-](?!\w)")
+
+# Long texts go through spaCy in chunks of at most this many characters, split on
+# section, then line, then sentence boundaries, so memory stays flat with length
+CHUNK_CHARS = 10_000
+CHUNK_BATCH_SIZE = 16
+
+# Anytime scoring (``iter_ats_score``) encodes the phrases a result still needs in
+# batches sized to take about this long, starting from a small probe batch
+ANYTIME_STEP_SECONDS = 0.25
+ANYTIME_FIRST_BATCH = 8
+_SECTION_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+
+
+def build_resume_text(personal_data: List[Dict], exp_data: List[Dict],
+                      edu_data: List[Dict], proj_data: List[Dict]) -> str:
+    """Flatten resume sections into a single text blob"""
+    text_parts = []
+
+    # Personal info
+    if personal_data:
+        personal = personal_data[0]
+        text_parts.append(f"{personal.get('name', '')} {personal.get('email', '')}")
+
+        # Languages
+        languages = [lang.get('language', '') for lang in personal.get('languages', [])]
+        text_parts.append(' '.join(languages))
+
+        # Technologies
+        technologies = [tech.get('technology', '') for tech in personal.get('technologies', [])]
+        text_parts.append(' '.join(technologies))
+
+        # Certifications
+        certifications = [cert.get('certification', '') for cert in personal.get('certifications', [])]
+        text_parts.append(' '.join(certifications))
+
+    # Experience
+    for exp in exp_data or []:
+        text_parts.append(f"{exp.get('role', '')} {exp.get('company', '')}")
+        for detail in exp.get('details', []):
+            text_parts.append(f"{detail.get('title', '')} {detail.get('description', '')}")
+
+    # Education
+    for edu in edu_data or []:
+        text_parts.append(f"{edu.get('degree', '')} {edu.get('school', '')}")
+
+    # Projects
+    for proj in proj_data or []:
+        text_parts.append(f"{proj.get('title', '')} {proj.get('description', '')}")
+
+    # One line per entry keeps section boundaries for chunked parsing
+    return '\n'.join(text_parts)
+
+
+def split_text_chunks(text: str, max_chars: int = CHUNK_CHARS) -> Iterator[str]:
+    """Yield pieces of ``text`` no longer than ``max_chars``, cut at the coarsest boundary that fits.
+
+    Sections (blank lines) are tried first, then lines, then sentences, and only a
+    single overlong sentence is cut at whitespace. Adjacent small pieces are packed
+    back together so short texts stay a single chunk.
+    """
+    if len(text) <= max_chars:
+        if text.strip():
+            yield text
+        return
+
+    buffer = []
+    size = 0
+    for piece in _split_pieces(text, max_chars):
+        if size + len(piece) + 1 > max_chars and buffer:
+            yield '\n'.join(buffer)
+            buffer, size = [], 0
+        buffer.append(piece)
+        size += len(piece) + 1
+    if buffer:
+        yield '\n'.join(buffer)
+
+
+def _split_pieces(text: str, max_chars: int) -> Iterator[str]:
+    for section in _SECTION_BREAK.split(text):
+        if len(section) <= max_chars:
+            if section.strip():
+                yield section
+            continue
+        for line in section.split('\n'):
+            if len(line) <= max_chars:
+                if line.strip():
+                    yield line
+                continue
+            for sentence in _SENTENCE_END.split(line):
+                while len(sentence) > max_chars:
+                    cut = sentence.rfind(' ', 0, max_chars)
+                    cut = cut if cut > 0 else max_chars
+                    yield sentence[:cut]
+                    sentence = sentence[cut:].lstrip()
+                if sentence.strip():
+                    yield sentence
+
+
+def resume_items(exp_data: List[Dict], proj_data: List[Dict]) -> List[Dict[str, Any]]:
+    """Experience details and projects as the places a missing keyword could be added"""
+    items = []
+    for i, exp in enumerate(exp_data or []):
+        where = " at ".join(part for part in (exp.get('role', ''), exp.get('company', '')) if part)
+        for j, detail in enumerate(exp.get('details', []) or []):
+            text = f"{detail.get('title', '')}. {detail.get('description', '')}".strip(". ")
+            if text:
+                label = f"{where}: {detail.get('title', '')}" if detail.get('title') else where
+                items.append({"section": "experience", "index": i, "detail": j,
+                              "label": label or f"Experience {i + 1}", "text": text})
+    for i, proj in enumerate(proj_data or []):
+        text = f"{proj.get('title', '')}. {proj.get('description', '')}".strip(". ")
+        if text:
+            items.append({"section": "projects", "index": i, "detail": None,
+                          "label": proj.get('title') or f"Project {i + 1}", "text": text})
+    return items
+
+
+def resume_text_from_combined(combined_data: Dict[str, Any]) -> str:
+    """Flatten a combined resume JSON (same layout as the upload page accepts)"""
+    personal_data = combined_data.get("personal_information", combined_data.get("personal", []))
+    return build_resume_text(
+        personal_data,
+        combined_data.get("experience", []),
+        combined_data.get("education", []),
+        combined_data.get("projects", [])
+    )
+
+
+def normalize_term(term: str) -> str:
+    """Lowercase, drop punctuation that is not part of a skill name, collapse whitespace"""
+    return ' '.join(_NON_TERM_CHARS.sub(' ', term.lower()).split())
+
+
+def span_lemma(span) -> str:
+    return ' '.join(tok.lemma_.lower() for tok in span if not tok.is_space)
+
+
+def keyword_terms_from_doc(doc) -> Dict[str, str]:
+    """Noun-chunk and entity keywords of a parsed (lowercased) doc, mapped to their lemmas"""
+    terms = {}
+
+    for chunk in doc.noun_chunks:
+        tok = chunk.root
+        if tok.pos_ in {"NOUN", "PROPN"} and len(chunk.text.strip()) > 2:
+            terms[chunk.text.strip().lower()] = span_lemma(chunk)
+
+    for ent in doc.ents:
+        if ent.label_ in {"ORG", "PRODUCT", "GPE", "PERSON"}:
+            terms[ent.text.strip().lower()] = span_lemma(ent)
+
+    return terms
+
+
+def exact_match_similarities(jd_keywords: List[str], jd_lemmas: List[str],
+                             resume_terms: Dict[str, str]) -> Tuple[List[float], List[int]]:
+    """Similarity 1.0 for JD keywords matching a resume keyword or lemma, plus the indices of the rest"""
+    exact_index = set()
+    for keyword, lemma in resume_terms.items():
+        exact_index.add(normalize_term(keyword))
+        exact_index.add(normalize_term(lemma))
+
+    similarities = [0.0] * len(jd_keywords)
+    leftover = []
+    for i, (keyword, lemma) in enumerate(zip(jd_keywords, jd_lemmas)):
+        if normalize_term(keyword) in exact_index or normalize_term(lemma) in exact_index:
+            similarities[i] = 1.0
+        else:
+            leftover.append(i)
+    return similarities, leftover
+
+
+def build_ats_result(jd_keywords_weighted: List[Tuple[str, float]], similarities: List[float],
+                     prefiltered: int, threshold: float, mode: str) -> Dict[str, Any]:
+    """Split JD keywords into matched/missing at ``threshold`` and compute the weighted score"""
+    matched = []
+    missing = []
+
+    for (keyword, weight), max_score in zip(jd_keywords_weighted, similarities):
+        if max_score >= threshold:
+            matched.append({"keyword": keyword, "score": round(max_score, 2), "weight": round(weight, 2)})
+        else:
+            missing.append({"keyword": keyword, "score": round(max_score, 2), "weight": round(weight, 2)})
+
+    total_weight = sum(weight for _, weight in jd_keywords_weighted)
+    matched_weight = sum(m['weight'] for m in matched)
+
+    score = (matched_weight / total_weight * 100) if total_weight else 0
+
+    return {
+        "score": round(score, 1),
+        "matched_keywords": matched,
+        "missing_keywords": missing,
+        "match_percentage": round(score, 1),
+        "total_keywords": len(jd_keywords_weighted),
+        "matched_count": len(matched),
+        "prefiltered_count": prefiltered,
+        "mode": mode,
+        "threshold": threshold,
+        # Raw per-keyword vectors so the result can be re-thresholded without a model call
+        "keywords": [keyword for keyword, _ in jd_keywords_weighted],
+        "similarities": [float(sim) for sim in similarities],
+        "weights": [float(weight) for _, weight in jd_keywords_weighted]
+    }
+
+
+def rethreshold(result: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """Recompute matched/missing lists and score at a new threshold from the cached similarities"""
+    return build_ats_result(
+        list(zip(result["keywords"], result["weights"])),
+        result["similarities"],
+        result["prefiltered_count"],
+        threshold,
+        result["mode"]
+    )
+
+
+def threshold_curve(result: Dict[str, Any], thresholds: np.ndarray) -> np.ndarray:
+    """ATS score at every threshold in one vectorized pass (same arithmetic as build_ats_result)"""
+    similarities = np.asarray(result["similarities"])
+    weights = np.asarray(result["weights"])
+    total_weight = weights.sum()
+    if not total_weight:
+        return np.zeros(len(thresholds))
+    matched = similarities[None, :] >= np.asarray(thresholds)[:, None]
+    return np.round(matched @ np.round(weights, 2) / total_weight * 100, 1)
+
+
+class ATSScorer:
+    """Keyword extraction and ATS scoring, independent of the Streamlit UI"""
+
+    def __init__(self, nlp=None, embedder=None, embedding_cache=None, keyword_source: str = "spacy",
+                 model_bundle: Optional[str] = DEFAULT_MODEL_BUNDLE):
+        if keyword_source not in KEYWORD_SOURCES:
+            raise ValueError(f"Unknown keyword source: {keyword_source}")
+        self.keyword_source = keyword_source
+        self._nlp = nlp
+        self._embedder = embedder
+        load_nlp, load_embedder = en_core_web_sm.load, self._load_embedder
+        if model_bundle:
+            # Local, checksum-verified models; never resolved through the network
+            bundle = ModelBundle(model_bundle)
+            if bundle.embedder_model != EMBEDDER_MODEL:
+                raise ValueError(f"Model bundle holds {bundle.embedder_model}, expected {EMBEDDER_MODEL}")
+            load_nlp, load_embedder = bundle.load_nlp, bundle.load_embedder
+        self._nlp_factory = (lambda: nlp) if nlp is not None else load_nlp
+        self._embedder_factory = (lambda: embedder) if embedder is not None else load_embedder
+        self._model_lock = threading.Lock()
+        self._active_lock = threading.Lock()
+        self._active = 0
+        self.embedding_cache = embedding_cache if embedding_cache is not None else LRUEmbeddingCache()
+        self._doc_cache = OrderedDict()
+        self._doc_lock = threading.Lock()
+        self.doc_cache_size = 16
+        self.chunk_chars = CHUNK_CHARS
+        self.stats = Counter()
+        self.last_used = {"nlp": time.monotonic(), "embedder": time.monotonic()}
+        self.footprints = {"nlp": 0, "embedder": 0}
+        if nlp is None:
+            # spaCy is needed by every mode, so load it eagerly as before
+            self._model("nlp")
+
+    @staticmethod
+    def _load_embedder():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(EMBEDDER_MODEL)
+
+    def _model(self, name: str):
+        """Return a model, (re)loading it on demand and recording its RSS footprint"""
+        self.last_used[name] = time.monotonic()
+        attr = f"_{name}"
+        model = getattr(self, attr)
+        if model is None:
+            with self._model_lock:
+                model = getattr(self, attr)
+                if model is None:
+                    before = current_rss()
+                    model = getattr(self, f"{attr}_factory")()
+                    self.footprints[name] = max(current_rss() - before, 0)
+                    self.stats[f"{name}_loads"] += 1
+                    setattr(self, attr, model)
+        return model
+
+    @property
+    def nlp(self):
+        """spaCy pipeline, reloaded transparently if the memory governor unloaded it"""
+        return self._model("nlp")
+
+    @property
+    def embedder(self):
+        """SentenceTransformer, loaded on first use so the n-gram mode never pays for it"""
+        return self._model("embedder")
+
+    def unload_model(self, name: str) -> int:
+        """Drop a model so it reloads on next use; returns its recorded footprint"""
+        with self._model_lock:
+            if getattr(self, f"_{name}") is None:
+                return 0
+            setattr(self, f"_{name}", None)
+            freed, self.footprints[name] = self.footprints[name], 0
+        if name == "nlp":
+            # Cached docs pin the old vocab in memory
+            with self._doc_lock:
+                self._doc_cache.clear()
+        return freed
+
+    def busy(self) -> bool:
+        return self._active > 0
+
+    @contextmanager
+    def activity(self):
+        """Mark the scorer busy so the memory governor keeps its models loaded meanwhile"""
+        with self._active_lock:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._active_lock:
+                self._active -= 1
+
+    def memory_components(self) -> List[Component]:
+        """Models and phrase cache as memory-governor components"""
+        def model_component(name):
+            return Component(
+                name=f"{name} model",
+                kind="model",
+                # At least one byte while loaded, so a model with no measurable RSS delta still counts
+                size=lambda: max(self.footprints[name], 1) if getattr(self, f"_{name}") is not None else 0,
+                release=lambda _nbytes: self.unload_model(name),
+                last_used=lambda: self.last_used[name],
+                busy=self.busy
+            )
+
+        components = [model_component("nlp"), model_component("embedder")]
+        cache = self.embedding_cache
+        if hasattr(cache, "evict"):
+            components.append(Component(
+                name="phrase embedding cache",
+                kind="cache",
+                size=cache.nbytes,
+                release=cache.evict,
+                last_used=lambda: cache.last_used
+            ))
+        return components
+
+    def extract_keyword_terms(self, text) -> Dict[str, str]:
+        """Map each extracted keyword to its lemmatized form"""
+        return self.extract_keyword_terms_batch([text])[0]
+
+    def extract_keyword_terms_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        """extract_keyword_terms for many texts through a single ``nlp.pipe`` call.
+
+        Each text is streamed through the pipe in bounded chunks and the keywords
+        are merged across its chunks, so only ``CHUNK_BATCH_SIZE`` chunks are ever
+        parsed at once. Single-chunk docs are remembered and reused. Depending on
+        ``keyword_source`` the skill-dictionary matches are added to, or replace,
+        the spaCy keywords.
+        """
+        originals = {}
+        for text in texts:
+            originals.setdefault(text.lower(), text)
+        unique_texts = list(originals)
+        terms_by_text = {text: {} for text in unique_texts}
+
+        if self.keyword_source != "spacy":
+            extractor = get_skill_extractor()
+            for text, original in originals.items():
+                # Original casing, so case-sensitive skills ("Go", "REST") can match
+                terms_by_text[text].update((skill, skill) for skill in extractor.extract(original))
+            if self.keyword_source == "skills":
+                return [terms_by_text[text.lower()] for text in texts]
+
+        # Texts parsed recently (e.g. an unchanged resume against a new JD) skip the pipeline
+        with self._doc_lock:
+            cached = {text: self._doc_cache[text] for text in unique_texts if text in self._doc_cache}
+            for text in cached:
+                self._doc_cache.move_to_end(text)
+        for text, doc in cached.items():
+            terms_by_text[text].update(keyword_terms_from_doc(doc))
+        self.stats["doc_cache_hits"] += len(cached)
+        chunks = (
+            (chunk, (text, len(text) <= self.chunk_chars))
+            for text in unique_texts if text not in cached
+            for chunk in split_text_chunks(text, self.chunk_chars)
+        )
+        for doc, (text, whole) in self.nlp.pipe(chunks, as_tuples=True, batch_size=CHUNK_BATCH_SIZE):
+            terms_by_text[text].update(keyword_terms_from_doc(doc))
+            if whole:
+                self._remember_doc(text, doc)
+            self.stats["parsed_chunks"] += 1
+        return [terms_by_text[text.lower()] for text in texts]
+
+    def _remember_doc(self, text: str, doc):
+        with self._doc_lock:
+            self._doc_cache[text] = doc
+            self._doc_cache.move_to_end(text)
+            while len(self._doc_cache) > self.doc_cache_size:
+                self._doc_cache.popitem(last=False)
+
+    def parsed_docs(self, text: str) -> Iterator:
+        """The lowercased doc from the last analysis of ``text``, or tokenizer-only chunk docs.
+
+        Tokenization is all the LOWER-attribute phrase matching needs, so a cache miss
+        never runs the tagger, parser or NER.
+        """
+        text = text.lower()
+        with self._doc_lock:
+            doc = self._doc_cache.get(text)
+        if doc is not None:
+            yield doc
+            return
+        for chunk in split_text_chunks(text, self.chunk_chars):
+            yield self.nlp.make_doc(chunk)
+
+    def count_keyword_occurrences(self, keywords: List[str], texts: List[str]) -> List[Counter]:
+        """Occurrences of each keyword in each text, one PhraseMatcher pass per text chunk"""
+        matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+        for keyword in keywords:
+            matcher.add(keyword, [self.nlp.make_doc(keyword)])
+        strings = self.nlp.vocab.strings
+        counts = []
+        for text in texts:
+            count = Counter()
+            for doc in self.parsed_docs(text):
+                count.update(strings[match_id] for match_id, _, _ in matcher(doc))
+            counts.append(count)
+        return counts
+
+    def extract_keywords(self, text):
+        return list(self.extract_keyword_terms(text))
+
+    def get_tfidf_keywords(self, jd_text, top_n=30) -> List[Tuple[str, float]]:
+        vec = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), max_features=300)
+        tfidf_matrix = vec.fit_transform([jd_text])
+        feature_names = vec.get_feature_names_out()
+        scores = tfidf_matrix.toarray().flatten()
+        top_indices = scores.argsort()[::-1][:top_n]
+        return [(feature_names[i], scores[i]) for i in top_indices]
+
+    def jd_keywords(self, jd_text: str, top_n: int = 30) -> List[Tuple[str, float]]:
+        """Weighted JD keywords: TF-IDF, plus named dictionary skills unless ``keyword_source`` is spaCy.
+
+        The TF-IDF tokenizer cannot see skills like "c++" or "ci/cd", so with the
+        skill dictionary enabled, skills the JD names that TF-IDF missed are added
+        at the mean TF-IDF weight.
+        """
+        weighted = self.get_tfidf_keywords(jd_text, top_n=top_n)
+        if self.keyword_source == "spacy":
+            return weighted
+        present = {normalize_term(kw) for kw, _ in weighted}
+        skills = [skill for skill in get_skill_extractor().extract(jd_text) if normalize_term(skill) not in present]
+        if skills:
+            weight = float(np.mean([w for _, w in weighted])) if weighted else 1.0
+            weighted = weighted + [(skill, weight) for skill in skills]
+        return weighted
+
+    def lemmatize_terms(self, terms: List[str]) -> List[str]:
+        """Lemmatize short phrases with the tagger/lemmatizer only"""
+        return [span_lemma(doc) for doc in self.nlp.pipe(terms, disable=["parser", "ner"])]
+
+    def encode_phrases(self, phrases: List[str]) -> np.ndarray:
+        """Normalized embeddings for phrases, encoding only those missing from the cache"""
+        return self._encode_cached(phrases, phrases)
+
+    def encode_items(self, texts: List[str]) -> np.ndarray:
+        """Normalized embeddings for resume items, cached by content hash rather than full text"""
+        keys = ["item:" + hashlib.sha1(text.encode("utf-8")).hexdigest() for text in texts]
+        return self._encode_cached(keys, texts)
+
+    def _encode_cached(self, keys: List[str], texts: List[str]) -> np.ndarray:
+        cached = self.embedding_cache.get_many(keys)
+        misses = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if misses:
+            vectors = self.embedder.encode(list(misses.values()), normalize_embeddings=True)
+            self.embedding_cache.put_many(list(misses), vectors)
+            cached.update(zip(misses, vectors))
+        self.stats["embedding_cache_hits"] += len(keys) - len(misses)
+        self.stats["embedding_cache_misses"] += len(misses)
+        return np.stack([cached[key] for key in keys])
+
+    def suggest_placements(self, keywords: List[str], items: List[Dict[str, Any]], top_k: int = 3,
+                           mode: str = "semantic") -> Dict[str, List[Dict[str, Any]]]:
+        """The ``top_k`` resume items each keyword most plausibly belongs in, best first.
+
+        Scores come from one keyword x item similarity matrix: MiniLM cosine in
+        semantic mode, character n-gram TF-IDF cosine in n-gram mode.
+        """
+        if not keywords or not items:
+            return {keyword: [] for keyword in keywords}
+        texts = [item["text"] for item in items]
+        if mode == "ngram":
+            vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True)
+            vec.fit(texts + keywords)
+            sims = (vec.transform(keywords) @ vec.transform(texts).T).toarray()
+        else:
+            sims = self.encode_phrases(keywords) @ self.encode_items(texts).T
+
+        k = min(top_k, len(items))
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        placements = {}
+        for row, keyword in enumerate(keywords):
+            best = top[row][np.argsort(-sims[row, top[row]], kind="stable")]
+            placements[keyword] = [{**items[i], "score": round(float(sims[row, i]), 3)} for i in best]
+        return placements
+
+    def embedding_similarities(self, keywords: List[str], resume_keywords: List[str]) -> np.ndarray:
+        """Max MiniLM cosine similarity of each keyword against the resume keywords"""
+        phrases = list(dict.fromkeys(resume_keywords + keywords))
+        emb = self.encode_phrases(phrases)
+        row_of = {phrase: row for row, phrase in enumerate(phrases)}
+        resume_emb = emb[[row_of[kw] for kw in resume_keywords]]
+        kw_emb = emb[[row_of[kw] for kw in keywords]]
+        return (kw_emb @ resume_emb.T).max(axis=1)
+
+    def ngram_similarities(self, keywords: List[str], resume_keywords: List[str]) -> np.ndarray:
+        """Max character n-gram TF-IDF cosine similarity of each keyword against the resume keywords"""
+        vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True)
+        vec.fit(resume_keywords + keywords)
+        # Rows are L2-normalised, so the sparse product is the cosine similarity
+        sims = vec.transform(keywords) @ vec.transform(resume_keywords).T
+        return sims.max(axis=1).toarray().ravel()
+
+    def prefilter(self, jd_keywords: List[str], jd_lemmas: List[str],
+                  resume_terms: Dict[str, str]) -> Tuple[List[float], List[int]]:
+        """Settle JD keywords already among the resume keywords with a hash lookup.
+
+        A keyword is an exact hit when its normalized or lemmatized form matches a
+        normalized resume keyword or lemma; it gets similarity 1.0. Returns the
+        similarity list and the indices still needing a model comparison.
+        """
+        similarities, leftover = exact_match_similarities(jd_keywords, jd_lemmas, resume_terms)
+        self.stats["jd_keywords"] += len(jd_keywords)
+        self.stats["prefilter_hits"] += len(jd_keywords) - len(leftover)
+        return similarities, leftover
+
+    def keyword_similarities(self, jd_keywords: List[str], resume_terms: Dict[str, str],
+                             mode: str = "semantic") -> Tuple[List[float], int]:
+        """Max similarity of each JD keyword against the resume keywords.
+
+        Prefilter hits get 1.0; only the rest go through ``mode``'s similarity, in
+        a single batch. Returns the similarities and the number of keywords the
+        prefilter settled.
+        """
+        if mode not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {mode}")
+
+        jd_lemmas = self.lemmatize_terms(jd_keywords) if jd_keywords else []
+        similarities, leftover = self.prefilter(jd_keywords, jd_lemmas, resume_terms)
+
+        if leftover and resume_terms:
+            leftover_keywords = [jd_keywords[i] for i in leftover]
+            if mode == "ngram":
+                self.stats["ngram_keywords"] += len(leftover)
+                max_scores = self.ngram_similarities(leftover_keywords, list(resume_terms))
+            else:
+                self.stats["embedded_keywords"] += len(leftover)
+                max_scores = self.embedding_similarities(leftover_keywords, list(resume_terms))
+            for i, max_score in zip(leftover, max_scores.tolist()):
+                similarities[i] = max_score
+
+        return similarities, len(jd_keywords) - len(leftover)
+
+    def prefilter_rate(self) -> float:
+        """Fraction of JD keywords settled without an embedding model call"""
+        total = self.stats["jd_keywords"]
+        return self.stats["prefilter_hits"] / total if total else 0.0
+
+    def calculate_ats_scores(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score many resume/JD pairs with one ``nlp.pipe`` and one ``embedder.encode`` call.
+
+        Each request is a dict with ``resume_text`` and ``jd_text`` and optionally
+        ``threshold`` and ``mode``. A compiled JD profile (see ``jd_profile.py``) may be
+        given as ``profile`` instead of ``jd_text``; its keywords, weights, lemmas and
+        embeddings are used as-is. Results are returned in request order.
+        """
+        modes = [request.get("mode") or "semantic" for request in requests]
+        for mode in modes:
+            if mode not in SCORING_MODES:
+                raise ValueError(f"Unknown scoring mode: {mode}")
+
+        with self.activity():
+            return self._calculate_ats_scores(requests, modes)
+
+    def _calculate_ats_scores(self, requests: List[Dict[str, Any]], modes: List[str]) -> List[Dict[str, Any]]:
+        profiles = [request.get("profile") for request in requests]
+        jd_weighted = [
+            profile.weighted_keywords() if profile is not None else self.jd_keywords(request["jd_text"])
+            for request, profile in zip(requests, profiles)
+        ]
+        resume_terms = self.extract_keyword_terms_batch([request["resume_text"] for request in requests])
+
+        # Compiled profiles bring their own lemmas and (same-model) keyword embeddings
+        lemma_of = {}
+        vectors = {}
+        for profile in profiles:
+            if profile is not None:
+                lemma_of.update(zip(profile.keywords, profile.lemmas))
+                if profile.embeddings is not None and profile.model == EMBEDDER_MODEL:
+                    vectors.update(zip(profile.keywords, profile.embeddings))
+
+        unique_jd_keywords = list(dict.fromkeys(
+            kw for weighted in jd_weighted for kw, _ in weighted if kw not in lemma_of
+        ))
+        if unique_jd_keywords:
+            lemma_of.update(zip(unique_jd_keywords, self.lemmatize_terms(unique_jd_keywords)))
+
+        # Semantic requests sharing a resume (e.g. one resume against many JDs) share
+        # their similarity work: each unique keyword is compared once per group.
+        # The n-gram IDF is fitted on the compared keywords, so n-gram requests stay
+        # in groups of their own to keep scores independent of batching.
+        groups: Dict[Tuple, Dict[str, Any]] = {}
+        group_keys = []
+        for index, (request, weighted, terms, mode) in enumerate(zip(requests, jd_weighted, resume_terms, modes)):
+            group_key = (request["resume_text"].lower(), mode) if mode == "semantic" else (index, mode)
+            group = groups.setdefault(group_key, {"terms": terms, "mode": mode, "keywords": {}})
+            group["keywords"].update(dict.fromkeys(kw for kw, _ in weighted))
+            group_keys.append(group_key)
+
+        for group in groups.values():
+            keywords = list(group["keywords"])
+            similarities, leftover = self.prefilter(keywords, [lemma_of[kw] for kw in keywords], group["terms"])
+            group["similarity"] = dict(zip(keywords, similarities))
+            group["exact"] = set(keywords).difference(keywords[i] for i in leftover)
+            group["leftover"] = [keywords[i] for i in leftover] if group["terms"] else []
+
+        # Every phrase any semantic group still needs and no profile supplied, embedded in one batch
+        phrases = {}
+        for group in groups.values():
+            if group["mode"] == "semantic" and group["leftover"]:
+                phrases.update(dict.fromkeys(group["terms"]))
+                phrases.update(dict.fromkeys(group["leftover"]))
+        missing = [phrase for phrase in phrases if phrase not in vectors]
+        if missing:
+            vectors.update(zip(missing, self.encode_phrases(missing)))
+
+        for group in groups.values():
+            leftover_keywords, terms = group["leftover"], list(group["terms"])
+            if not leftover_keywords:
+                continue
+            if group["mode"] == "ngram":
+                self.stats["ngram_keywords"] += len(leftover_keywords)
+                max_scores = self.ngram_similarities(leftover_keywords, terms)
+            else:
+                self.stats["embedded_keywords"] += len(leftover_keywords)
+                kw_emb = np.stack([vectors[kw] for kw in leftover_keywords])
+                resume_emb = np.stack([vectors[kw] for kw in terms])
+                max_scores = (kw_emb @ resume_emb.T).max(axis=1)
+            group["similarity"].update(zip(leftover_keywords, max_scores.tolist()))
+
+        results = []
+        for request, weighted, mode, group_key in zip(requests, jd_weighted, modes, group_keys):
+            group = groups[group_key]
+            similarities = [group["similarity"][kw] for kw, _ in weighted]
+            prefiltered = sum(kw in group["exact"] for kw, _ in weighted)
+            threshold = request.get("threshold")
+            if threshold is None:
+                threshold = DEFAULT_THRESHOLDS[mode]
+            results.append(build_ats_result(weighted, similarities, prefiltered, threshold, mode))
+        return results
+
+    def _partial_ats_result(self, weighted: List[Tuple[str, float]], similarities: List[float],
+                            leftover_keywords: List[str], terms: List[str], vectors: Dict[str, np.ndarray],
+                            prefiltered: int, threshold: float) -> Dict[str, Any]:
+        similarity = dict(zip((kw for kw, _ in weighted), similarities))
+        term_vectors = [vectors[term] for term in terms if term in vectors]
+        embedded = [kw for kw in leftover_keywords if kw in vectors]
+        if embedded and term_vectors:
+            max_scores = (np.stack([vectors[kw] for kw in embedded]) @ np.stack(term_vectors).T).max(axis=1)
+            similarity.update(zip(embedded, max_scores.tolist()))
+        all_terms = len(term_vectors) == len(terms)
+        result = build_ats_result(weighted, [similarity[kw] for kw, _ in weighted], prefiltered, threshold,
+                                  "semantic")
+        result["complete"] = False
+        result["pending_keywords"] = [kw for kw in leftover_keywords if kw not in vectors or not all_terms]
+        return result
+
+    def compare_jds(self, resume_text: str, jd_texts: List[str], threshold: Optional[float] = None,
+                    mode: str = "semantic") -> List[Dict[str, Any]]:
+        """Score one resume against many JDs in a single batched pass.
+
+        The resume is parsed and embedded once and every keyword shared between
+        JDs is compared once, so cost grows with the unique JD keywords rather
+        than the number of JDs. Results are returned in ``jd_texts`` order.
+        """
+        return self.calculate_ats_scores([
+            {"resume_text": resume_text, "jd_text": jd_text, "threshold": threshold, "mode": mode}
+            for jd_text in jd_texts
+        ])
+
+    def calculate_ats_score(self, resume_text, jd_text, threshold: Optional[float] = None, mode: str = "semantic",
+                            time_budget: Optional[float] = None):
+        """ATS result for one pair; with ``time_budget`` seconds, the most refined
+        ``iter_ats_score`` result reached by then (check ``result.get("complete", True)``)"""
+        if time_budget is not None:
+            result = None
+            for result in self.iter_ats_score(resume_text, jd_text, threshold, mode,
+                                              deadline=time.perf_counter() + time_budget):
+                pass
+            return result
+        return self.calculate_ats_scores([{
+            "resume_text": resume_text,
+            "jd_text": jd_text,
+            "threshold": threshold,
+            "mode": mode
+        }])[0]
+
+    def iter_ats_score(self, resume_text: str, jd_text: Optional[str] = None, threshold: Optional[float] = None,
+                       mode: str = "semantic", deadline: Optional[float] = None,
+                       profile=None) -> Iterator[Dict[str, Any]]:
+        """Progressively refined ATS results for one pair, ending with ``calculate_ats_score``'s.
+
+        The first result settles exact matches and keywords whose embeddings are
+        already cached; each later one follows a batch of phrase encodings sized to
+        take about ``ANYTIME_STEP_SECONDS``. Intermediate results carry
+        ``complete: False`` and the ``pending_keywords`` not yet compared with every
+        resume keyword. Their similarities are maxima over the resume keywords
+        embedded so far, so the estimate only rises towards the final score. The
+        last result comes from the exact computation over the now-cached vectors.
+        With a ``deadline`` (a ``time.perf_counter()`` value) iteration stops once
+        it passes, possibly before that. N-gram mode needs no model and yields
+        the exact result directly. A compiled JD ``profile`` may replace ``jd_text``.
+        """
+        if mode not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {mode}")
+        if threshold is None:
+            threshold = DEFAULT_THRESHOLDS[mode]
+
+        request = {"resume_text": resume_text, "threshold": threshold, "mode": mode}
+        if profile is not None:
+            request["profile"] = profile
+        else:
+            request["jd_text"] = jd_text
+
+        if mode == "semantic":
+            if profile is not None:
+                weighted, lemmas = profile.weighted_keywords(), profile.lemmas
+            else:
+                weighted = self.jd_keywords(jd_text)
+                lemmas = self.lemmatize_terms([kw for kw, _ in weighted])
+            keywords = [kw for kw, _ in weighted]
+            resume_terms = self.extract_keyword_terms(resume_text)
+            similarities, leftover = exact_match_similarities(keywords, lemmas, resume_terms)
+            leftover_keywords = [keywords[i] for i in leftover] if resume_terms else []
+            terms = list(resume_terms)
+
+            phrases = list(dict.fromkeys(leftover_keywords + terms)) if leftover_keywords else []
+            vectors = self.embedding_cache.get_many(phrases)
+            if profile is not None and profile.embeddings is not None and profile.model == EMBEDDER_MODEL:
+                vectors.update(zip(profile.keywords, profile.embeddings))
+            # Keywords first, heaviest first, so the estimate firms up where it matters most
+            by_weight = sorted(leftover, key=lambda i: -weighted[i][1])
+            pending = [phrase for phrase in dict.fromkeys([keywords[i] for i in by_weight] + terms)
+                       if phrase not in vectors] if leftover_keywords else []
+
+            batch_size = ANYTIME_FIRST_BATCH
+            while pending:
+                yield self._partial_ats_result(weighted, similarities, leftover_keywords, terms, vectors,
+                                               len(keywords) - len(leftover), threshold)
+                start = time.perf_counter()
+                if deadline is not None and start >= deadline:
+                    return
+                batch, pending = pending[:batch_size], pending[batch_size:]
+                with self.activity():
+                    vectors.update(zip(batch, self.encode_phrases(batch)))
+                per_phrase = max((time.perf_counter() - start) / len(batch), 1e-6)
+                step = ANYTIME_STEP_SECONDS
+                if deadline is not None:
+                    step = min(step, deadline - time.perf_counter())
+                batch_size = max(1, int(step / per_phrase))
+
+        yield self.calculate_ats_scores([request])[0]
+
+    def prepare_resume(self, resume_text: str, mode: str = "semantic") -> Dict[str, str]:
+        """Parse the resume and (in semantic mode) embed its keywords, warming the caches scoring reads"""
+        terms = self.extract_keyword_terms(resume_text)
+        if mode == "semantic" and terms:
+            self.encode_phrases(list(terms))
+        return terms
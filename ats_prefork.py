@@ -0,0 +1,147 @@
+"""Pre-fork multi-worker scoring service sharing one copy of the models.
+
+    python ats_prefork.py --workers 4 --port 8765
+
+The parent loads the spaCy pipeline and the SentenceTransformer, warms them up,
+allocates the phrase-embedding cache in shared memory, binds the listening
+socket and then forks the workers. The read-only model weights stay shared
+copy-on-write between all workers; each worker runs its own MicroBatcher and
+accepts connections from the shared socket. Dead workers are respawned.
+"""
+import argparse
+import gc
+import os
+import signal
+import sys
+import time
+from typing import Dict, List, Optional
+
+from ats_core import ATSScorer, KEYWORD_SOURCES
+from ats_service import MicroBatcher, make_handler, make_server
+from embedding_cache import SharedEmbeddingCache
+from keyword_demand import KeywordDemandIndex
+
+
+def process_memory(pid) -> Dict[str, int]:
+    """Rss/Pss/shared/private memory of a process in kB, from /proc/<pid>/smaps_rollup"""
+    fields = {"Rss": 0, "Pss": 0, "Shared_Clean": 0, "Shared_Dirty": 0, "Private_Clean": 0, "Private_Dirty": 0}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in fields:
+                fields[name] = int(rest.split()[0])
+    return {
+        "rss_kb": fields["Rss"],
+        "pss_kb": fields["Pss"],
+        "shared_kb": fields["Shared_Clean"] + fields["Shared_Dirty"],
+        "private_kb": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def child_pids(pid) -> List[int]:
+    pids = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            pids.extend(int(child) for child in f.read().split())
+    return pids
+
+
+def load_shared_scorer(cache_entries: int, keyword_source: str = "spacy") -> ATSScorer:
+    """Load and warm up the models so every page they touch is resident before fork"""
+    import torch
+    # A single intra-op thread in the parent keeps OpenMP from starting a thread pool
+    # that the forked workers would inherit in a broken state
+    torch.set_num_threads(1)
+    scorer = ATSScorer(keyword_source=keyword_source)
+    dim = scorer.embedder.get_sentence_embedding_dimension()
+    scorer.embedding_cache = SharedEmbeddingCache(cache_entries, dim)
+    scorer.calculate_ats_score("Python developer with SQL experience", "We need a Python developer.")
+    return scorer
+
+
+def run_worker(server, scorer: ATSScorer, max_batch_size: int, max_wait_ms: float, torch_threads: int,
+               demand_path: Optional[str] = None):
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+    # Each worker opens its own connection to the (WAL-mode) demand index
+    demand = KeywordDemandIndex(demand_path) if demand_path else None
+    batcher = MicroBatcher(scorer, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, demand=demand)
+    server.RequestHandlerClass = make_handler(batcher)
+    try:
+        server.serve_forever()
+    finally:
+        os._exit(0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-fork ATS scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--cache-entries", type=int, default=100_000,
+                        help="Slots in the shared phrase-embedding cache")
+    parser.add_argument("--torch-threads", type=int, default=1,
+                        help="Intra-op threads per worker (0 keeps torch's default)")
+    parser.add_argument("--keywords", choices=KEYWORD_SOURCES, default="spacy",
+                        help="Resume keyword source: spaCy, the skill dictionary, or both")
+    parser.add_argument("--demand", help="Keyword demand index to count every scored job description in")
+    args = parser.parse_args(argv)
+
+    scorer = load_shared_scorer(args.cache_entries, args.keywords)
+    server = make_server(args.host, args.port, batcher=None)
+
+    # Keep the collector from touching (and so copying) every pre-fork object in the workers
+    gc.collect()
+    gc.freeze()
+
+    workers = {}
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            run_worker(server, scorer, args.max_batch_size, args.max_wait_ms, args.torch_threads, args.demand)
+        workers[pid] = time.time()
+
+    for _ in range(args.workers):
+        spawn()
+
+    print(f"Serving ATS scores on http://{args.host}:{args.port} with {args.workers} workers "
+          f"(shared cache {scorer.embedding_cache.nbytes / 2**20:.0f} MiB)")
+
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.pop(pid, None)
+        if not stopping:
+            spawn()
+
+    server.server_close()
+    scorer.embedding_cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
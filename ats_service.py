@@ -0,0 +1,250 @@
+"""Local HTTP/JSON scoring service with dynamic micro-batching.
+
+    python ats_service.py --port 8765 --max-batch-size 32 --max-wait-ms 10
+
+    POST /score  {"resume_text": "...", "jd_text": "...", "mode": "semantic", "threshold": 0.75}
+                 ("resume" may be given instead of "resume_text" as a combined resume JSON object)
+    GET  /stats  batching and latency counters
+    GET  /health
+
+Requests that arrive within ``max_wait_ms`` of each other are merged into one
+``ATSScorer.calculate_ats_scores`` call, i.e. one ``nlp.pipe`` and one
+``embedder.encode`` for the whole batch, and the results are fanned back out.
+With ``--demand INDEX`` each scored job description's keywords are counted in the
+keyword demand index (see ``keyword_demand.py``) by a separate thread, so the
+SQLite writes never hold up the next batch.
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from ats_core import ATSScorer, KEYWORD_SOURCES, SCORING_MODES, resume_text_from_combined
+from ats_store import content_hash
+from keyword_demand import KeywordDemandIndex
+
+
+class MicroBatcher:
+    """Collect concurrent score requests and run them as one batch on a worker thread"""
+
+    def __init__(self, scorer: ATSScorer, max_batch_size: int = 32, max_wait_ms: float = 10.0,
+                 latency_window: int = 10_000, demand: Optional[KeywordDemandIndex] = None):
+        self.scorer = scorer
+        self.demand = demand
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = deque(maxlen=latency_window)
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.started_at = time.time()
+        self._worker = threading.Thread(target=self._run, name="ats-batcher", daemon=True)
+        self._worker.start()
+        self._demand_queue = queue.Queue()
+        if demand is not None:
+            threading.Thread(target=self._drain_demand, name="ats-demand", daemon=True).start()
+
+    def submit(self, request: Dict[str, Any]) -> Future:
+        future = Future()
+        self._queue.put((request, future, time.perf_counter()))
+        return future
+
+    def score(self, request: Dict[str, Any], timeout: float = 60.0) -> Dict[str, Any]:
+        return self.submit(request).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self.scorer.calculate_ats_scores([request for request, _, _ in batch])
+            except Exception:
+                batch, results = self._run_one_by_one(batch)
+                if not batch:
+                    continue
+
+            done = time.perf_counter()
+            with self._lock:
+                self.requests += len(batch)
+                self.batches += 1
+                self._batch_sizes.append(len(batch))
+                self._latencies.extend(done - submitted for _, _, submitted in batch)
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            if self.demand is not None:
+                self._record_demand(batch, results)
+
+    def _run_one_by_one(self, batch):
+        """Retry a failed batch request by request, so one bad request fails only itself.
+
+        Failed futures get their own exception; returns the entries that
+        succeeded and their results.
+        """
+        succeeded, results = [], []
+        for entry in batch:
+            request, future, _ = entry
+            try:
+                result = self.scorer.calculate_ats_scores([request])[0]
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                future.set_exception(e)
+                continue
+            succeeded.append(entry)
+            results.append(result)
+        return succeeded, results
+
+    def _record_demand(self, batch, results):
+        """Hand the batch's job descriptions to the demand thread"""
+        now = time.time()
+        self._demand_queue.put([(request["jd_text"], result["keywords"], result["weights"], now)
+                                for (request, _, _), result in zip(batch, results)])
+
+    def _drain_demand(self):
+        while True:
+            postings = self._demand_queue.get()
+            try:
+                for jd_text, keywords, weights, when in postings:
+                    self.demand.record(content_hash(jd_text), zip(keywords, weights), when=when)
+            except Exception as e:
+                print(f"Could not update keyword demand: {e}", file=sys.stderr)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            batch_sizes = np.array(self._batch_sizes)
+            requests, batches, errors = self.requests, self.batches, self.errors
+        elapsed = time.time() - self.started_at
+        return {
+            "pid": os.getpid(),
+            "requests": requests,
+            "batches": batches,
+            "errors": errors,
+            "mean_batch_size": round(float(batch_sizes.mean()), 2) if len(batch_sizes) else 0,
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+            "p99_ms": round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None,
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else 0,
+            "prefilter_rate": round(self.scorer.prefilter_rate(), 3),
+            "queue_depth": self._queue.qsize(),
+            "demand_queue_depth": self._demand_queue.qsize(),
+        }
+
+
+def parse_score_request(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a /score payload into a calculate_ats_scores request"""
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    resume_text = payload.get("resume_text")
+    if resume_text is None and isinstance(payload.get("resume"), dict):
+        resume_text = resume_text_from_combined(payload["resume"])
+    jd_text = payload.get("jd_text")
+    if not isinstance(resume_text, str) or not isinstance(jd_text, str) or not jd_text.strip():
+        raise ValueError("Provide 'jd_text' and either 'resume_text' or a combined 'resume' object")
+    mode = payload.get("mode") or "semantic"
+    if mode not in SCORING_MODES:
+        raise ValueError(f"'mode' must be one of {', '.join(SCORING_MODES)}")
+    threshold = payload.get("threshold")
+    if threshold is not None and not isinstance(threshold, (int, float)):
+        raise ValueError("'threshold' must be a number")
+    return {"resume_text": resume_text, "jd_text": jd_text, "mode": mode, "threshold": threshold}
+
+
+def make_handler(batcher: MicroBatcher):
+    class ScoreHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, body: Any):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send_json(200, batcher.stats())
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._send_json(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = parse_score_request(json.loads(self.rfile.read(length) or b"null"))
+            except (ValueError, json.JSONDecodeError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            try:
+                self._send_json(200, batcher.score(request))
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoreHandler
+
+
+def make_server(host: str, port: int, batcher: MicroBatcher) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local ATS scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--keywords", choices=KEYWORD_SOURCES, default="spacy",
+                        help="Resume keyword source: spaCy, the skill dictionary, or both")
+    parser.add_argument("--demand", help="Keyword demand index to count every scored job description in")
+    args = parser.parse_args(argv)
+
+    demand = KeywordDemandIndex(args.demand) if args.demand else None
+    batcher = MicroBatcher(ATSScorer(keyword_source=args.keywords), max_batch_size=args.max_batch_size,
+                           max_wait_ms=args.max_wait_ms, demand=demand)
+    server = make_server(args.host, args.port, batcher)
+    print(f"Serving ATS scores on http://{args.host}:{args.port} "
+          f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
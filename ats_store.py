@@ -0,0 +1,226 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+DEFAULT_DB_PATH = "fitcheckr.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    name TEXT,
+    data TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS job_descriptions (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    title TEXT,
+    text TEXT NOT NULL,
+    keywords TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ats_results (
+    id INTEGER PRIMARY KEY,
+    resume_id INTEGER NOT NULL REFERENCES resumes(id) ON DELETE CASCADE,
+    jd_id INTEGER NOT NULL REFERENCES job_descriptions(id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    match_percentage REAL NOT NULL,
+    total_keywords INTEGER NOT NULL,
+    matched_count INTEGER NOT NULL,
+    threshold REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS result_keywords (
+    result_id INTEGER NOT NULL REFERENCES ats_results(id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL,
+    matched INTEGER NOT NULL,
+    score REAL NOT NULL,
+    weight REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_results_resume_score ON ats_results(resume_id, score);
+CREATE INDEX IF NOT EXISTS idx_results_jd_resume_score ON ats_results(jd_id, resume_id, score);
+CREATE INDEX IF NOT EXISTS idx_results_created ON ats_results(created_at);
+CREATE INDEX IF NOT EXISTS idx_result_keywords_result ON result_keywords(result_id);
+CREATE INDEX IF NOT EXISTS idx_result_keywords_keyword ON result_keywords(keyword, matched);
+CREATE INDEX IF NOT EXISTS idx_jd_created ON job_descriptions(created_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS jd_fts USING fts5(
+    text, keywords,
+    content='job_descriptions', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS jd_fts_insert AFTER INSERT ON job_descriptions BEGIN
+    INSERT INTO jd_fts(rowid, text, keywords) VALUES (new.id, new.text, new.keywords);
+END;
+
+CREATE TRIGGER IF NOT EXISTS jd_fts_delete AFTER DELETE ON job_descriptions BEGIN
+    INSERT INTO jd_fts(jd_fts, rowid, text, keywords) VALUES ('delete', old.id, old.text, old.keywords);
+END;
+
+CREATE TRIGGER IF NOT EXISTS jd_fts_update AFTER UPDATE ON job_descriptions BEGIN
+    INSERT INTO jd_fts(jd_fts, rowid, text, keywords) VALUES ('delete', old.id, old.text, old.keywords);
+    INSERT INTO jd_fts(rowid, text, keywords) VALUES (new.id, new.text, new.keywords);
+END;
+"""
+
+
+def content_hash(value: Any) -> str:
+    """Stable sha1 of a string or JSON-serialisable value"""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query that ANDs the quoted terms"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"' for term in terms if term)
+
+
+class ATSStore:
+    """Embedded SQLite persistence for resumes, job descriptions and ATS results.
+
+    Runs in WAL mode so several Streamlit sessions can read while one writes; each
+    thread gets its own connection.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def upsert_resume(self, data: Dict[str, Any], text: str, name: Optional[str] = None,
+                      digest: Optional[str] = None) -> int:
+        """Insert a resume unless present; pass ``digest`` when ``content_hash(data)`` is already known"""
+        digest = digest or content_hash(data)
+        conn = self.connection
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO resumes (content_hash, name, data, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                (digest, name, json.dumps(data, ensure_ascii=False), text, time.time())
+            )
+        return conn.execute("SELECT id FROM resumes WHERE content_hash = ?", (digest,)).fetchone()[0]
+
+    def upsert_jd(self, text: str, keywords: List[str], title: Optional[str] = None) -> int:
+        digest = content_hash(text)
+        conn = self.connection
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO job_descriptions (content_hash, title, text, keywords, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (digest, title, text, ' '.join(keywords), time.time())
+            )
+        return conn.execute("SELECT id FROM job_descriptions WHERE content_hash = ?", (digest,)).fetchone()[0]
+
+    def save_result(self, resume_id: int, jd_id: int, result: Dict[str, Any], threshold: float) -> int:
+        conn = self.connection
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO ats_results (resume_id, jd_id, score, match_percentage, total_keywords, "
+                "matched_count, threshold, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (resume_id, jd_id, result["score"], result["match_percentage"], result["total_keywords"],
+                 result["matched_count"], threshold, time.time())
+            )
+            result_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO result_keywords (result_id, keyword, matched, score, weight) VALUES (?, ?, ?, ?, ?)",
+                [(result_id, kw["keyword"], 1, kw["score"], kw["weight"]) for kw in result["matched_keywords"]] +
+                [(result_id, kw["keyword"], 0, kw["score"], kw["weight"]) for kw in result["missing_keywords"]]
+            )
+        return result_id
+
+    def record_analysis(self, resume_data: Dict[str, Any], resume_text: str, jd_text: str,
+                        result: Dict[str, Any], threshold: float, resume_digest: Optional[str] = None) -> int:
+        """Persist a full analysis (resume, JD and result) in one call"""
+        keywords = [kw["keyword"] for kw in result["matched_keywords"] + result["missing_keywords"]]
+        resume_id = self.upsert_resume(resume_data, resume_text, digest=resume_digest)
+        jd_id = self.upsert_jd(jd_text, keywords, title=jd_text.strip().split("\n", 1)[0][:120])
+        return self.save_result(resume_id, jd_id, result, threshold)
+
+    def search_results(self, query: str = "", resume_id: Optional[int] = None,
+                       max_score: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent results whose JD matches the query, e.g. JDs mentioning "kafka" scored below 60"""
+        clauses = []
+        params: List[Any] = []
+        source = "ats_results r"
+        if query.strip():
+            # Drive the join from the FTS hits so only matching JDs touch ats_results
+            source = "jd_fts JOIN ats_results r ON r.jd_id = jd_fts.rowid"
+            clauses.append("jd_fts MATCH ?")
+            params.append(fts_query(query))
+        if resume_id is not None:
+            clauses.append("r.resume_id = ?")
+            params.append(resume_id)
+        if max_score is not None:
+            clauses.append("r.score < ?")
+            params.append(max_score)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        rows = self.connection.execute(
+            f"""
+            SELECT r.id AS result_id, r.resume_id, r.jd_id, jd.title, r.score,
+                   r.matched_count, r.total_keywords, r.created_at
+            FROM (
+                SELECT r.id, r.resume_id, r.jd_id, r.score, r.matched_count, r.total_keywords, r.created_at
+                FROM {source}
+                {where}
+                ORDER BY r.id DESC
+                LIMIT ?
+            ) r
+            JOIN job_descriptions jd ON jd.id = r.jd_id
+            ORDER BY r.id DESC
+            """,
+            params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def result_keywords(self, result_id: int) -> List[Dict[str, Any]]:
+        rows = self.connection.execute(
+            "SELECT keyword, matched, score, weight FROM result_keywords WHERE result_id = ? ORDER BY weight DESC",
+            (result_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_resume(self, resume_id: int) -> Optional[Dict[str, Any]]:
+        row = self.connection.execute("SELECT data FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def get_jd_text(self, jd_id: int) -> Optional[str]:
+        row = self.connection.execute("SELECT text FROM job_descriptions WHERE id = ?", (jd_id,)).fetchone()
+        return row["text"] if row else None
+
+    def counts(self) -> Dict[str, int]:
+        conn = self.connection
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("resumes", "job_descriptions", "ats_results")
+        }
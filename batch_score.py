@@ -0,0 +1,124 @@
+"""Score every resume against every job description and write results to Parquet.
+
+    python batch_score.py --resumes resumes/ --jds jds/ --out results/
+
+Resumes are combined resume JSON files (the same format the upload page accepts),
+job descriptions are plain-text files. Results land in ``results.parquet`` and
+``keywords.parquet`` inside the output directory. With ``--profiles DIR`` each job
+description is compiled once into a JD profile (see ``jd_profile.py``) and reused
+by later runs. With ``--dedup INDEX`` near-duplicate job descriptions (see
+``jd_dedup.py``) are scored once and their results reused for every copy. With
+``--demand INDEX`` every job description's keywords are counted in the keyword
+demand index (see ``keyword_demand.py``).
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List
+
+from ats_core import ATSScorer, KEYWORD_SOURCES, SCORING_MODES, resume_text_from_combined
+from ats_store import content_hash
+from jd_dedup import DEFAULT_THRESHOLD, DedupIndex
+from jd_profile import ProfileLibrary
+from keyword_demand import KeywordDemandIndex
+from result_sink import ParquetResultSink
+
+
+def collect_files(path: str, suffixes) -> List[str]:
+    if os.path.isfile(path):
+        return [path]
+    return sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if name.lower().endswith(suffixes)
+    )
+
+
+def file_id(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch ATS scoring to Parquet")
+    parser.add_argument("--resumes", required=True, help="Combined resume JSON file or directory")
+    parser.add_argument("--jds", required=True, help="Job description .txt file or directory")
+    parser.add_argument("--out", required=True, help="Output directory for Parquet files")
+    parser.add_argument("--mode", choices=SCORING_MODES, default="semantic")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Match threshold (defaults to the mode's calibrated threshold)")
+    parser.add_argument("--row-group-size", type=int, default=100_000)
+    parser.add_argument("--profiles", help="Directory of compiled JD profiles to load from and save to")
+    parser.add_argument("--keywords", choices=KEYWORD_SOURCES, default="spacy",
+                        help="Resume keyword source: spaCy, the skill dictionary, or both")
+    parser.add_argument("--dedup", help="MinHash/LSH index file of seen job descriptions; "
+                                        "near-duplicates reuse the first copy's analysis")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Estimated Jaccard similarity above which job descriptions are duplicates")
+    parser.add_argument("--demand", help="Keyword demand index to count every job description's keywords in")
+    args = parser.parse_args(argv)
+
+    resume_files = collect_files(args.resumes, (".json",))
+    jd_files = collect_files(args.jds, (".txt", ".md"))
+    if not resume_files or not jd_files:
+        print("No resumes or job descriptions found.", file=sys.stderr)
+        return 1
+
+    jds = []
+    for path in jd_files:
+        with open(path, encoding="utf-8") as f:
+            jds.append((file_id(path), f.read()))
+
+    # Group job descriptions by the copy they duplicate; each group is scored once
+    groups = {}
+    if args.dedup:
+        with DedupIndex(args.dedup, threshold=args.dedup_threshold) as index:
+            entries = list(index.add_many(((jd_text, jd_id) for jd_id, jd_text in jds),
+                                          threshold=args.dedup_threshold))
+        group_keys = [entry["canonical_hash"] for entry in entries]
+        duplicates = sum(entry["duplicate"] for entry in entries)
+        print(f"{duplicates} of {len(jds)} job descriptions are near-duplicates of an indexed posting")
+    else:
+        group_keys = list(range(len(jds)))
+    for i, key in enumerate(group_keys):
+        groups.setdefault(key, i)
+
+    scorer = ATSScorer(keyword_source=args.keywords)
+    library = ProfileLibrary(args.profiles) if args.profiles else None
+    jd_sides = []
+    for key, first in groups.items():
+        jd_text = jds[first][1]
+        if library is None:
+            jd_sides.append({"jd_text": jd_text})
+            continue
+        # A copy indexed by an earlier run may already have a compiled profile
+        profile = library.get(key, scorer.keyword_source) if args.dedup else None
+        if profile is None or (args.mode == "semantic" and profile.embeddings is None):
+            profile = library.get_or_compile(scorer, jd_text, embed=args.mode == "semantic")
+        jd_sides.append({"profile": profile})
+    side_of = {key: position for position, key in enumerate(groups)}
+    demand = KeywordDemandIndex(args.demand) if args.demand else None
+
+    with ParquetResultSink(args.out, row_group_size=args.row_group_size) as sink:
+        for position, resume_path in enumerate(resume_files):
+            with open(resume_path, encoding="utf-8") as f:
+                resume_text = resume_text_from_combined(json.load(f))
+            resume_id = file_id(resume_path)
+            results = scorer.calculate_ats_scores([
+                {"resume_text": resume_text, "threshold": args.threshold, "mode": args.mode, **jd_side}
+                for jd_side in jd_sides
+            ])
+            for (jd_id, _), key in zip(jds, group_keys):
+                sink.write(resume_id, jd_id, results[side_of[key]])
+            if demand is not None and position == 0:
+                # The JD side is the same for every resume, so the first one's results cover it
+                for first, result in zip(groups.values(), results):
+                    demand.record(content_hash(jds[first][1]), zip(result["keywords"], result["weights"]))
+
+    if demand is not None:
+        demand.close()
+    print(f"Wrote {sink.rows_written} results and {sink.keyword_rows_written} keyword rows to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Peak memory and throughput of keyword extraction on very long texts.
+
+    python benchmarks/bench_long_texts.py --sizes 10000 100000 1000000
+    python benchmarks/bench_long_texts.py --sizes 10000 100000 --unchunked
+
+Each size runs in its own subprocess so peak RSS reflects only that input.
+Synthetic job-description text is built from shuffled requirement, boilerplate
+and benefits sentences. ``--unchunked`` also parses each text as a single doc
+(raising spaCy's ``max_length``) for comparison.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_core import ATSScorer, CHUNK_CHARS
+
+SENTENCES = [
+    "We are looking for a senior backend engineer with Python and Django experience.",
+    "You will design data pipelines on AWS using Kafka, Spark and Airflow.",
+    "Experience with Kubernetes, Docker and Terraform is a strong plus.",
+    "Our team builds machine learning services for fraud detection in real time.",
+    "Comfortable writing SQL against PostgreSQL and tuning slow queries.",
+    "We offer a competitive salary, equity and a generous parental leave policy.",
+    "Our benefits include health insurance, a learning budget and flexible hours.",
+    "We are an equal opportunity employer and value diversity at our company.",
+    "You will mentor junior engineers and take part in code reviews.",
+    "Familiarity with React and TypeScript helps when working with the frontend team.",
+]
+
+
+def synthetic_text(n_chars: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    sections = []
+    size = 0
+    while size < n_chars:
+        section = "\n".join(
+            " ".join(rng.sample(SENTENCES, rng.randint(2, 5))) for _ in range(rng.randint(3, 8))
+        )
+        sections.append(section)
+        size += len(section) + 2
+    return "\n\n".join(sections)[:n_chars]
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_size(n_chars: int, unchunked: bool):
+    """Extract keywords from one synthetic text; called inside the worker subprocess"""
+    scorer = ATSScorer()
+    text = synthetic_text(n_chars)
+    if unchunked:
+        scorer.chunk_chars = len(text) + 1
+        scorer.nlp.max_length = len(text) + 1
+    scorer.extract_keyword_terms(SENTENCES[0])
+    baseline = peak_rss_mb()
+
+    start = time.perf_counter()
+    terms = scorer.extract_keyword_terms(text)
+    seconds = time.perf_counter() - start
+    return {
+        "chars": len(text),
+        "chunked": not unchunked,
+        "seconds": seconds,
+        "chunks": scorer.stats["parsed_chunks"] - 1,
+        "keywords": len(terms),
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark chunked keyword extraction on long texts")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--unchunked", action="store_true", help="Also parse each text as one doc")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-unchunked", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(run_size(args.worker, args.worker_unchunked), sys.stdout)
+        return 0
+
+    print(f"Chunk size {CHUNK_CHARS} chars")
+    print(f"{'chars':>10} {'mode':>9} {'chunks':>7} {'keywords':>9} {'seconds':>8} {'MB/s':>6} "
+          f"{'peak RSS':>9} {'growth':>7}")
+    for n_chars in args.sizes:
+        for unchunked in ([False, True] if args.unchunked else [False]):
+            cmd = [sys.executable, os.path.abspath(__file__), "--worker", str(n_chars)]
+            if unchunked:
+                cmd.append("--worker-unchunked")
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{n_chars:>10} {'whole' if unchunked else 'chunked':>9} failed: "
+                      f"{proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+                continue
+            r = json.loads(proc.stdout)
+            print(f"{r['chars']:>10} {'chunked' if r['chunked'] else 'whole':>9} {r['chunks']:>7} "
+                  f"{r['keywords']:>9} {r['seconds']:>8.2f} {r['chars'] / r['seconds'] / 1e6:>6.2f} "
+                  f"{r['peak_rss_mb']:>7.0f}MB {r['peak_rss_mb'] - r['baseline_rss_mb']:>5.0f}MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Per-worker memory and total throughput of ats_prefork.py as the worker count grows.
+
+    python benchmarks/bench_prefork.py --resumes resumes/ --jds jds/ --workers 1,2,4,8
+
+For each worker count the pre-fork server is started on a free port, loaded with
+``--clients-per-worker`` concurrent clients, and the RSS/PSS/private memory of
+every worker is read from /proc. PSS splits shared pages between the processes
+sharing them, so total PSS is the real memory cost of the whole pool.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_prefork import child_pids, process_memory
+from bench_scoring_modes import load_corpus
+from load_service import get_json, run_level
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_healthy(url, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            get_json(f"{url}/health")
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pre-fork scoring service")
+    parser.add_argument("--resumes", required=True)
+    parser.add_argument("--jds", required=True)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--clients-per-worker", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--mode", default="semantic")
+    args = parser.parse_args(argv)
+
+    resumes, jds = load_corpus(args.resumes, args.jds)
+    pairs = [(resume_text, jd_text) for resume_text in resumes for jd_text in jds]
+
+    print(f"{'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'RSS/worker':>11} {'private/worker':>15} {'total PSS':>10}")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(REPO_ROOT, "ats_prefork.py"), "--workers", str(workers),
+             "--port", str(port)],
+            cwd=REPO_ROOT, stdout=subprocess.DEVNULL
+        )
+        try:
+            wait_healthy(url)
+            run_level(url, pairs, workers, workers * 4, args.mode)  # warm every worker
+            level = run_level(url, pairs, workers * args.clients_per_worker, args.requests, args.mode)
+
+            pids = child_pids(server.pid)
+            memory = [process_memory(pid) for pid in pids]
+            parent = process_memory(server.pid)
+            rss = sum(m["rss_kb"] for m in memory) / len(memory) / 1024
+            private = sum(m["private_kb"] for m in memory) / len(memory) / 1024
+            total_pss = (sum(m["pss_kb"] for m in memory) + parent["pss_kb"]) / 1024
+            print(f"{workers:>7} {level['throughput_rps']:>8.1f} {level['p50_ms']:>8.1f} {level['p99_ms']:>8.1f} "
+                  f"{rss:>9.0f}MB {private:>13.0f}MB {total_pss:>8.0f}MB")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Compare the semantic (MiniLM) and n-gram scoring modes.
+
+    python benchmarks/bench_scoring_modes.py --resumes resumes/ --jds jds/
+
+Each mode runs in its own subprocess so peak RSS reflects only what that mode
+loads. Reports model load time, per-pair latency, peak RSS, agreement with the
+semantic scorer, and the n-gram threshold that best agrees with the semantic
+threshold. Agreement is measured only on JD keywords that reach the similarity
+stage: prefilter hits score 1.0 in both modes and would inflate it.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from ats_core import ATSScorer, DEFAULT_THRESHOLDS, exact_match_similarities, resume_text_from_combined
+from batch_score import collect_files
+
+
+def load_corpus(resumes_path, jds_path):
+    resumes = []
+    for path in collect_files(resumes_path, (".json",)):
+        with open(path, encoding="utf-8") as f:
+            resumes.append(resume_text_from_combined(json.load(f)))
+    jds = []
+    for path in collect_files(jds_path, (".txt", ".md")):
+        with open(path, encoding="utf-8") as f:
+            jds.append(f.read())
+    return resumes, jds
+
+
+def run_mode(mode, resumes, jds):
+    """Score every pair in one mode; called inside the worker subprocess"""
+    start = time.perf_counter()
+    scorer = ATSScorer()
+    if mode == "semantic":
+        scorer.embedder.encode(["warm up"])
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    similarities = []
+    scores = []
+    keywords = 0
+    for resume_text in resumes:
+        for jd_text in jds:
+            start = time.perf_counter()
+            jd_keywords = [kw for kw, _ in scorer.get_tfidf_keywords(jd_text)]
+            resume_terms = scorer.extract_keyword_terms(resume_text)
+            sims, _ = scorer.keyword_similarities(jd_keywords, resume_terms, mode=mode)
+            latencies.append(time.perf_counter() - start)
+            # Same leftover indices in both modes; only these were scored by the mode itself
+            jd_lemmas = scorer.lemmatize_terms(jd_keywords) if jd_keywords else []
+            _, leftover = exact_match_similarities(jd_keywords, jd_lemmas, resume_terms)
+            similarities.append([sims[i] for i in leftover] if resume_terms else [])
+            keywords += len(jd_keywords)
+            scores.append(scorer.calculate_ats_score(resume_text, jd_text, mode=mode)["score"])
+
+    return {
+        "mode": mode,
+        "load_seconds": load_seconds,
+        "latencies": latencies,
+        "similarities": similarities,
+        "scores": scores,
+        "keywords": keywords,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def calibrate_threshold(semantic_sims, ngram_sims, semantic_threshold):
+    """N-gram threshold that maximises keyword-level match agreement.
+
+    Both arrays hold only keywords that reached the similarity stage.
+    """
+    reference = semantic_sims >= semantic_threshold
+    best = (0.0, DEFAULT_THRESHOLDS["ngram"])
+    for threshold in np.arange(0.2, 0.95, 0.01):
+        agreement = float(np.mean((ngram_sims >= threshold) == reference))
+        if agreement > best[0]:
+            best = (agreement, round(float(threshold), 2))
+    return best
+
+
+def summarize(report):
+    lat = np.array(report["latencies"]) * 1000
+    print(f"[{report['mode']}] load {report['load_seconds']:.2f}s, "
+          f"latency p50 {np.percentile(lat, 50):.1f}ms p95 {np.percentile(lat, 95):.1f}ms "
+          f"mean {lat.mean():.1f}ms, peak RSS {report['peak_rss_mb']:.0f}MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ATS scoring modes")
+    parser.add_argument("--resumes", required=True)
+    parser.add_argument("--jds", required=True)
+    parser.add_argument("--worker", choices=["semantic", "ngram"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    resumes, jds = load_corpus(args.resumes, args.jds)
+
+    if args.worker:
+        json.dump(run_mode(args.worker, resumes, jds), sys.stdout)
+        return 0
+
+    reports = {}
+    for mode in ("ngram", "semantic"):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--resumes", args.resumes, "--jds", args.jds,
+             "--worker", mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        reports[mode] = json.loads(out)
+        summarize(reports[mode])
+
+    semantic_sims = np.concatenate([np.array(s, dtype=float) for s in reports["semantic"]["similarities"]])
+    ngram_sims = np.concatenate([np.array(s, dtype=float) for s in reports["ngram"]["similarities"]])
+    print(f"{len(semantic_sims)} of {reports['semantic']['keywords']} JD keywords reached the similarity stage "
+          f"({len(resumes)} resumes x {len(jds)} JDs)")
+    if not len(semantic_sims):
+        print("Nothing to calibrate: every keyword was settled by the prefilter", file=sys.stderr)
+        return 1
+    default_agreement = float(np.mean(
+        (ngram_sims >= DEFAULT_THRESHOLDS["ngram"]) == (semantic_sims >= DEFAULT_THRESHOLDS["semantic"])
+    ))
+    best_agreement, best_threshold = calibrate_threshold(semantic_sims, ngram_sims, DEFAULT_THRESHOLDS["semantic"])
+
+    semantic_scores = np.array(reports["semantic"]["scores"])
+    ngram_scores = np.array(reports["ngram"]["scores"])
+    print(f"Keyword agreement at n-gram threshold {DEFAULT_THRESHOLDS['ngram']}: {default_agreement:.1%}")
+    print(f"Best n-gram threshold {best_threshold}: {best_agreement:.1%} agreement")
+    print(f'To adopt it: DEFAULT_THRESHOLDS["ngram"] = {best_threshold}  # {args.resumes} x {args.jds}: '
+          f"{len(semantic_sims)} compared keywords, {best_agreement:.1%} agreement")
+    print(f"Score MAE {np.abs(semantic_scores - ngram_scores).mean():.1f} points, "
+          f"Pearson r {np.corrcoef(semantic_scores, ngram_scores)[0, 1]:.3f}"
+          if len(semantic_scores) > 1 else
+          f"Score MAE {np.abs(semantic_scores - ngram_scores).mean():.1f} points")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Throughput of the skill-dictionary automaton against the spaCy keyword pass.
+
+    python benchmarks/bench_skill_extractor.py --chars 1000000
+    python benchmarks/bench_skill_extractor.py --resumes resumes/ --jds jds/
+
+Reports automaton compile and cache-load time, then MB/s and keywords found for
+the Aho-Corasick pass, the spaCy noun-chunk/entity pass and both together, over
+synthetic job-description text or a real corpus.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_core import ATSScorer
+from bench_long_texts import synthetic_text
+from bench_scoring_modes import load_corpus
+from skill_extractor import SkillExtractor
+
+
+def time_call(fn, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the skill-dictionary keyword stage")
+    parser.add_argument("--chars", type=int, default=1_000_000, help="Size of the synthetic text")
+    parser.add_argument("--resumes", help="Use a real corpus instead of synthetic text")
+    parser.add_argument("--jds")
+    args = parser.parse_args(argv)
+
+    if args.resumes and args.jds:
+        resumes, jds = load_corpus(args.resumes, args.jds)
+        texts = resumes + jds
+    else:
+        texts = [synthetic_text(args.chars)]
+    mb = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        compile_seconds, _ = time_call(lambda: SkillExtractor.load(cache_dir=None), repeat=1)
+        SkillExtractor.load(cache_dir=cache_dir)
+        load_seconds, extractor = time_call(lambda: SkillExtractor.load(cache_dir=cache_dir), repeat=1)
+    print(f"Automaton over {len(extractor.forms)} surface forms: compile {compile_seconds * 1000:.1f}ms, "
+          f"load from cache {load_seconds * 1000:.1f}ms")
+    print(f"Input: {len(texts)} text(s), {mb:.2f} MB")
+
+    seconds, found = time_call(lambda: [extractor.extract(text) for text in texts])
+    skills = set().union(*found)
+    print(f"{'skills automaton':<18} {mb / seconds:>8.1f} MB/s  {len(skills):>5} distinct keywords")
+
+    for source in ("spacy", "both"):
+        scorer = ATSScorer(keyword_source=source)
+        # Fresh scorer per repeat so the doc cache cannot skip the parse
+        seconds, terms = time_call(lambda: ATSScorer(nlp=scorer.nlp, keyword_source=source)
+                                   .extract_keyword_terms_batch(texts), repeat=1)
+        keywords = set().union(*terms)
+        extra = f", {len(skills - keywords)} skills it misses" if source == "spacy" else ""
+        print(f"{source + ' pass':<18} {mb / seconds:>8.2f} MB/s  {len(keywords):>5} distinct keywords{extra}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
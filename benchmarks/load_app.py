@@ -0,0 +1,296 @@
+"""Simulate concurrent users of the Streamlit app and report per-interaction latency.
+
+    python benchmarks/load_app.py --resume combined_resume.json --jds jds/ --sessions 1,4,16
+
+Each simulated session drives the real ``Fitcheckr.py`` headlessly through
+Streamlit's ``AppTest`` on its own thread, the way the Streamlit server runs
+sessions as threads of one process sharing the ``st.cache_resource`` models.
+A session's flow is: load the page, upload the combined resume JSON, edit the
+first experience entry, analyze a job description and toggle "Show more" on
+the matched keywords; ``--iterations`` repeats the edit/analyze part with the
+next job description.
+
+Every session count runs in a fresh subprocess with a throwaway analysis
+database, so RSS and CPU figures only cover that level. Without ``--resume``
+or ``--jds`` a synthetic resume and job descriptions are used. AppTest runs
+every script under one fixed session id; each driver is given its own, so the
+per-session artifact store, its quota and the speculative slots see independent
+users.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+from batch_score import collect_files
+from memory_governor import current_rss
+
+APP_PATH = os.path.join(REPO_ROOT, "Fitcheckr.py")
+
+SYNTHETIC_RESUME = {
+    "personal_information": [{
+        "name": "Sam Taylor",
+        "email": "sam@example.com",
+        "languages": [{"language": "Python"}, {"language": "SQL"}, {"language": "Go"}],
+        "technologies": [{"technology": "Docker"}, {"technology": "Kubernetes"}, {"technology": "Kafka"}],
+        "certifications": [{"certification": "AWS Certified Developer"}]
+    }],
+    "experience": [{
+        "company": "Acme Analytics",
+        "company_location": "Berlin",
+        "role": "Backend Engineer",
+        "team": "Data Platform",
+        "time_duration": "2021 - Present",
+        "details": [
+            {"title": "Streaming pipeline", "description": "Built Kafka and Spark pipelines processing 2M events per day."},
+            {"title": "Service migration", "description": "Moved Django services to Kubernetes with Terraform."}
+        ]
+    }],
+    "education": [{"school": "TU Berlin", "degree": "MSc Computer Science", "time_period": "2017 - 2019"}],
+    "projects": [{"title": "Resume parser", "description": "spaCy based resume parser with a FastAPI backend."}]
+}
+
+SYNTHETIC_JDS = [
+    "Senior backend engineer. Python, Django and PostgreSQL, Kafka streaming, Docker and Kubernetes on AWS.",
+    "Data engineer. Spark, Airflow and dbt pipelines, SQL warehousing, Terraform infrastructure, Python.",
+    "Platform engineer. Go services, Kubernetes operators, Prometheus monitoring, CI/CD with GitHub Actions.",
+    "Machine learning engineer. PyTorch model training, feature stores, MLOps, Python and SQL, AWS SageMaker.",
+]
+
+
+def load_inputs(resume_path, jds_path):
+    resume = SYNTHETIC_RESUME
+    if resume_path:
+        with open(resume_path, encoding="utf-8") as f:
+            resume = json.load(f)
+    jds = SYNTHETIC_JDS
+    if jds_path:
+        jds = []
+        for path in collect_files(jds_path, (".txt", ".md")):
+            with open(path, encoding="utf-8") as f:
+                jds.append(f.read())
+    return resume, jds
+
+
+def share_script_cache():
+    """Compile the app once for all simulated sessions, as the Streamlit server does.
+
+    AppTest builds a fresh ScriptCache on every run, so each rerun recompiles the
+    script, and concurrent ``ast.parse`` calls from many threads can fail on
+    CPython 3.11 ("AST constructor recursion depth mismatch").
+    """
+    from streamlit.runtime.scriptrunner import script_cache
+
+    shared = script_cache.ScriptCache()
+    lock = threading.Lock()
+    get_bytecode = script_cache.ScriptCache.get_bytecode
+
+    def shared_get_bytecode(self, script_path):
+        with lock:
+            return get_bytecode(shared, script_path)
+
+    script_cache.ScriptCache.get_bytecode = shared_get_bytecode
+
+
+# Session id of the driver running on the current thread
+_driver = threading.local()
+
+
+def distinct_session_ids():
+    """Run each driver's scripts under its own session id instead of AppTest's fixed one"""
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    init = LocalScriptRunner.__init__
+
+    def init_with_session_id(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        # Read by the script's ScriptRunContext and by the uploaded-file manager
+        self._session_id = getattr(_driver, "session_id", self._session_id)
+
+    LocalScriptRunner.__init__ = init_with_session_id
+
+
+class SessionDriver:
+    """One simulated user; records the wall time of each interaction"""
+
+    def __init__(self, index, resume_bytes, jds, mode, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.index = index
+        self.resume_bytes = resume_bytes
+        self.jds = jds
+        self.mode = mode
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.timings = defaultdict(list)
+        self.errors = []
+
+    def timed(self, name, action):
+        start = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            raise RuntimeError(f"{name}: {e!r}") from e
+        self.timings[name].append(time.perf_counter() - start)
+        if self.at.exception:
+            self.errors.append(f"{name}: {self.at.exception[0].message}")
+
+    def select_page(self, page):
+        self.at.sidebar.selectbox[0].select(page).run()
+
+    def button(self, label):
+        return next(b for b in self.at.button if b.label == label)
+
+    def upload(self):
+        """Upload the combined resume JSON through the app's upload page"""
+        if not hasattr(self.at, "file_uploader"):
+            raise RuntimeError("this Streamlit's AppTest cannot drive st.file_uploader; upgrade Streamlit")
+        uploader = self.at.file_uploader(key="upload_combined")
+        uploader.set_value(("combined_resume.json", self.resume_bytes, "application/json"))
+        self.at.run()
+        if not any("Successfully uploaded" in message.value for message in self.at.success):
+            raise RuntimeError("the combined resume JSON was not imported")
+
+    def edit_experience(self, iteration):
+        self.select_page("Experience")
+        role = self.at.text_input(key="role_0")
+        role.input(f"Backend Engineer {self.index}-{iteration}").run()
+
+    def analyze(self, jd_text):
+        self.select_page("ATS Score Analyzer")
+        self.at.text_area[0].input(jd_text)
+        self.at.radio[0].set_value(self.mode)
+        self.button("Analyze ATS Score").click().run()
+
+    def show_more(self):
+        labels = [b.label for b in self.at.button]
+        if "Show more matched keywords" in labels:
+            self.button("Show more matched keywords").click().run()
+        elif "Show less matched keywords" in labels:
+            self.button("Show less matched keywords").click().run()
+        else:
+            self.at.run()
+
+    def run(self, iterations):
+        _driver.session_id = f"load-session-{self.index}"
+        try:
+            self.timed("page load", self.at.run)
+            self.timed("upload resume", self.upload)
+            for iteration in range(iterations):
+                self.timed("edit experience", lambda: self.edit_experience(iteration))
+                jd_text = self.jds[(self.index + iteration) % len(self.jds)]
+                self.timed("analyze ATS score", lambda: self.analyze(jd_text))
+                self.timed("toggle show more", self.show_more)
+        except Exception as e:
+            self.errors.append(str(e))
+
+
+def run_level(sessions, resume, jds, mode, iterations, timeout):
+    """Run ``sessions`` concurrent drivers; called inside the worker subprocess"""
+    resume_bytes = json.dumps(resume).encode("utf-8")
+    share_script_cache()
+    distinct_session_ids()
+    # Keep the saved analyses of simulated users out of the real database
+    os.environ.setdefault("FITCHECKR_DB", os.path.join(tempfile.mkdtemp(prefix="fitcheckr-load-"), "load.db"))
+
+    # Load the shared models before the clock starts, as a warm server would have
+    SessionDriver(-1, resume_bytes, jds, mode, timeout).run(1)
+    rss_before = current_rss()
+    cpu_before = sum(os.times()[:2])
+
+    drivers = [SessionDriver(i, resume_bytes, jds, mode, timeout) for i in range(sessions)]
+    rss_samples = []
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.wait(0.2):
+            rss_samples.append(current_rss())
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=driver.run, args=(iterations,)) for driver in drivers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    done.set()
+
+    timings = defaultdict(list)
+    errors = []
+    for driver in drivers:
+        for name, values in driver.timings.items():
+            timings[name].extend(values)
+        errors.extend(driver.errors)
+    return {
+        "sessions": sessions,
+        "wall_seconds": wall,
+        "cpu_seconds": sum(os.times()[:2]) - cpu_before,
+        "rss_before_mb": rss_before / 2**20,
+        "rss_peak_mb": max(rss_samples + [current_rss()]) / 2**20,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "timings": timings,
+        "errors": errors[:10],
+    }
+
+
+def summarize(report):
+    cores = os.cpu_count() or 1
+    cpu_pct = report["cpu_seconds"] / report["wall_seconds"] * 100 if report["wall_seconds"] else 0
+    print(f"\n== {report['sessions']} concurrent session(s): wall {report['wall_seconds']:.1f}s, "
+          f"CPU {cpu_pct:.0f}% ({cpu_pct / cores:.0f}% of {cores} cores), "
+          f"RSS {report['rss_before_mb']:.0f} -> {report['rss_peak_mb']:.0f}MB")
+    print(f"{'interaction':<20} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, values in report["timings"].items():
+        ms = np.array(values) * 1000
+        print(f"{name:<20} {len(ms):>5} {np.percentile(ms, 50):>9.0f} {np.percentile(ms, 95):>9.0f} "
+              f"{np.percentile(ms, 99):>9.0f}")
+    for error in report["errors"]:
+        print(f"  error: {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the Streamlit app")
+    parser.add_argument("--resume", help="Combined resume JSON to upload (default: synthetic)")
+    parser.add_argument("--jds", help="Job description .txt file or directory (default: synthetic)")
+    parser.add_argument("--sessions", default="1,4,16", help="Comma-separated concurrent session counts")
+    parser.add_argument("--iterations", type=int, default=3, help="Edit/analyze rounds per session")
+    parser.add_argument("--mode", choices=["semantic", "ngram"], default="semantic")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-run AppTest timeout in seconds")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    resume, jds = load_inputs(args.resume, args.jds)
+
+    if args.worker:
+        json.dump(run_level(args.worker, resume, jds, args.mode, args.iterations, args.timeout), sys.stdout)
+        return 0
+
+    for sessions in [int(n) for n in args.sessions.split(",")]:
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", str(sessions),
+               "--iterations", str(args.iterations), "--mode", args.mode, "--timeout", str(args.timeout)]
+        if args.resume:
+            cmd += ["--resume", args.resume]
+        if args.jds:
+            cmd += ["--jds", args.jds]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"\n== {sessions} session(s) failed:\n{proc.stderr[-2000:]}")
+            continue
+        # Streamlit may log to stdout in bare mode; the report is the last line
+        summarize(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
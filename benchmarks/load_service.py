@@ -0,0 +1,109 @@
+"""Drive ats_service.py with concurrent clients and report latency and throughput.
+
+    python ats_service.py --max-batch-size 32 --max-wait-ms 10 &
+    python benchmarks/load_service.py --resumes resumes/ --jds jds/ --concurrency 1,4,16,64
+
+For each concurrency level, N client threads send /score requests back to back
+until ``--requests`` have completed; client-side p50/p99 latency and throughput
+are printed along with the server's batching counters.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bench_scoring_modes import load_corpus
+
+
+def post_json(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return json.loads(response.read())
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def run_level(base_url, pairs, concurrency, total_requests, mode):
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            i = next(counter)
+            if i >= total_requests:
+                return
+            resume_text, jd_text = pairs[i % len(pairs)]
+            start = time.perf_counter()
+            try:
+                post_json(f"{base_url}/score", {"resume_text": resume_text, "jd_text": jd_text, "mode": mode})
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    lat = np.array(latencies) * 1000
+    return {
+        "concurrency": concurrency,
+        "completed": len(latencies),
+        "errors": len(errors),
+        "p50_ms": float(np.percentile(lat, 50)) if len(lat) else float("nan"),
+        "p99_ms": float(np.percentile(lat, 99)) if len(lat) else float("nan"),
+        "throughput_rps": len(latencies) / elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the ATS scoring service")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--resumes", required=True)
+    parser.add_argument("--jds", required=True)
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--mode", default="semantic")
+    args = parser.parse_args(argv)
+
+    resumes, jds = load_corpus(args.resumes, args.jds)
+    pairs = [(resume_text, jd_text) for resume_text in resumes for jd_text in jds]
+    if not pairs:
+        print("No resumes or job descriptions found.", file=sys.stderr)
+        return 1
+
+    print(f"{'clients':>8} {'done':>6} {'errors':>6} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>8} {'batch':>6}")
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        before = get_json(f"{args.url}/stats")
+        level = run_level(args.url, pairs, concurrency, args.requests, args.mode)
+        after = get_json(f"{args.url}/stats")
+        batches = after["batches"] - before["batches"]
+        mean_batch = (after["requests"] - before["requests"]) / batches if batches else 0
+        print(f"{level['concurrency']:>8} {level['completed']:>6} {level['errors']:>6} "
+              f"{level['p50_ms']:>9.1f} {level['p99_ms']:>9.1f} {level['throughput_rps']:>8.1f} {mean_batch:>6.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
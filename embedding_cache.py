@@ -0,0 +1,137 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def phrase_key(phrase: str) -> int:
+    """Non-zero 64-bit key for a phrase (0 marks an empty shared-memory slot)"""
+    key = int.from_bytes(hashlib.blake2b(phrase.encode("utf-8"), digest_size=8).digest(), "little")
+    return key or 1
+
+
+class LRUEmbeddingCache:
+    """In-process phrase -> normalized embedding cache with LRU eviction"""
+
+    def __init__(self, max_entries: int = 20_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self.last_used = time.monotonic()
+
+    def get_many(self, phrases: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        self.last_used = time.monotonic()
+        with self._lock:
+            for phrase in phrases:
+                vector = self._entries.get(phrase)
+                if vector is not None:
+                    self._entries.move_to_end(phrase)
+                    found[phrase] = vector
+        return found
+
+    def put_many(self, phrases: List[str], vectors: np.ndarray):
+        self.last_used = time.monotonic()
+        with self._lock:
+            for phrase, vector in zip(phrases, vectors):
+                previous = self._entries.pop(phrase, None)
+                if previous is not None:
+                    self._nbytes -= previous.nbytes
+                self._entries[phrase] = vector
+                self._nbytes += vector.nbytes
+            while len(self._entries) > self.max_entries:
+                self._nbytes -= self._entries.popitem(last=False)[1].nbytes
+
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def evict(self, nbytes: Optional[int] = None) -> int:
+        """Drop least recently used entries until ``nbytes`` are freed (None = all)"""
+        freed = 0
+        with self._lock:
+            while self._entries and (nbytes is None or freed < nbytes):
+                freed += self._entries.popitem(last=False)[1].nbytes
+            self._nbytes -= freed
+        return freed
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedEmbeddingCache:
+    """Fixed-size phrase embedding table in POSIX shared memory.
+
+    Create it in the parent before forking and every worker reads and writes the
+    same table. Slots are open-addressed by a 64-bit phrase hash with a short
+    linear probe; when all probed slots are taken the home slot is overwritten.
+    Writes are serialised by a process-shared lock; reads are lock-free and
+    re-check the slot key after copying the vector to detect a concurrent write.
+    """
+
+    PROBES = 8
+
+    def __init__(self, capacity: int, dim: int, dtype=np.float32):
+        self.capacity = capacity
+        self.dim = dim
+        keys_bytes = capacity * 8
+        vectors_bytes = capacity * dim * np.dtype(dtype).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=keys_bytes + vectors_bytes)
+        self._keys = np.ndarray((capacity,), dtype=np.uint64, buffer=self._shm.buf)
+        self._vectors = np.ndarray((capacity, dim), dtype=dtype, buffer=self._shm.buf, offset=keys_bytes)
+        self._keys[:] = 0
+        self._lock = multiprocessing.Lock()
+        self._owner_pid = os.getpid()
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def _slots(self, key: int):
+        home = key % self.capacity
+        return [(home + i) % self.capacity for i in range(self.PROBES)]
+
+    def get_many(self, phrases: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        for phrase in phrases:
+            key = np.uint64(phrase_key(phrase))
+            for slot in self._slots(int(key)):
+                slot_key = self._keys[slot]
+                if slot_key == 0:
+                    break
+                if slot_key == key:
+                    vector = self._vectors[slot].copy()
+                    if self._keys[slot] == key:
+                        found[phrase] = vector
+                    break
+        return found
+
+    def put_many(self, phrases: List[str], vectors: np.ndarray):
+        with self._lock:
+            for phrase, vector in zip(phrases, vectors):
+                key = np.uint64(phrase_key(phrase))
+                slots = self._slots(int(key))
+                target = slots[0]
+                for slot in slots:
+                    if self._keys[slot] in (0, key):
+                        target = slot
+                        break
+                self._keys[target] = 0
+                self._vectors[target] = vector
+                self._keys[target] = key
+
+    def __len__(self):
+        return int(np.count_nonzero(self._keys))
+
+    def close(self):
+        """Detach; the creating process also unlinks the segment"""
+        self._keys = self._vectors = None
+        self._shm.close()
+        if os.getpid() == self._owner_pid:
+            self._shm.unlink()
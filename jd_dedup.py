@@ -0,0 +1,294 @@
+"""Near-duplicate job-description detection with MinHash signatures and an LSH index.
+
+    python jd_dedup.py add jds/ --index jd_index.db
+    python jd_dedup.py query posting.txt --index jd_index.db
+
+Job descriptions are reduced to word 5-gram shingles and a 128-value MinHash
+signature, whose agreement estimates the Jaccard similarity of the shingle sets.
+The index is an SQLite file holding every signature and its LSH band buckets,
+so a lookup only compares signatures that share at least one band and inserts
+stream in without loading the index into memory. Each posting records the
+``canonical_hash`` of the first copy it duplicates, whose compiled analysis
+(e.g. a JD profile) can be reused for it.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ats_store import content_hash
+
+DEFAULT_INDEX_PATH = "jd_index.db"
+DEFAULT_THRESHOLD = 0.9
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS signatures (
+    id INTEGER PRIMARY KEY,
+    jd_hash TEXT NOT NULL UNIQUE,
+    canonical_hash TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    title TEXT,
+    signature BLOB NOT NULL,
+    added_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    signature_id INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, signature_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_signatures_canonical ON signatures(canonical_hash);
+"""
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Word n-grams of the lowercased text; reflowed or re-punctuated copies share them"""
+    tokens = re.findall(r"\w+", text.lower())
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM,
+               false_negative_weight: float = 0.8) -> Tuple[int, int]:
+    """``(bands, rows)`` minimizing weighted false positives and false negatives around ``threshold``.
+
+    A pair with similarity s shares a band with probability 1 - (1 - s^rows)^bands.
+    Candidates are verified against their signatures, so a false positive only
+    costs a comparison while a false negative loses a duplicate; hence the weight.
+    """
+    best, best_error = (num_perm, 1), float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        below = np.linspace(0, threshold, 200)
+        above = np.linspace(threshold, 1, 200)
+        false_positive = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+        false_negative = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+        error = (1 - false_negative_weight) * false_positive + false_negative_weight * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """MinHash signatures from ``num_perm`` universal hash functions over crc32 shingle hashes"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text)), dtype=np.uint64)
+        if not len(hashes):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        # uint64 products wrap; the permutations stay uniform enough for MinHash
+        permuted = (np.outer(hashes, self.a) + self.b) % np.uint64(_MERSENNE_PRIME) & np.uint64(_MAX_HASH)
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return float(np.mean(sig_a == sig_b))
+
+
+class DedupIndex:
+    """Persistent MinHash/LSH index of job descriptions.
+
+    The number of permutations and the band layout are fixed when the index is
+    created (from ``threshold``) and read back from the file afterwards; lookups
+    may still use a different threshold, at the cost of recall far below the
+    one the bands were chosen for.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, threshold: float = DEFAULT_THRESHOLD,
+                 num_perm: int = NUM_PERM):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        if not meta:
+            bands, rows = lsh_params(threshold, num_perm)
+            meta = {"num_perm": num_perm, "bands": bands, "rows": rows, "threshold": threshold, "seed": 1}
+            with self.conn:
+                self.conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                                      [(key, str(value)) for key, value in meta.items()])
+        self.num_perm = int(meta["num_perm"])
+        self.bands = int(meta["bands"])
+        self.rows = int(meta["rows"])
+        self.threshold = float(meta["threshold"])
+        self.hasher = MinHasher(self.num_perm, seed=int(meta["seed"]))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.commit()
+        self.close()
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            bucket = int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True)
+            keys.append((band, bucket))
+        return keys
+
+    def nearest(self, signature: np.ndarray, threshold: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Most similar indexed job description at or above ``threshold``, if any"""
+        threshold = self.threshold if threshold is None else threshold
+        keys = self._band_keys(signature)
+        where = " OR ".join(["(band = ? AND bucket = ?)"] * len(keys))
+        candidate_ids = [row[0] for row in self.conn.execute(
+            f"SELECT DISTINCT signature_id FROM buckets WHERE {where}",
+            [value for key in keys for value in key]
+        )]
+        best = None
+        for start in range(0, len(candidate_ids), 500):
+            batch = candidate_ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT jd_hash, canonical_hash, title, signature FROM signatures "
+                f"WHERE id IN ({','.join('?' * len(batch))})", batch
+            )
+            for jd_hash, canonical_hash, title, blob in rows:
+                similarity = estimate_similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+                if similarity >= threshold and (best is None or similarity > best["similarity"]):
+                    best = {"jd_hash": jd_hash, "canonical_hash": canonical_hash,
+                            "title": title, "similarity": similarity}
+        return best
+
+    def query(self, jd_text: str, threshold: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        return self.nearest(self.hasher.signature(jd_text), threshold)
+
+    def lookup(self, jd_hash: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT jd_hash, canonical_hash, similarity, title FROM signatures WHERE jd_hash = ?", (jd_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"jd_hash": row[0], "canonical_hash": row[1], "similarity": row[2], "title": row[3]}
+
+    def add(self, jd_text: str, title: Optional[str] = None, threshold: Optional[float] = None,
+            commit: bool = True) -> Dict[str, Any]:
+        """Index a job description and report what it duplicates.
+
+        Returns ``jd_hash``, ``canonical_hash`` (the first indexed copy, or the
+        JD itself), ``similarity`` to that copy and ``duplicate``. Re-adding a
+        known text returns its stored entry.
+        """
+        jd_hash = content_hash(jd_text)
+        known = self.lookup(jd_hash)
+        if known is not None:
+            return {**known, "duplicate": known["canonical_hash"] != jd_hash}
+
+        signature = self.hasher.signature(jd_text)
+        match = self.nearest(signature, threshold)
+        canonical_hash = match["canonical_hash"] if match else jd_hash
+        similarity = match["similarity"] if match else 1.0
+        cursor = self.conn.execute(
+            "INSERT INTO signatures (jd_hash, canonical_hash, similarity, title, signature, added_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (jd_hash, canonical_hash, similarity, title, signature.tobytes(), time.time())
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO buckets (band, bucket, signature_id) VALUES (?, ?, ?)",
+            [(band, bucket, cursor.lastrowid) for band, bucket in self._band_keys(signature)]
+        )
+        if commit:
+            self.conn.commit()
+        return {"jd_hash": jd_hash, "canonical_hash": canonical_hash, "similarity": similarity,
+                "title": title, "duplicate": match is not None}
+
+    def add_many(self, items: Iterable[Tuple[str, Optional[str]]], threshold: Optional[float] = None,
+                 commit_every: int = 1000) -> Iterable[Dict[str, Any]]:
+        """Stream ``(jd_text, title)`` pairs into the index, committing every ``commit_every`` inserts"""
+        for count, (jd_text, title) in enumerate(items, 1):
+            yield self.add(jd_text, title=title, threshold=threshold, commit=False)
+            if count % commit_every == 0:
+                self.conn.commit()
+        self.conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        total, canonical = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(canonical_hash = jd_hash), 0) FROM signatures"
+        ).fetchone()
+        return {"postings": total, "distinct": canonical, "duplicates": total - canonical,
+                "bands": self.bands, "rows": self.rows}
+
+
+def read_jds(paths: List[str]) -> Iterable[Tuple[str, str]]:
+    """``(text, name)`` for every .txt/.md file in the given files and directories"""
+    for path in paths:
+        files = [path] if os.path.isfile(path) else sorted(
+            os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith((".txt", ".md"))
+        )
+        for file_path in files:
+            with open(file_path, encoding="utf-8") as f:
+                yield f.read(), os.path.splitext(os.path.basename(file_path))[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detect near-duplicate job descriptions")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Index file")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"Similarity threshold (default: the index's, {DEFAULT_THRESHOLD} for a new index)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add_cmd = sub.add_parser("add", help="Index job descriptions, reporting duplicates")
+    add_cmd.add_argument("jds", nargs="+", help="Job description .txt files or directories")
+    query_cmd = sub.add_parser("query", help="Find the nearest indexed copy without indexing")
+    query_cmd.add_argument("jds", nargs="+")
+    sub.add_parser("stats", help="Print index size and duplicate counts")
+    args = parser.parse_args(argv)
+
+    threshold = args.threshold if args.threshold is not None else DEFAULT_THRESHOLD
+    with DedupIndex(args.index, threshold=threshold) as index:
+        if args.command == "stats":
+            print(index.stats())
+        elif args.command == "query":
+            for jd_text, name in read_jds(args.jds):
+                match = index.query(jd_text, args.threshold)
+                print(f"{name}: " + (f"near-duplicate of {match['title'] or match['jd_hash']} "
+                                     f"({match['similarity']:.2f})" if match else "no near-duplicate"))
+        else:
+            start = time.perf_counter()
+            added = duplicates = 0
+            for entry in index.add_many(read_jds(args.jds), threshold=args.threshold):
+                added += 1
+                if entry["duplicate"]:
+                    duplicates += 1
+                    print(f"{entry['title']}: duplicate of {entry['canonical_hash'][:12]} ({entry['similarity']:.2f})")
+            elapsed = time.perf_counter() - start
+            print(f"Indexed {added} job descriptions ({duplicates} near-duplicates) "
+                  f"in {elapsed:.1f}s; bands={index.bands} rows={index.rows}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
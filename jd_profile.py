@@ -0,0 +1,190 @@
+"""Compiled job-description profiles: the JD side of a score, computed once and saved.
+
+    python jd_profile.py compile jd.txt --out profiles/ [--keywords skills]
+    python jd_profile.py show profiles/<jd_hash>.jdp
+
+A profile holds the TF-IDF keywords and weights, their lemmas and the
+normalized keyword embedding matrix, and records the keyword source they were
+extracted with: a profile is only reused by a scorer with the same source.
+``.jdp`` files are a fixed magic, a JSON header and the float32 matrix at a
+64-byte aligned offset, so ``load`` maps the matrix with ``np.memmap`` instead
+of reading it.
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ats_core import ATSScorer, EMBEDDER_MODEL, KEYWORD_SOURCES
+from ats_store import content_hash
+
+MAGIC = b"FCKJDP01"
+_ALIGN = 64
+PROFILE_SUFFIX = ".jdp"
+
+
+class JDProfile:
+    """Weighted JD keywords with their lemmas and (optionally) normalized embeddings"""
+
+    def __init__(self, jd_hash: str, keywords: List[str], weights: List[float], lemmas: List[str],
+                 embeddings: Optional[np.ndarray] = None, model: Optional[str] = None,
+                 title: str = "", created_at: Optional[float] = None, keyword_source: str = "spacy"):
+        self.jd_hash = jd_hash
+        self.keywords = keywords
+        self.weights = weights
+        self.lemmas = lemmas
+        self.embeddings = embeddings
+        self.model = model
+        self.title = title
+        self.created_at = created_at if created_at is not None else time.time()
+        self.keyword_source = keyword_source
+
+    def weighted_keywords(self) -> List[Tuple[str, float]]:
+        return list(zip(self.keywords, self.weights))
+
+    def header(self) -> Dict[str, Any]:
+        return {
+            "jd_hash": self.jd_hash,
+            "title": self.title,
+            "created_at": self.created_at,
+            "model": self.model,
+            "keyword_source": self.keyword_source,
+            "keywords": self.keywords,
+            "weights": self.weights,
+            "lemmas": self.lemmas,
+            "shape": list(self.embeddings.shape) if self.embeddings is not None else None,
+        }
+
+    def save(self, path: str):
+        header = json.dumps(self.header(), ensure_ascii=False).encode("utf-8")
+        offset = len(MAGIC) + 8 + len(header)
+        padding = -offset % _ALIGN
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(b"\0" * padding)
+            if self.embeddings is not None:
+                f.write(np.ascontiguousarray(self.embeddings, dtype="<f4").tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "JDProfile":
+        """Read the header and memory-map the embedding matrix"""
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a compiled JD profile")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        offset = len(MAGIC) + 8 + header_len
+        offset += -offset % _ALIGN
+
+        embeddings = None
+        if header["shape"] and header["shape"][0]:
+            embeddings = np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=tuple(header["shape"]))
+        return cls(
+            header["jd_hash"], header["keywords"], header["weights"], header["lemmas"],
+            embeddings=embeddings, model=header["model"], title=header["title"],
+            created_at=header["created_at"], keyword_source=header.get("keyword_source", "spacy")
+        )
+
+
+def compile_jd_profile(scorer: ATSScorer, jd_text: str, title: Optional[str] = None,
+                       embed: bool = True) -> JDProfile:
+    """Extract, lemmatize and (with ``embed``) encode the JD keywords once"""
+    weighted = scorer.jd_keywords(jd_text)
+    keywords = [kw for kw, _ in weighted]
+    embeddings = scorer.encode_phrases(keywords).astype(np.float32) if embed and keywords else None
+    return JDProfile(
+        content_hash(jd_text),
+        keywords,
+        [float(weight) for _, weight in weighted],
+        scorer.lemmatize_terms(keywords) if keywords else [],
+        embeddings=embeddings,
+        model=EMBEDDER_MODEL if embeddings is not None else None,
+        title=title if title is not None else jd_text.strip().split("\n", 1)[0][:120],
+        keyword_source=scorer.keyword_source
+    )
+
+
+class ProfileLibrary:
+    """Directory of compiled profiles, one file per job description and keyword source.
+
+    spaCy profiles are ``<jd_hash>.jdp``; other sources add the source name,
+    e.g. ``<jd_hash>.skills.jdp``.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, jd_hash: str, keyword_source: str = "spacy") -> str:
+        if keyword_source not in KEYWORD_SOURCES:
+            raise ValueError(f"Unknown keyword source: {keyword_source}")
+        name = jd_hash if keyword_source == "spacy" else f"{jd_hash}.{keyword_source}"
+        return os.path.join(self.directory, name + PROFILE_SUFFIX)
+
+    def get(self, jd_hash: str, keyword_source: str = "spacy") -> Optional[JDProfile]:
+        """The saved profile, or None if there is none compiled with ``keyword_source``"""
+        path = self.path_for(jd_hash, keyword_source)
+        if not os.path.exists(path):
+            return None
+        profile = JDProfile.load(path)
+        return profile if profile.keyword_source == keyword_source else None
+
+    def save(self, profile: JDProfile) -> str:
+        path = self.path_for(profile.jd_hash, profile.keyword_source)
+        profile.save(path)
+        return path
+
+    def get_or_compile(self, scorer: ATSScorer, jd_text: str, embed: bool = True) -> JDProfile:
+        profile = self.get(content_hash(jd_text), scorer.keyword_source)
+        if profile is None or (embed and profile.embeddings is None):
+            profile = compile_jd_profile(scorer, jd_text, embed=embed)
+            self.save(profile)
+        return profile
+
+    def list(self) -> List[str]:
+        return sorted(name[:-len(PROFILE_SUFFIX)] for name in os.listdir(self.directory)
+                      if name.endswith(PROFILE_SUFFIX))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile and inspect JD profiles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compile_cmd = sub.add_parser("compile", help="Compile job description files into profiles")
+    compile_cmd.add_argument("jds", nargs="+", help="Job description .txt files")
+    compile_cmd.add_argument("--out", required=True, help="Profile directory")
+    compile_cmd.add_argument("--no-embed", action="store_true", help="Skip embeddings (n-gram mode only)")
+    compile_cmd.add_argument("--keywords", choices=KEYWORD_SOURCES, default="spacy",
+                             help="Keyword source the profile is compiled (and later used) with")
+    show_cmd = sub.add_parser("show", help="Print a profile's header")
+    show_cmd.add_argument("profile")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        profile = JDProfile.load(args.profile)
+        shape = profile.embeddings.shape if profile.embeddings is not None else None
+        print(f"{profile.jd_hash}  {profile.title!r}  keywords={profile.keyword_source}  "
+              f"model={profile.model}  embeddings={shape}")
+        for keyword, weight in profile.weighted_keywords():
+            print(f"  {weight:.3f}  {keyword}")
+        return 0
+
+    scorer = ATSScorer(keyword_source=args.keywords)
+    library = ProfileLibrary(args.out)
+    for path in args.jds:
+        with open(path, encoding="utf-8") as f:
+            profile = compile_jd_profile(scorer, f.read(), embed=not args.no_embed)
+        print(f"{path} -> {library.save(profile)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
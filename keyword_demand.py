@@ -0,0 +1,303 @@
+"""Keyword demand across every processed job description, aggregated per time bucket.
+
+    python keyword_demand.py top --days 30 -n 20
+    python keyword_demand.py trend kubernetes "machine learning" --months 6
+    python keyword_demand.py add jds/            # backfill from job description files
+    python keyword_demand.py compact
+
+Each distinct job description adds one posting and its keyword weight to every
+keyword it asks for, in the (UTC) day it was first seen; the same JD analysed again
+within a month counts once. Daily buckets older than ``DAILY_RETENTION_DAYS`` are
+merged into monthly buckets as new JDs arrive, so the index grows with the distinct
+keywords per month rather than with the number of JDs, and top-N and trend queries
+never touch raw JD text. Windows reaching into compacted months count those months
+whole.
+"""
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DEMAND_PATH = "keyword_demand.db"
+DAILY_RETENTION_DAYS = 62
+DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS demand (
+    bucket TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    postings INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    PRIMARY KEY (bucket, keyword)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_demand_keyword ON demand(keyword, bucket);
+
+CREATE TABLE IF NOT EXISTS bucket_totals (
+    bucket TEXT PRIMARY KEY,
+    postings INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS seen (
+    month TEXT NOT NULL,
+    jd_hash TEXT NOT NULL,
+    PRIMARY KEY (month, jd_hash)
+) WITHOUT ROWID;
+"""
+
+# Buckets are 'YYYY-MM-DD' (daily) or 'YYYY-MM' (compacted); a range over either kind
+_BUCKET_RANGE = ("((length(bucket) = 10 AND bucket >= ? AND bucket <= ?) OR "
+                 "(length(bucket) = 7 AND bucket >= ? AND bucket <= ?))")
+
+
+def day_bucket(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d")
+
+
+def normalize_keyword(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+def month_range(timestamp: float, months: int) -> List[str]:
+    """The ``months`` calendar months ending with the one containing ``timestamp``, oldest first"""
+    date = datetime.fromtimestamp(timestamp, timezone.utc)
+    index = date.year * 12 + date.month - 1
+    return [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(index - months + 1, index + 1)]
+
+
+class KeywordDemandIndex:
+    """Per-bucket keyword posting counts and weights in SQLite, safe to share between threads"""
+
+    def __init__(self, path: str = DEFAULT_DEMAND_PATH, retention_days: int = DAILY_RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self._local = threading.local()
+        self._compacted_day = None
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _cutoff(self, now: float) -> str:
+        """Oldest day still kept as a daily bucket"""
+        return day_bucket(now - self.retention_days * DAY)
+
+    def record(self, jd_hash: str, weighted_keywords: Iterable[Tuple[str, float]],
+               when: Optional[float] = None) -> bool:
+        """Add one job description's keywords; False if it was already counted this month"""
+        now = time.time()
+        when = now if when is None else when
+        day = day_bucket(when)
+        bucket = day if day >= self._cutoff(now) else day[:7]
+
+        merged: Dict[str, float] = {}
+        for keyword, weight in weighted_keywords:
+            keyword = normalize_keyword(keyword)
+            if keyword:
+                merged[keyword] = merged.get(keyword, 0.0) + float(weight)
+
+        conn = self.connection
+        with conn:
+            cur = conn.execute("INSERT OR IGNORE INTO seen (month, jd_hash) VALUES (?, ?)", (day[:7], jd_hash))
+            if not cur.rowcount:
+                return False
+            conn.executemany(
+                "INSERT INTO demand (bucket, keyword, postings, weight) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT(bucket, keyword) DO UPDATE SET postings = postings + 1, weight = weight + excluded.weight",
+                [(bucket, keyword, weight) for keyword, weight in merged.items()]
+            )
+            conn.execute(
+                "INSERT INTO bucket_totals (bucket, postings) VALUES (?, 1) "
+                "ON CONFLICT(bucket) DO UPDATE SET postings = postings + 1",
+                (bucket,)
+            )
+        # Compaction runs on the first record of each day
+        today = day_bucket(now)
+        if self._compacted_day != today:
+            self.compact(now)
+            self._compacted_day = today
+        return True
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Merge daily buckets past the retention window into monthly ones; returns the rows merged"""
+        cutoff = self._cutoff(time.time() if now is None else now)
+        conn = self.connection
+        with conn:
+            merged = conn.execute(
+                "SELECT COUNT(*) FROM demand WHERE length(bucket) = 10 AND bucket < ?", (cutoff,)
+            ).fetchone()[0]
+            if not merged:
+                return 0
+            conn.execute(
+                "INSERT INTO demand (bucket, keyword, postings, weight) "
+                "SELECT substr(bucket, 1, 7), keyword, SUM(postings), SUM(weight) FROM demand "
+                "WHERE length(bucket) = 10 AND bucket < ? GROUP BY substr(bucket, 1, 7), keyword "
+                "ON CONFLICT(bucket, keyword) DO UPDATE SET "
+                "postings = postings + excluded.postings, weight = weight + excluded.weight",
+                (cutoff,)
+            )
+            conn.execute("DELETE FROM demand WHERE length(bucket) = 10 AND bucket < ?", (cutoff,))
+            conn.execute(
+                "INSERT INTO bucket_totals (bucket, postings) "
+                "SELECT substr(bucket, 1, 7), SUM(postings) FROM bucket_totals "
+                "WHERE length(bucket) = 10 AND bucket < ? GROUP BY substr(bucket, 1, 7) "
+                "ON CONFLICT(bucket) DO UPDATE SET postings = postings + excluded.postings",
+                (cutoff,)
+            )
+            conn.execute("DELETE FROM bucket_totals WHERE length(bucket) = 10 AND bucket < ?", (cutoff,))
+            # Months that no longer take new daily records need no duplicate check
+            conn.execute("DELETE FROM seen WHERE month < ?", (cutoff[:7],))
+        return merged
+
+    def _window(self, days: float, now: Optional[float], offset: int = 0) -> List[str]:
+        """Range parameters for the ``days`` ending ``offset`` windows before ``now``"""
+        now = time.time() if now is None else now
+        end = now - offset * days * DAY
+        first, last = day_bucket(end - (days - 1) * DAY), day_bucket(end)
+        return [first, last, first[:7], last[:7]]
+
+    def total_postings(self, days: float = 30, now: Optional[float] = None, offset: int = 0) -> int:
+        return self.connection.execute(
+            f"SELECT COALESCE(SUM(postings), 0) FROM bucket_totals WHERE {_BUCKET_RANGE}",
+            self._window(days, now, offset)
+        ).fetchone()[0]
+
+    def top(self, n: int = 20, days: float = 30, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """The ``n`` keywords asked for by the most job descriptions in the last ``days``"""
+        total = self.total_postings(days, now)
+        rows = self.connection.execute(
+            f"SELECT keyword, SUM(postings) AS postings, SUM(weight) AS weight FROM demand "
+            f"WHERE {_BUCKET_RANGE} GROUP BY keyword ORDER BY postings DESC, weight DESC LIMIT ?",
+            self._window(days, now) + [n]
+        ).fetchall()
+        return [{"keyword": keyword, "postings": postings, "weight": round(weight, 3),
+                 "share": postings / total if total else 0.0} for keyword, postings, weight in rows]
+
+    def demand(self, keywords: List[str], days: float = 30,
+               now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Postings and share of JDs asking for each keyword in the last ``days`` and the ``days`` before"""
+        normalized = {keyword: normalize_keyword(keyword) for keyword in keywords}
+        unique = list(dict.fromkeys(normalized.values()))
+        counts = {}
+        for offset in (0, 1):
+            total = self.total_postings(days, now, offset)
+            found = dict(self.connection.execute(
+                f"SELECT keyword, SUM(postings) FROM demand WHERE keyword IN ({','.join('?' * len(unique))}) "
+                f"AND {_BUCKET_RANGE} GROUP BY keyword",
+                unique + self._window(days, now, offset)
+            ).fetchall()) if unique else {}
+            counts[offset] = (total, found)
+
+        (total, current), (previous_total, previous) = counts[0], counts[1]
+        return {
+            keyword: {
+                "postings": current.get(key, 0),
+                "share": current.get(key, 0) / total if total else 0.0,
+                "previous_share": previous.get(key, 0) / previous_total if previous_total else 0.0,
+            }
+            for keyword, key in normalized.items()
+        }
+
+    def trend(self, keywords: List[str], months: int = 6,
+              now: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Monthly postings and share of JDs for each keyword over the last ``months``, zero-filled"""
+        month_list = month_range(time.time() if now is None else now, months)
+        normalized = {keyword: normalize_keyword(keyword) for keyword in keywords}
+        unique = list(dict.fromkeys(normalized.values()))
+        totals = dict(self.connection.execute(
+            "SELECT substr(bucket, 1, 7) AS month, SUM(postings) FROM bucket_totals "
+            "WHERE bucket >= ? GROUP BY month", (month_list[0],)
+        ).fetchall())
+        counts: Dict[Tuple[str, str], int] = {}
+        if unique:
+            for keyword, month, postings in self.connection.execute(
+                f"SELECT keyword, substr(bucket, 1, 7) AS month, SUM(postings) FROM demand "
+                f"WHERE keyword IN ({','.join('?' * len(unique))}) AND bucket >= ? GROUP BY keyword, month",
+                unique + [month_list[0]]
+            ):
+                counts[(keyword, month)] = postings
+        return {
+            keyword: [
+                {"month": month, "postings": counts.get((key, month), 0),
+                 "share": counts.get((key, month), 0) / totals[month] if totals.get(month) else 0.0}
+                for month in month_list
+            ]
+            for keyword, key in normalized.items()
+        }
+
+    def stats(self) -> Dict[str, int]:
+        conn = self.connection
+        keywords, rows = conn.execute("SELECT COUNT(DISTINCT keyword), COUNT(*) FROM demand").fetchone()
+        daily, monthly, postings = conn.execute(
+            "SELECT COALESCE(SUM(length(bucket) = 10), 0), COALESCE(SUM(length(bucket) = 7), 0), "
+            "COALESCE(SUM(postings), 0) FROM bucket_totals"
+        ).fetchone()
+        return {"postings": postings, "keywords": keywords, "rows": rows,
+                "daily_buckets": daily, "monthly_buckets": monthly}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and maintain the keyword demand index")
+    parser.add_argument("--index", default=DEFAULT_DEMAND_PATH, help="Index file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    top_cmd = sub.add_parser("top", help="Most requested keywords in a recent window")
+    top_cmd.add_argument("-n", type=int, default=20)
+    top_cmd.add_argument("--days", type=float, default=30)
+    trend_cmd = sub.add_parser("trend", help="Monthly share of job descriptions asking for keywords")
+    trend_cmd.add_argument("keywords", nargs="+")
+    trend_cmd.add_argument("--months", type=int, default=6)
+    add_cmd = sub.add_parser("add", help="Record job description files, extracting their keywords")
+    add_cmd.add_argument("jds", nargs="+", help="Job description .txt files or directories")
+    sub.add_parser("compact", help="Merge daily buckets past the retention window into months")
+    sub.add_parser("stats", help="Print index size")
+    args = parser.parse_args(argv)
+
+    with KeywordDemandIndex(args.index) as index:
+        if args.command == "top":
+            for row in index.top(args.n, args.days):
+                print(f"{row['share']:6.1%}  {row['postings']:6d}  {row['keyword']}")
+        elif args.command == "trend":
+            for keyword, series in index.trend(args.keywords, args.months).items():
+                print(keyword + ": " + "  ".join(f"{point['month']} {point['share']:.1%}" for point in series))
+        elif args.command == "add":
+            from ats_core import ATSScorer
+            from ats_store import content_hash
+            from jd_dedup import read_jds
+            scorer = ATSScorer()
+            added = total = 0
+            for text, _ in read_jds(args.jds):
+                added += index.record(content_hash(text), scorer.jd_keywords(text))
+                total += 1
+            print(f"Recorded {added} of {total} job descriptions ({total - added} already counted this month)")
+        elif args.command == "compact":
+            print(f"Merged {index.compact()} daily rows into monthly buckets")
+        else:
+            for key, value in index.stats().items():
+                print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import ctypes
+import gc
+import os
+import resource
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        # Peak rather than current RSS, but the best portable fallback
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def release_free_memory():
+    """Run the collector and hand freed heap pages back to the OS where glibc allows it"""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class Component:
+    """Something the governor can measure and free.
+
+    ``kind`` is "model" (unloaded whole after an idle period, reloaded by its owner
+    on next use) or "cache" (shrunk in LRU order when over budget). ``release``
+    frees up to the given number of bytes (None = everything) and returns the
+    bytes it freed; ``busy`` says the component must not be released right now.
+    ``housekeeping`` runs at the start of every governor pass, e.g. to expire
+    entries even while nothing else touches the component.
+    """
+
+    def __init__(self, name: str, kind: str, size: Callable[[], int], release: Callable[[Optional[int]], int],
+                 last_used: Callable[[], float], busy: Callable[[], bool] = lambda: False,
+                 housekeeping: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.size = size
+        self.release = release
+        self.last_used = last_used
+        self.busy = busy
+        self.housekeeping = housekeeping
+
+
+class MemoryGovernor:
+    """Unload idle models and evict caches when the process exceeds its memory budget.
+
+    Components register size/release callbacks; a daemon thread calls ``enforce``
+    every ``check_interval`` seconds. Models idle for longer than ``idle_seconds``
+    are unloaded. When RSS exceeds ``budget_bytes`` caches are shrunk, least
+    recently used component first, then idle-but-not-expired models are unloaded.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, idle_seconds: float = 900,
+                 check_interval: float = 30):
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self.check_interval = check_interval
+        self._components: Dict[str, Component] = {}
+        self._lock = threading.RLock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.events: List[Dict[str, Any]] = []
+
+    def register(self, component: Component):
+        with self._lock:
+            self._components[component.name] = component
+
+    def _log(self, action: str, name: str, freed: int):
+        self.events.append({"time": time.time(), "action": action, "component": name, "freed_bytes": freed})
+        del self.events[:-100]
+
+    def enforce(self) -> int:
+        """One governor pass; returns the number of bytes released"""
+        freed_total = 0
+        now = time.monotonic()
+        with self._lock:
+            for component in self._components.values():
+                if component.housekeeping is not None:
+                    try:
+                        component.housekeeping()
+                    except Exception:
+                        self._log("housekeeping failed", component.name, 0)
+
+            components = sorted(self._components.values(), key=lambda c: c.last_used())
+
+            for component in components:
+                if component.kind != "model" or component.busy() or not component.size():
+                    continue
+                if now - component.last_used() >= self.idle_seconds:
+                    freed = component.release(None)
+                    freed_total += freed
+                    self._log("unload idle", component.name, freed)
+
+            if self.budget_bytes is not None:
+                over = current_rss() - self.budget_bytes
+                # Caches first (oldest first), models only if that was not enough
+                for kind in ("cache", "model"):
+                    for component in components:
+                        if over <= 0:
+                            break
+                        if component.kind != kind or component.busy() or not component.size():
+                            continue
+                        freed = component.release(over if kind == "cache" else None)
+                        freed_total += freed
+                        over -= freed
+                        self._log("evict over budget", component.name, freed)
+
+        if freed_total:
+            release_free_memory()
+        return freed_total
+
+    def report(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            components = [
+                {
+                    "component": c.name,
+                    "kind": c.kind,
+                    "bytes": c.size(),
+                    "idle_seconds": round(now - c.last_used(), 1),
+                }
+                for c in self._components.values()
+            ]
+        return {"rss_bytes": current_rss(), "budget_bytes": self.budget_bytes, "components": components}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="memory-governor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.enforce()
+            except Exception:
+                pass
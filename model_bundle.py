@@ -0,0 +1,205 @@
+"""Self-contained local bundle of the spaCy pipeline and the sentence embedder.
+
+    python model_bundle.py create models/              # on a machine with network access
+    python model_bundle.py verify models/ --full
+    FITCHECKR_MODEL_BUNDLE=models/ streamlit run Fitcheckr.py
+
+A bundle is a directory with ``spacy/`` (``nlp.to_disk``), ``embedder/``
+(``SentenceTransformer.save`` with safetensors weights) and ``manifest.json``
+listing the sha256 and size of every file. Loading a bundle switches the
+Hugging Face libraries to offline mode, so startup never touches the network,
+and maps the embedder weights from the safetensors file instead of reading
+them, so processes using the same bundle share the weights in the page cache.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict
+
+MANIFEST_FILE = "manifest.json"
+# Sizes and mtimes of files that passed a full checksum, so later startups can
+# skip re-hashing unchanged files
+VERIFIED_FILE = ".verified.json"
+BUNDLE_FORMAT = 1
+DEFAULT_MODEL_BUNDLE = os.environ.get("FITCHECKR_MODEL_BUNDLE") or None
+# "full" re-hashes every file on each load instead of trusting the size/mtime stamps
+FULL_VERIFY = os.environ.get("FITCHECKR_MODEL_BUNDLE_VERIFY") == "full"
+
+
+def enable_offline():
+    """Make the Hugging Face libraries resolve models from local files only"""
+    for var in ("HF_HUB_OFFLINE", "TRANSFORMERS_OFFLINE", "HF_DATASETS_OFFLINE"):
+        os.environ[var] = "1"
+    # huggingface_hub reads the variable once at import
+    if "huggingface_hub" in sys.modules:
+        from huggingface_hub import constants
+        constants.HF_HUB_OFFLINE = True
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def create_bundle(directory: str, embedder_model: str, spacy_model: str = "en_core_web_sm") -> Dict[str, Any]:
+    """Save both models under ``directory`` and write the checksum manifest"""
+    import importlib
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(directory, exist_ok=True)
+    # Installed pipeline package, loaded the way ats_core loads it
+    importlib.import_module(spacy_model).load().to_disk(os.path.join(directory, "spacy"))
+    SentenceTransformer(embedder_model, device="cpu").save(os.path.join(directory, "embedder"),
+                                                           safe_serialization=True)
+
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, directory)
+            if relpath in (MANIFEST_FILE, VERIFIED_FILE):
+                continue
+            files[relpath] = {"sha256": file_sha256(path), "size": os.path.getsize(path)}
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "created_at": time.time(),
+        "embedder": {"model": embedder_model, "path": "embedder"},
+        "spacy": {"model": spacy_model, "path": "spacy"},
+        "files": files,
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def verify_bundle(directory: str, full: bool = False) -> Dict[str, Any]:
+    """Check every manifest file's checksum; returns the manifest or raises ``ValueError``.
+
+    Without ``full``, files whose size and mtime match the last successful
+    check are trusted, so a verified bundle costs a few ``stat`` calls; any
+    other file is re-hashed. The stamps are only a fast path against accidental
+    changes (a file rewritten with its old size and mtime passes), so use
+    ``full`` where the bundle directory itself is not trusted.
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"{directory}: unsupported bundle format {manifest.get('format')}")
+
+    verified_path = os.path.join(directory, VERIFIED_FILE)
+    verified = {}
+    if not full and os.path.exists(verified_path):
+        try:
+            with open(verified_path, encoding="utf-8") as f:
+                verified = json.load(f)
+        except (OSError, ValueError):
+            verified = {}
+
+    stamps = {}
+    for relpath, expected in manifest["files"].items():
+        path = os.path.join(directory, relpath)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise ValueError(f"{directory}: missing {relpath}") from None
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        if verified.get(relpath) != stamp:
+            if stat.st_size != expected["size"] or file_sha256(path) != expected["sha256"]:
+                raise ValueError(f"{directory}: checksum mismatch for {relpath}")
+        stamps[relpath] = stamp
+
+    if stamps != verified:
+        try:
+            with open(verified_path, "w", encoding="utf-8") as f:
+                json.dump(stamps, f)
+        except OSError:
+            # Read-only bundles are simply re-hashed on every start
+            pass
+    return manifest
+
+
+class ModelBundle:
+    """Loads the models of a verified bundle without network access"""
+
+    def __init__(self, directory: str, verify: bool = True, full_verify: bool = FULL_VERIFY):
+        self.directory = directory
+        if verify:
+            self.manifest = verify_bundle(directory, full=full_verify)
+        else:
+            with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self.embedder_model = self.manifest["embedder"]["model"]
+        enable_offline()
+
+    def load_nlp(self):
+        import spacy
+        return spacy.load(os.path.join(self.directory, self.manifest["spacy"]["path"]))
+
+    def load_embedder(self):
+        from safetensors import safe_open
+        from sentence_transformers import SentenceTransformer
+
+        path = os.path.join(self.directory, self.manifest["embedder"]["path"])
+        embedder = SentenceTransformer(path, device="cpu", local_files_only=True)
+        # Re-point the parameters at tensors mapped from the weights file, whatever
+        # copy the loader made; unchanged pages are then shared between processes
+        weights_path = os.path.join(path, "model.safetensors")
+        transformer = embedder[0].auto_model
+        with safe_open(weights_path, framework="pt", device="cpu") as f:
+            tensors = {name: f.get_tensor(name) for name in f.keys()}
+        prefix = getattr(transformer, "base_model_prefix", "") + "."
+        own_keys = set(transformer.state_dict())
+        state, unexpected = {}, []
+        for name, tensor in tensors.items():
+            if name not in own_keys and name.startswith(prefix) and name[len(prefix):] in own_keys:
+                name = name[len(prefix):]
+            if name in own_keys:
+                state[name] = tensor
+            else:
+                unexpected.append(name)
+        # strict=False only so every mismatch is reported at once, not just the first
+        result = transformer.load_state_dict(state, strict=False, assign=True)
+        unexpected += result.unexpected_keys
+        if result.missing_keys or unexpected:
+            raise ValueError(f"{weights_path} does not match the embedder: "
+                             f"missing {sorted(result.missing_keys)}, unexpected {sorted(unexpected)}")
+        return embedder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create and verify offline model bundles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create_cmd = sub.add_parser("create", help="Save the spaCy pipeline and embedder into a bundle")
+    create_cmd.add_argument("directory")
+    create_cmd.add_argument("--spacy-model", default="en_core_web_sm")
+    verify_cmd = sub.add_parser("verify", help="Check the bundle's checksums")
+    verify_cmd.add_argument("directory")
+    verify_cmd.add_argument("--full", action="store_true", help="Re-hash every file, even if unchanged")
+    args = parser.parse_args(argv)
+
+    if args.command == "create":
+        from ats_core import EMBEDDER_MODEL
+        manifest = create_bundle(args.directory, EMBEDDER_MODEL, args.spacy_model)
+        size = sum(entry["size"] for entry in manifest["files"].values())
+        print(f"Wrote {len(manifest['files'])} files ({size / 2**20:.1f} MB) to {args.directory}")
+        return 0
+
+    start = time.perf_counter()
+    try:
+        manifest = verify_bundle(args.directory, full=args.full)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"OK: {len(manifest['files'])} files verified in {(time.perf_counter() - start) * 1000:.0f}ms "
+          f"(embedder {manifest['embedder']['model']}, spaCy {manifest['spacy']['model']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import os
+from typing import Dict, List, Any
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+RESULTS_FILE = "results.parquet"
+KEYWORDS_FILE = "keywords.parquet"
+
+RESULTS_SCHEMA = pa.schema([
+    ("resume_id", pa.string()),
+    ("jd_id", pa.string()),
+    ("score", pa.float32()),
+    ("match_percentage", pa.float32()),
+    ("total_keywords", pa.int32()),
+    ("matched_count", pa.int32()),
+    ("missing_count", pa.int32()),
+])
+
+KEYWORDS_SCHEMA = pa.schema([
+    ("resume_id", pa.dictionary(pa.int32(), pa.string())),
+    ("jd_id", pa.dictionary(pa.int32(), pa.string())),
+    ("keyword", pa.dictionary(pa.int32(), pa.string())),
+    ("matched", pa.bool_()),
+    ("score", pa.float32()),
+    ("weight", pa.float32()),
+])
+
+
+class ParquetResultSink:
+    """Incrementally write ATS results to two Parquet files.
+
+    ``results.parquet`` holds one row per resume x JD pair, ``keywords.parquet``
+    holds the exploded matched/missing keyword lists. Rows are buffered column-wise
+    and flushed as a row group whenever ``row_group_size`` rows are pending, so memory
+    stays bounded no matter how many results are written.
+
+        with ParquetResultSink("out/") as sink:
+            sink.write("resume-1", "jd-42", scorer.calculate_ats_score(resume_text, jd_text))
+
+        pd.read_parquet("out/keywords.parquet", filters=[("matched", "==", False)])
+    """
+
+    def __init__(self, out_dir: str, row_group_size: int = 100_000, compression: str = "zstd"):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.row_group_size = row_group_size
+        self._results_writer = pq.ParquetWriter(os.path.join(out_dir, RESULTS_FILE), RESULTS_SCHEMA,
+                                                compression=compression)
+        self._keywords_writer = pq.ParquetWriter(os.path.join(out_dir, KEYWORDS_FILE), KEYWORDS_SCHEMA,
+                                                 compression=compression)
+        self._results = self._empty_columns(RESULTS_SCHEMA)
+        self._keywords = self._empty_columns(KEYWORDS_SCHEMA)
+        self.rows_written = 0
+        self.keyword_rows_written = 0
+
+    @staticmethod
+    def _empty_columns(schema: pa.Schema) -> Dict[str, List[Any]]:
+        return {name: [] for name in schema.names}
+
+    def write(self, resume_id: str, jd_id: str, result: Dict[str, Any]):
+        """Buffer one ``calculate_ats_score`` result"""
+        rows = self._results
+        rows["resume_id"].append(resume_id)
+        rows["jd_id"].append(jd_id)
+        rows["score"].append(result["score"])
+        rows["match_percentage"].append(result["match_percentage"])
+        rows["total_keywords"].append(result["total_keywords"])
+        rows["matched_count"].append(result["matched_count"])
+        rows["missing_count"].append(len(result["missing_keywords"]))
+
+        kw_rows = self._keywords
+        for matched, items in ((True, result["matched_keywords"]), (False, result["missing_keywords"])):
+            for item in items:
+                kw_rows["resume_id"].append(resume_id)
+                kw_rows["jd_id"].append(jd_id)
+                kw_rows["keyword"].append(item["keyword"])
+                kw_rows["matched"].append(matched)
+                kw_rows["score"].append(item["score"])
+                kw_rows["weight"].append(item["weight"])
+
+        if len(rows["resume_id"]) >= self.row_group_size:
+            self._flush_results()
+        if len(kw_rows["keyword"]) >= self.row_group_size:
+            self._flush_keywords()
+
+    def _flush_results(self):
+        if not self._results["resume_id"]:
+            return
+        table = pa.Table.from_pydict(self._results, schema=RESULTS_SCHEMA)
+        self._results_writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows_written += table.num_rows
+        self._results = self._empty_columns(RESULTS_SCHEMA)
+
+    def _flush_keywords(self):
+        if not self._keywords["keyword"]:
+            return
+        table = pa.Table.from_pydict(self._keywords, schema=KEYWORDS_SCHEMA)
+        self._keywords_writer.write_table(table, row_group_size=self.row_group_size)
+        self.keyword_rows_written += table.num_rows
+        self._keywords = self._empty_columns(KEYWORDS_SCHEMA)
+
+    def flush(self):
+        """Write any buffered rows as a (possibly short) row group"""
+        self._flush_results()
+        self._flush_keywords()
+
+    def close(self):
+        self.flush()
+        self._results_writer.close()
+        self._keywords_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,271 @@
+"""Two-stage retrieval of the best resumes in a corpus for a job description.
+
+    python resume_index.py build resumes/ --out resume_index/
+    python resume_index.py search jd.txt --index resume_index/ --top 20 --candidates 300
+    python resume_index.py evaluate jds/ --index resume_index/ --k 10,50 --candidates 100,300
+
+``build`` extracts every resume's keywords once and stores, as ``.npy`` files
+that are memory-mapped on load:
+
+- skill-level: the embedding of each distinct resume keyword (the most common
+  ``--max-skills``) and a skill -> resumes inverted index;
+- resume-level: the normalized mean of each resume's keyword embeddings.
+
+Stage one approximates the ATS score of every resume from the index alone: a
+JD keyword counts as present in all resumes holding a skill that equals it
+(normalized or lemmatized) or whose embedding is within the match threshold
+(minus a recall margin). Ties are broken by resume-level cosine. Stage two runs
+the exact ``calculate_ats_scores`` on the shortlist only. ``evaluate`` reports
+recall@k of the two-stage ranking against exhaustive exact scoring.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from ats_core import (ATSScorer, DEFAULT_THRESHOLDS, EMBEDDER_MODEL, SCORING_MODES, normalize_term,
+                      resume_text_from_combined)
+
+DEFAULT_CANDIDATES = 300
+DEFAULT_MAX_SKILLS = 200_000
+# Stage one matches skills slightly below the scoring threshold so borderline
+# keywords still reach the exact stage
+RECALL_MARGIN = 0.05
+_TIE_BREAK = 1e-3
+
+
+def read_resumes(path: str) -> Iterable[Tuple[str, str]]:
+    """``(resume_id, path)`` for a combined resume JSON file or a directory of them"""
+    if os.path.isfile(path):
+        files = [path]
+    else:
+        files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(".json"))
+    for file_path in files:
+        yield os.path.splitext(os.path.basename(file_path))[0], os.path.abspath(file_path)
+
+
+def load_resume_text(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return resume_text_from_combined(json.load(f))
+
+
+class ResumeIndex:
+    """Skill- and resume-level embedding index over a resume corpus, loaded from ``directory``"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.model = meta["model"]
+        self.resumes: List[Tuple[str, str]] = [tuple(entry) for entry in meta["resumes"]]
+        self.skills: List[str] = meta["skills"]
+        self.skill_vectors = np.load(os.path.join(directory, "skill_vectors.npy"), mmap_mode="r")
+        self.resume_vectors = np.load(os.path.join(directory, "resume_vectors.npy"), mmap_mode="r")
+        skill_resumes = np.load(os.path.join(directory, "skill_resumes.npy"))
+        self.postings = sparse.csc_matrix(
+            (np.ones(len(skill_resumes), dtype=np.float32), skill_resumes,
+             np.load(os.path.join(directory, "skill_indptr.npy"))),
+            shape=(len(self.resumes), len(self.skills))
+        )
+        self.exact: Dict[str, List[int]] = {}
+        for skill_id, (skill, lemma) in enumerate(zip(self.skills, meta["lemmas"])):
+            for key in {normalize_term(skill), normalize_term(lemma)}:
+                self.exact.setdefault(key, []).append(skill_id)
+
+    @classmethod
+    def build(cls, scorer: ATSScorer, resumes: Iterable[Tuple[str, str]], directory: str,
+              max_skills: int = DEFAULT_MAX_SKILLS, batch_size: int = 256) -> "ResumeIndex":
+        """Index ``(resume_id, path)`` pairs, parsing ``batch_size`` resumes per ``nlp.pipe`` call"""
+        os.makedirs(directory, exist_ok=True)
+        entries = list(resumes)
+        vocab: Dict[str, int] = {}
+        lemmas: Dict[str, str] = {}
+        rows: List[np.ndarray] = []
+        for start in range(0, len(entries), batch_size):
+            batch = entries[start:start + batch_size]
+            for terms in scorer.extract_keyword_terms_batch([load_resume_text(path) for _, path in batch]):
+                ids = []
+                for keyword, lemma in terms.items():
+                    ids.append(vocab.setdefault(keyword, len(vocab)))
+                    lemmas.setdefault(keyword, lemma)
+                rows.append(np.array(ids, dtype=np.int64))
+
+        # Keep the keywords held by the most resumes; rarer ones still score exactly in stage two
+        document_frequency = Counter(skill_id for ids in rows for skill_id in ids.tolist())
+        kept = [skill_id for skill_id, _ in document_frequency.most_common(max_skills)]
+        remap = np.full(len(vocab), -1, dtype=np.int64)
+        remap[kept] = np.arange(len(kept))
+        words = list(vocab)
+        skills = [words[skill_id] for skill_id in kept]
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indices = []
+        for row, ids in enumerate(rows):
+            mapped = remap[ids] if len(ids) else ids
+            mapped = np.unique(mapped[mapped >= 0])
+            indices.append(mapped)
+            indptr[row + 1] = indptr[row] + len(mapped)
+        matrix = sparse.csr_matrix(
+            (np.ones(int(indptr[-1]), dtype=np.float32),
+             np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64), indptr),
+            shape=(len(rows), len(skills))
+        )
+
+        skill_vectors = np.zeros((len(skills), 0), dtype=np.float32)
+        if skills:
+            skill_vectors = np.concatenate([
+                scorer.encode_phrases(skills[i:i + 4096]).astype(np.float32) for i in range(0, len(skills), 4096)
+            ])
+        resume_vectors = np.asarray(matrix @ skill_vectors, dtype=np.float32)
+        norms = np.linalg.norm(resume_vectors, axis=1, keepdims=True)
+        resume_vectors /= np.where(norms > 0, norms, 1)
+
+        postings = matrix.tocsc()
+        np.save(os.path.join(directory, "skill_vectors.npy"), skill_vectors)
+        np.save(os.path.join(directory, "resume_vectors.npy"), resume_vectors)
+        np.save(os.path.join(directory, "skill_indptr.npy"), postings.indptr.astype(np.int64))
+        np.save(os.path.join(directory, "skill_resumes.npy"), postings.indices.astype(np.int32))
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"model": EMBEDDER_MODEL, "resumes": entries, "skills": skills,
+                       "lemmas": [lemmas[skill] for skill in skills]}, f, ensure_ascii=False)
+        return cls(directory)
+
+    def candidates(self, scorer: ATSScorer, jd_text: str, n: int = DEFAULT_CANDIDATES,
+                   threshold: float = DEFAULT_THRESHOLDS["semantic"]) -> List[Tuple[int, float]]:
+        """Stage one: ``(row, approximate score)`` for the ``n`` most promising resumes"""
+        weighted = scorer.jd_keywords(jd_text)
+        if not weighted or not self.resumes:
+            return []
+        keywords = [kw for kw, _ in weighted]
+        weights = np.array([weight for _, weight in weighted], dtype=np.float32)
+        jd_vectors = scorer.encode_phrases(keywords).astype(np.float32)
+
+        matched = np.zeros((len(keywords), len(self.skills)), dtype=bool)
+        if len(self.skills):
+            matched = jd_vectors @ self.skill_vectors.T >= threshold - RECALL_MARGIN
+        for row, (keyword, lemma) in enumerate(zip(keywords, scorer.lemmatize_terms(keywords))):
+            for key in (normalize_term(keyword), normalize_term(lemma)):
+                matched[row, self.exact.get(key, [])] = True
+
+        # Resume r holds keyword k when it has any matched skill: (postings @ matched.T) > 0
+        holds = (self.postings @ sparse.csr_matrix(matched.T.astype(np.float32))) > 0
+        scores = np.asarray(holds.astype(np.float32) @ weights).ravel() / weights.sum()
+        centroid = weights @ jd_vectors
+        centroid /= np.linalg.norm(centroid) or 1
+        if len(self.skills):
+            scores = scores + _TIE_BREAK * (self.resume_vectors @ centroid)
+
+        n = min(n, len(scores))
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def search(self, scorer: ATSScorer, jd_text: str, top: int = 20, candidates: int = DEFAULT_CANDIDATES,
+               mode: str = "semantic", threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Stage two: exact ATS scores for the shortlist, best ``top`` first"""
+        shortlist = self.candidates(scorer, jd_text, candidates,
+                                    threshold if threshold is not None else DEFAULT_THRESHOLDS["semantic"])
+        results = scorer.calculate_ats_scores([
+            {"resume_text": load_resume_text(self.resumes[row][1]), "jd_text": jd_text,
+             "mode": mode, "threshold": threshold}
+            for row, _ in shortlist
+        ])
+        ranked = [
+            {"resume_id": self.resumes[row][0], "path": self.resumes[row][1], "stage1_score": stage1, **result}
+            for (row, stage1), result in zip(shortlist, results)
+        ]
+        ranked.sort(key=lambda entry: entry["score"], reverse=True)
+        return ranked[:top]
+
+
+def evaluate(index: ResumeIndex, scorer: ATSScorer, jd_texts: List[str], ks: List[int],
+             candidate_sizes: List[int], mode: str = "semantic") -> Dict[Tuple[int, int], float]:
+    """Mean recall@k of the two-stage top k against exhaustive exact scoring, per (k, candidates)"""
+    texts = [load_resume_text(path) for _, path in index.resumes]
+    recalls = {(k, c): [] for k in ks for c in candidate_sizes}
+    for jd_text in jd_texts:
+        exhaustive = scorer.calculate_ats_scores([
+            {"resume_text": text, "jd_text": jd_text, "mode": mode} for text in texts
+        ])
+        exact_scores = np.array([result["score"] for result in exhaustive])
+        for c in candidate_sizes:
+            shortlist = [row for row, _ in index.candidates(scorer, jd_text, c)]
+            # Stage two reproduces the exact scores of the shortlisted resumes
+            ranked = sorted(shortlist, key=lambda row: -exact_scores[row])
+            for k in ks:
+                k = min(k, len(texts))
+                # Any resume scoring at least the exhaustive k-th best counts, so ties do not penalize
+                cutoff = np.sort(exact_scores)[::-1][k - 1]
+                hits = sum(exact_scores[row] >= cutoff for row in ranked[:k])
+                recalls[(k, c)].append(hits / k)
+    return {key: float(np.mean(values)) for key, values in recalls.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Two-stage resume retrieval by job description")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="Index a directory of combined resume JSON files")
+    build_cmd.add_argument("resumes")
+    build_cmd.add_argument("--out", required=True, help="Index directory")
+    build_cmd.add_argument("--max-skills", type=int, default=DEFAULT_MAX_SKILLS)
+    search_cmd = sub.add_parser("search", help="Best resumes for a job description")
+    search_cmd.add_argument("jd", help="Job description .txt file")
+    search_cmd.add_argument("--index", required=True)
+    search_cmd.add_argument("--top", type=int, default=20)
+    search_cmd.add_argument("--candidates", type=int, default=DEFAULT_CANDIDATES)
+    search_cmd.add_argument("--mode", choices=SCORING_MODES, default="semantic")
+    eval_cmd = sub.add_parser("evaluate", help="Recall@k against exhaustive scoring")
+    eval_cmd.add_argument("jds", help="Job description .txt file or directory")
+    eval_cmd.add_argument("--index", required=True)
+    eval_cmd.add_argument("--k", default="10,50")
+    eval_cmd.add_argument("--candidates", default="100,300")
+    eval_cmd.add_argument("--mode", choices=SCORING_MODES, default="semantic")
+    args = parser.parse_args(argv)
+
+    scorer = ATSScorer()
+    if args.command == "build":
+        start = time.perf_counter()
+        index = ResumeIndex.build(scorer, read_resumes(args.resumes), args.out, max_skills=args.max_skills)
+        print(f"Indexed {len(index.resumes)} resumes and {len(index.skills)} skills "
+              f"in {time.perf_counter() - start:.1f}s")
+        return 0
+
+    index = ResumeIndex(args.index)
+    if args.command == "search":
+        with open(args.jd, encoding="utf-8") as f:
+            jd_text = f.read()
+        start = time.perf_counter()
+        shortlist = index.candidates(scorer, jd_text, args.candidates)
+        stage1 = time.perf_counter() - start
+        results = index.search(scorer, jd_text, top=args.top, candidates=args.candidates, mode=args.mode)
+        total = time.perf_counter() - start
+        for rank, result in enumerate(results, 1):
+            print(f"{rank:>3}. {result['score']:>5.1f}  {result['resume_id']}")
+        print(f"Stage one: {len(shortlist)} candidates in {stage1 * 1000:.1f}ms; "
+              f"total with exact rescoring {total * 1000:.0f}ms")
+        return 0
+
+    jd_paths = [args.jds] if os.path.isfile(args.jds) else sorted(
+        os.path.join(args.jds, name) for name in os.listdir(args.jds) if name.lower().endswith((".txt", ".md"))
+    )
+    jd_texts = []
+    for path in jd_paths:
+        with open(path, encoding="utf-8") as f:
+            jd_texts.append(f.read())
+    ks = [int(k) for k in args.k.split(",")]
+    candidate_sizes = [int(c) for c in args.candidates.split(",")]
+    recalls = evaluate(index, scorer, jd_texts, ks, candidate_sizes, mode=args.mode)
+    print(f"{'candidates':>10}" + "".join(f"{f'recall@{k}':>12}" for k in ks))
+    for c in candidate_sizes:
+        print(f"{c:>10}" + "".join(f"{recalls[(k, c)]:>12.3f}" for k in ks))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
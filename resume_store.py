@@ -0,0 +1,219 @@
+import copy
+import json
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from ats_core import build_resume_text, resume_items
+from ats_store import content_hash
+
+RESUME_SECTIONS = ("personal_information", "experience", "education", "projects")
+DEFAULT_MAX_HISTORY = 200
+_MISSING = object()
+
+
+def share_structure(old: Any, new: Any) -> Any:
+    """Copy of ``new`` that reuses every part of ``old`` it is equal to.
+
+    Only the dicts and lists on the path to a change are new objects; unchanged
+    items and fields (including items that moved position) are the very objects
+    of ``old``, so a version costs memory in proportion to what changed.
+    """
+    if old == new and type(old) is type(new):
+        return old
+    if isinstance(old, dict) and isinstance(new, dict):
+        return {key: share_structure(old[key], value) if key in old else copy.deepcopy(value)
+                for key, value in new.items()}
+    if isinstance(old, list) and isinstance(new, list):
+        shared = []
+        for i, item in enumerate(new):
+            if i < len(old) and old[i] == item:
+                shared.append(old[i])
+                continue
+            match = next((candidate for candidate in old if candidate == item), _MISSING)
+            if match is not _MISSING:
+                shared.append(match)
+            elif i < len(old):
+                shared.append(share_structure(old[i], item))
+            else:
+                shared.append(copy.deepcopy(item))
+        return shared
+    return copy.deepcopy(new)
+
+
+class ResumeStore:
+    """Single source of truth for a session's resume data, versioned for memoization.
+
+    Every section lives here once. ``set`` bumps the store version (and the
+    section's own version) only when the data actually changed, and derived
+    artifacts such as the flattened text, export JSON and content hash are
+    computed at most once per version.
+
+    Sections handed out by ``get`` are shared with the memoized artifacts and
+    with the edit history, so editors must work on a copy and write it back
+    with ``set``.
+
+    Every change is also an entry in an undo/redo history. Versions are
+    structurally shared (see ``share_structure``): a version holds references
+    to the unchanged sections and items of the one before it, so ``undo`` and
+    ``redo`` are pointer swaps and ``diff`` compares items by identity.
+    """
+
+    def __init__(self, max_history: int = DEFAULT_MAX_HISTORY):
+        self._sections: Dict[str, List[Dict]] = {section: [] for section in RESUME_SECTIONS}
+        self._section_versions: Dict[str, int] = {section: 0 for section in RESUME_SECTIONS}
+        self._derived: Dict[Hashable, Tuple[int, Any]] = {}
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        # (version, sections, section versions); _position is the current entry
+        self.max_history = max_history
+        self._history: List[Tuple[int, Dict[str, List[Dict]], Dict[str, int]]] = [
+            (0, dict(self._sections), dict(self._section_versions))
+        ]
+        self._position = 0
+        self._last_version = 0
+
+    def get(self, section: str) -> List[Dict]:
+        return self._sections[section]
+
+    def set(self, section: str, data: List[Dict]) -> bool:
+        """Replace a section; returns whether anything changed"""
+        return self.update({section: data})
+
+    def update(self, combined: Dict[str, List[Dict]]) -> bool:
+        """Replace several sections as a single version (and a single undo step)"""
+        changed = {}
+        for section, data in combined.items():
+            if section not in self._sections:
+                raise KeyError(f"Unknown resume section: {section}")
+            if data != self._sections[section]:
+                # Copying only what changed also keeps later in-place edits by the
+                # caller out of a published version
+                changed[section] = share_structure(self._sections[section], data)
+        if not changed:
+            return False
+
+        self._last_version += 1
+        self.version = self._last_version
+        for section, data in changed.items():
+            self._sections[section] = data
+            self._section_versions[section] = self.version
+        # A new edit discards the redo branch
+        del self._history[self._position + 1:]
+        self._history.append((self.version, dict(self._sections), dict(self._section_versions)))
+        if len(self._history) > self.max_history:
+            del self._history[:len(self._history) - self.max_history]
+        self._position = len(self._history) - 1
+        return True
+
+    @property
+    def can_undo(self) -> bool:
+        return self._position > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self._position < len(self._history) - 1
+
+    def undo(self) -> bool:
+        """Step back one version; returns whether there was one"""
+        if not self.can_undo:
+            return False
+        self._restore(self._position - 1)
+        return True
+
+    def redo(self) -> bool:
+        if not self.can_redo:
+            return False
+        self._restore(self._position + 1)
+        return True
+
+    def _restore(self, position: int):
+        # A version number always names the same content, so memoized artifacts
+        # of the restored version stay valid
+        self._position = position
+        self.version, sections, section_versions = self._history[position]
+        self._sections = dict(sections)
+        self._section_versions = dict(section_versions)
+
+    def history(self) -> List[Dict[str, Any]]:
+        """Versions kept for undo/redo, oldest first, with the sections each one changed"""
+        entries = []
+        previous_versions = None
+        for position, (version, _, section_versions) in enumerate(self._history):
+            changed = [section for section in RESUME_SECTIONS
+                       if previous_versions is not None and section_versions[section] != previous_versions[section]]
+            entries.append({"version": version, "sections": changed, "current": position == self._position})
+            previous_versions = section_versions
+        return entries
+
+    def diff(self, from_version: int, to_version: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Items added, removed or changed between two versions in the history.
+
+        Unchanged items are shared between versions, so this only compares
+        object identities; ``to_version`` defaults to the current version.
+        """
+        versions = {version: sections for version, sections, _ in self._history}
+        to_version = self.version if to_version is None else to_version
+        for version in (from_version, to_version):
+            if version not in versions:
+                raise KeyError(f"Version {version} is not in the edit history")
+        before_sections, after_sections = versions[from_version], versions[to_version]
+
+        changes = []
+        for section in RESUME_SECTIONS:
+            before, after = before_sections[section], after_sections[section]
+            if before is after:
+                continue
+            before_ids = {id(item) for item in before}
+            after_ids = {id(item) for item in after}
+            removed = {i: item for i, item in enumerate(before) if id(item) not in after_ids}
+            added = {i: item for i, item in enumerate(after) if id(item) not in before_ids}
+            for i in sorted(set(removed) | set(added)):
+                if i in removed and i in added:
+                    change = "changed"
+                else:
+                    change = "removed" if i in removed else "added"
+                changes.append({"section": section, "index": i, "change": change,
+                                "before": removed.get(i), "after": added.get(i)})
+        return changes
+
+    def memoize(self, key: Hashable, compute: Callable[[], Any], section: Optional[str] = None) -> Any:
+        """Value of ``compute`` for the current version of the store (or of one section)"""
+        version = self._section_versions[section] if section else self.version
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        value = compute()
+        self._derived[key] = (version, value)
+        return value
+
+    def combined(self) -> Dict[str, List[Dict]]:
+        return self.memoize("combined", lambda: {section: self._sections[section] for section in RESUME_SECTIONS})
+
+    def text(self) -> str:
+        """Flattened resume text as scored by the ATS analyzer"""
+        return self.memoize("text", lambda: build_resume_text(
+            self._sections["personal_information"],
+            self._sections["experience"],
+            self._sections["education"],
+            self._sections["projects"]
+        ))
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Experience details and projects, as placement targets for missing keywords"""
+        return self.memoize("items", lambda: resume_items(self._sections["experience"], self._sections["projects"]))
+
+    def content_hash(self) -> str:
+        """Same digest ``ATSStore`` keys resumes by"""
+        return self.memoize("content_hash", lambda: content_hash(self.combined()))
+
+    def export_json(self, section: Optional[str] = None) -> str:
+        """Pretty-printed JSON of one section, or of the combined resume"""
+        if section is None:
+            return self.memoize("export", lambda: json.dumps(self.combined(), indent=2, ensure_ascii=False))
+        return self.memoize(
+            ("export", section),
+            lambda: json.dumps(self._sections[section], indent=2, ensure_ascii=False),
+            section=section
+        )
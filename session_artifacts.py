@@ -0,0 +1,276 @@
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from memory_governor import Component
+
+DEFAULT_MAX_BYTES = 256 * 2**20
+DEFAULT_SESSION_QUOTA = 32 * 2**20
+DEFAULT_SESSION_TTL = 3600.0
+# Idle sessions are looked for at most this often, from ``get``/``put`` (and on
+# every memory governor pass, see ``memory_component``)
+EXPIRE_INTERVAL = 60.0
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory footprint via the pickled size"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class _Entry:
+    __slots__ = ("value", "size", "path", "disk_size")
+
+    def __init__(self, value: Any, size: int):
+        self.value = value
+        self.size = size
+        self.path: Optional[str] = None
+        self.disk_size = 0
+
+
+class SessionArtifacts:
+    """Process-wide store for per-session analysis artifacts, bounded in memory.
+
+    Entries are keyed by ``(session_id, key)`` in one ordered dict, so the least
+    recently used artifact of any session is the first to go. When the values
+    held in memory exceed ``max_bytes`` the coldest are spilled to ``spill_dir``
+    as compressed pickles and loaded back on the next ``get``. Each session may
+    hold at most ``session_quota`` bytes in memory and on disk together; beyond
+    that its own least recently used entries are dropped. Sessions untouched for
+    ``session_ttl`` seconds are dropped entirely, and an artifact larger than
+    the quota is never stored. Any limit may be None (off);
+    without a ``spill_dir`` a temporary directory is created on first spill.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 session_quota: Optional[int] = DEFAULT_SESSION_QUOTA,
+                 session_ttl: Optional[float] = DEFAULT_SESSION_TTL, spill_dir: Optional[str] = None,
+                 spill: bool = True):
+        self.max_bytes = max_bytes
+        self.session_quota = session_quota
+        self.session_ttl = session_ttl
+        self.spill = spill
+        self._spill_dir = spill_dir
+        self._own_spill_dir = False
+        self._entries: "OrderedDict[Tuple[str, Hashable], _Entry]" = OrderedDict()
+        self._sessions: Dict[str, List[Any]] = {}  # session -> [entries, memory bytes, disk bytes, last access]
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self._disk_bytes = 0
+        self._last_expiry = time.monotonic()
+        self.last_used = time.monotonic()
+        self.stats = {"spilled": 0, "reloaded": 0, "quota_drops": 0, "expired_sessions": 0}
+
+    def get(self, session_id: str, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((session_id, key))
+            if entry is None:
+                return default
+            self._entries.move_to_end((session_id, key))
+            self._sessions[session_id][3] = now
+            if entry.path is not None and not self._reload(session_id, entry):
+                self._remove(session_id, key)
+                return default
+            value = entry.value
+            self._enforce_budget()
+        self.last_used = now
+        self._maybe_expire(now)
+        return value
+
+    def put(self, session_id: str, key: Hashable, value: Any):
+        size = estimate_size(value)
+        now = time.monotonic()
+        with self._lock:
+            self._remove(session_id, key)
+            if self.session_quota is None or size <= self.session_quota:
+                self._entries[(session_id, key)] = _Entry(value, size)
+                session = self._sessions.setdefault(session_id, [0, 0, 0, now])
+                session[0] += 1
+                session[1] += size
+                session[3] = now
+                self._nbytes += size
+                self._enforce_quota(session_id)
+                self._enforce_budget()
+        self.last_used = now
+        self._maybe_expire(now)
+
+    def _remove(self, session_id: str, key: Hashable) -> int:
+        """Drop one entry and its spill file; returns the in-memory bytes freed"""
+        entry = self._entries.pop((session_id, key), None)
+        if entry is None:
+            return 0
+        session = self._sessions[session_id]
+        session[0] -= 1
+        freed = 0
+        if entry.path is not None:
+            self._delete_spill(entry)
+            session[2] -= entry.disk_size
+            self._disk_bytes -= entry.disk_size
+        else:
+            freed = entry.size
+            session[1] -= entry.size
+            self._nbytes -= entry.size
+        if not session[0]:
+            del self._sessions[session_id]
+        return freed
+
+    def _enforce_quota(self, session_id: str):
+        if self.session_quota is None:
+            return
+        session = self._sessions.get(session_id)
+        while session is not None and session[1] + session[2] > self.session_quota:
+            oldest = next(key for sid, key in self._entries if sid == session_id)
+            self._remove(session_id, oldest)
+            self.stats["quota_drops"] += 1
+            session = self._sessions.get(session_id)
+
+    def _enforce_budget(self):
+        if self.max_bytes is not None and self._nbytes > self.max_bytes:
+            self._release(self._nbytes - self.max_bytes)
+
+    def _release(self, nbytes: Optional[int]) -> int:
+        """Spill (or, if spilling is off or fails, drop) in-memory entries in LRU order"""
+        freed = 0
+        for (session_id, key), entry in list(self._entries.items()):
+            if nbytes is not None and freed >= nbytes:
+                break
+            if entry.path is not None:
+                continue
+            if self.spill and self._write_spill(entry):
+                session = self._sessions[session_id]
+                session[1] -= entry.size
+                session[2] += entry.disk_size
+                self._nbytes -= entry.size
+                self._disk_bytes += entry.disk_size
+                freed += entry.size
+                self.stats["spilled"] += 1
+            else:
+                freed += self._remove(session_id, key)
+        return freed
+
+    def _spill_path(self) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="fitcheckr-artifacts-")
+            self._own_spill_dir = True
+        os.makedirs(self._spill_dir, exist_ok=True)
+        return os.path.join(self._spill_dir, f"{uuid.uuid4().hex}.art")
+
+    def _write_spill(self, entry: _Entry) -> bool:
+        try:
+            data = zlib.compress(pickle.dumps(entry.value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+            path = self._spill_path()
+            with open(path, "wb") as f:
+                f.write(data)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            return False
+        entry.value = None
+        entry.path = path
+        entry.disk_size = len(data)
+        return True
+
+    def _reload(self, session_id: str, entry: _Entry) -> bool:
+        try:
+            with open(entry.path, "rb") as f:
+                value = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            return False
+        self._delete_spill(entry)
+        session = self._sessions[session_id]
+        session[1] += entry.size
+        session[2] -= entry.disk_size
+        self._nbytes += entry.size
+        self._disk_bytes -= entry.disk_size
+        entry.value = value
+        entry.path = None
+        entry.disk_size = 0
+        self.stats["reloaded"] += 1
+        return True
+
+    @staticmethod
+    def _delete_spill(entry: _Entry):
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+    def drop_session(self, session_id: str) -> int:
+        freed = 0
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[0] == session_id]:
+                freed += self._remove(*entry_key)
+        return freed
+
+    def _maybe_expire(self, now: float):
+        if self.session_ttl is not None and now - self._last_expiry >= EXPIRE_INTERVAL:
+            self._last_expiry = now
+            self.expire(now)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop every session idle for longer than ``session_ttl``; returns the sessions dropped"""
+        if self.session_ttl is None:
+            return 0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [sid for sid, session in self._sessions.items() if now - session[3] > self.session_ttl]
+        for session_id in idle:
+            self.drop_session(session_id)
+        self.stats["expired_sessions"] += len(idle)
+        return len(idle)
+
+    def nbytes(self) -> int:
+        """Bytes held in memory (spilled entries excluded)"""
+        return self._nbytes
+
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+    def evict(self, nbytes: Optional[int] = None) -> int:
+        """Free ``nbytes`` of memory (None = all) by spilling least recently used artifacts"""
+        with self._lock:
+            return self._release(nbytes)
+
+    def session_sizes(self) -> Dict[str, int]:
+        with self._lock:
+            return {sid: session[1] + session[2] for sid, session in self._sessions.items()}
+
+    def session_report(self) -> List[Dict[str, Any]]:
+        """Entries, memory and disk bytes and idle time per session, largest first"""
+        now = time.monotonic()
+        with self._lock:
+            rows = [
+                {"session_id": sid, "entries": session[0], "memory_bytes": session[1],
+                 "disk_bytes": session[2], "idle_seconds": now - session[3]}
+                for sid, session in self._sessions.items()
+            ]
+        return sorted(rows, key=lambda row: -(row["memory_bytes"] + row["disk_bytes"]))
+
+    def close(self):
+        """Drop everything and remove a spill directory this store created"""
+        with self._lock:
+            for entry_key in list(self._entries):
+                self._remove(*entry_key)
+            if self._own_spill_dir:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+                self._own_spill_dir = False
+
+    def memory_component(self) -> Component:
+        return Component(
+            name="session analysis artifacts",
+            kind="cache",
+            size=self.nbytes,
+            release=self.evict,
+            last_used=lambda: self.last_used,
+            # Idle sessions also expire while the app gets no traffic
+            housekeeping=self.expire
+        )
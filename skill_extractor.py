@@ -0,0 +1,163 @@
+import hashlib
+import os
+import pickle
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import ahocorasick
+
+DEFAULT_SKILLS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills.txt")
+DEFAULT_CACHE_DIR = os.environ.get(
+    "FITCHECKR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "fitcheckr")
+)
+
+
+def load_skill_dictionary(path: str = DEFAULT_SKILLS_PATH) -> Dict[str, str]:
+    """Map every surface form in a skills file to its lowercased canonical name"""
+    forms = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            # Only whole-line comments: "#" is part of skills like "c#" and "f#"
+            if line.lstrip().startswith("#"):
+                continue
+            names = [name.strip() for name in line.split("|") if name.strip()]
+            if not names:
+                continue
+            canonical = names[0].lower()
+            for name in names:
+                forms.setdefault(name, canonical)
+    return forms
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class SkillExtractor:
+    """Find dictionary skills in text with one Aho-Corasick pass.
+
+    The automaton is built over the lowercased surface forms, so a single scan of
+    the lowercased text reports every occurrence of every form. Each hit is then
+    checked for whole-token boundaries, which is what makes punctuation-heavy
+    skills ("c++", "ci/cd", "node.js", ".net") safe: "c" is rejected inside
+    "c++" and "java" inside "javascript". Forms written with capitals in the
+    dictionary must also match the original text exactly. Overlapping hits keep
+    the leftmost-longest one ("spring boot" over "spring").
+
+    Single-character skills ("C", "R") would hit on almost every word, so they
+    are matched by a boundary-anchored regex instead of the automaton.
+    """
+
+    def __init__(self, forms: Dict[str, str]):
+        self.forms = forms
+        self.automaton = self._build(forms)
+        self._init_single_chars()
+
+    def _init_single_chars(self):
+        self.single_chars = {form: canonical for form, canonical in self.forms.items() if len(form) == 1}
+        alternatives = ''.join(
+            re.escape(form) if form != form.lower() else f"{re.escape(form)}{re.escape(form.upper())}"
+            for form in self.single_chars
+        )
+        self._single_char_re = re.compile(rf"(?<!\w)[{alternatives}](?![\w+#])") if alternatives else None
+
+    @staticmethod
+    def _build(forms: Dict[str, str]):
+        automaton = ahocorasick.Automaton()
+        variants: Dict[str, List[Tuple[str, bool, str]]] = {}
+        for form, canonical in forms.items():
+            if len(form) == 1:
+                continue
+            case_sensitive = form != form.lower()
+            variants.setdefault(form.lower(), []).append((form, case_sensitive, canonical))
+        for key, entries in variants.items():
+            automaton.add_word(key, (len(key), tuple(entries)))
+        automaton.make_automaton()
+        return automaton
+
+    @classmethod
+    def load(cls, skills_path: str = DEFAULT_SKILLS_PATH, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        """Compile the automaton for a skills file, or load it from the on-disk cache.
+
+        Cache files are keyed by a hash of the dictionary contents, so editing the
+        skills file compiles a fresh automaton on next load.
+        """
+        forms = load_skill_dictionary(skills_path)
+        if not cache_dir:
+            return cls(forms)
+
+        digest = hashlib.sha1(repr(sorted(forms.items())).encode("utf-8")).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f"skills-{digest}.automaton")
+        extractor = cls.__new__(cls)
+        extractor.forms = forms
+        extractor._init_single_chars()
+        try:
+            extractor.automaton = ahocorasick.load(cache_path, pickle.loads)
+            return extractor
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            pass
+
+        extractor.automaton = cls._build(forms)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            extractor.automaton.save(tmp_path, pickle.dumps)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+        return extractor
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """``(start, end, canonical)`` for each skill occurrence, leftmost-longest, in text order"""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters change length when lowercased; offsets must line up
+            text = lowered
+        hits = []
+        for end, (length, entries) in self.automaton.iter(lowered):
+            start = end - length + 1
+            if start > 0 and _is_word_char(lowered[start - 1]) and _is_word_char(lowered[start]):
+                continue
+            after = lowered[end + 1] if end + 1 < len(lowered) else ""
+            if after and (_is_word_char(after) and _is_word_char(lowered[end]) or after in "+#"):
+                continue
+            surface = text[start:end + 1]
+            for form, case_sensitive, canonical in entries:
+                if not case_sensitive or surface == form:
+                    hits.append((start, end + 1, canonical))
+                    break
+        if self._single_char_re is not None:
+            for match in self._single_char_re.finditer(text):
+                canonical = self.single_chars.get(match.group()) or self.single_chars[match.group().lower()]
+                hits.append((match.start(), match.end(), canonical))
+
+        hits.sort(key=lambda hit: (hit[0], hit[0] - hit[1]))
+        kept = []
+        covered_until = -1
+        for start, end, canonical in hits:
+            if start >= covered_until:
+                kept.append((start, end, canonical))
+                covered_until = end
+        return kept
+
+    def extract(self, text: str) -> Dict[str, int]:
+        """Canonical skill name -> number of occurrences"""
+        counts: Dict[str, int] = {}
+        for _, _, canonical in self.find(text):
+            counts[canonical] = counts.get(canonical, 0) + 1
+        return counts
+
+
+_default_extractor = None
+_default_lock = threading.Lock()
+
+
+def get_skill_extractor() -> SkillExtractor:
+    """Process-wide extractor for the bundled skills file"""
+    global _default_extractor
+    if _default_extractor is None:
+        with _default_lock:
+            if _default_extractor is None:
+                _default_extractor = SkillExtractor.load()
+    return _default_extractor
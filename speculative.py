@@ -0,0 +1,100 @@
+"""Background pre-computation of work a session is likely to ask for next.
+
+The ATS page submits the JD-side analysis as soon as the pasted job description
+settles and the resume-side analysis when the page opens, so "Analyze ATS Score"
+mostly finds warm results. Every task sits in a per-session slot together with
+the input key it was computed from: submitting a different key for the same slot
+supersedes the old task, and a result is only handed out for its own key.
+Results are never waited for: a task that has not finished when its result is
+asked for is cancelled (or left to finish unused) and the caller computes inline,
+so no session queues behind another session's speculation.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Hashable, Optional, Tuple
+
+# Slots kept across all sessions; the least recently submitted are forgotten first
+MAX_SLOTS = 256
+
+
+def _failed(future: Future) -> bool:
+    return future.cancelled() or (future.done() and future.exception() is not None)
+
+
+class SpeculativeTasks:
+    """A small thread pool running at most one speculative task per ``(session, slot)``.
+
+    Every task runs inside ``activity()``, e.g. ``ATSScorer.activity`` so the
+    memory governor does not unload models a task is using.
+    """
+
+    def __init__(self, max_workers: int = 1, max_slots: int = MAX_SLOTS,
+                 activity: Callable[[], ContextManager] = nullcontext):
+        self.activity = activity
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative")
+        self._slots: "OrderedDict[Tuple[str, str], Tuple[Hashable, Future]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_slots = max_slots
+        self.stats: Dict[str, int] = {"submitted": 0, "superseded": 0, "hits": 0, "misses": 0}
+
+    def submit(self, session_id: str, slot: str, key: Hashable, fn: Callable, *args) -> Future:
+        """Run ``fn(*args)`` for ``key`` unless the slot already holds (or ran) that key.
+
+        A superseded task is cancelled if it has not started; a running one
+        finishes, but its result is never returned.
+        """
+        with self._lock:
+            entry = self._slots.get((session_id, slot))
+            if entry is not None:
+                if entry[0] == key and not _failed(entry[1]):
+                    self._slots.move_to_end((session_id, slot))
+                    return entry[1]
+                entry[1].cancel()
+                self.stats["superseded"] += 1
+            future = self._executor.submit(self._run, fn, args)
+            self._slots[(session_id, slot)] = (key, future)
+            self._slots.move_to_end((session_id, slot))
+            self.stats["submitted"] += 1
+            while len(self._slots) > self.max_slots:
+                self._slots.popitem(last=False)[1][1].cancel()
+        return future
+
+    def _run(self, fn: Callable, args: tuple) -> Any:
+        with self.activity():
+            return fn(*args)
+
+    def result(self, session_id: str, slot: str, key: Hashable) -> Optional[Any]:
+        """The slot's result if it is finished and was computed from ``key``, else None.
+
+        Never blocks: an unfinished task is cancelled if still queued. Failed
+        tasks also give None; the caller's own computation then surfaces the error.
+        """
+        with self._lock:
+            entry = self._slots.get((session_id, slot))
+        if entry is None or entry[0] != key or not entry[1].done():
+            if entry is not None:
+                entry[1].cancel()
+            self.stats["misses"] += 1
+            return None
+        if _failed(entry[1]):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return entry[1].result()
+
+    def cancel(self, session_id: str, slot: str):
+        """Cancel the slot's task if it has not started yet"""
+        with self._lock:
+            entry = self._slots.get((session_id, slot))
+        if entry is not None:
+            entry[1].cancel()
+
+    def drop_session(self, session_id: str):
+        with self._lock:
+            for slot_key in [k for k in self._slots if k[0] == session_id]:
+                self._slots.pop(slot_key)[1].cancel()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from resume_store import ResumeStore
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Fitcheckr.py")
+
+# As uploaded: missing editor fields (no team, no school_location) and extra ones
+UPLOADED = {
+    "personal_information": [{"name": "Ada", "github": "ada"}],
+    "experience": [{"company": "Acme", "role": "Engineer", "stack": ["python"],
+                    "details": [{"title": "Pipelines", "description": "Built them", "impact": "2x"}]}],
+    "education": [{"school": "MIT", "gpa": "4.0"}],
+    "projects": [{"title": "Fitcheckr", "url": "https://example.com"}],
+}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("FITCHECKR_DB", str(tmp_path / "ats.db"))
+    monkeypatch.setenv("FITCHECKR_DEMAND_DB", str(tmp_path / "demand.db"))
+    store = ResumeStore()
+    store.update(UPLOADED)
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state["resume_store"] = store
+    at.run()
+    return at, store
+
+
+def open_page(at, page):
+    at.sidebar.selectbox[0].select(page).run()
+    assert not at.exception
+
+
+def test_rendering_editors_creates_no_version(app):
+    at, store = app
+    for page in ("Personal Information", "Experience", "Education", "Projects"):
+        open_page(at, page)
+    assert len(store.history()) == 2
+    assert store.combined() == UPLOADED
+
+
+def test_undo_survives_editor_render(app):
+    at, store = app
+    open_page(at, "Experience")
+    at.text_input(key="team_0").input("Platform").run()
+    assert store.get("experience")[0]["team"] == "Platform"
+    assert store.get("experience")[0]["stack"] == ["python"]
+
+    at.sidebar.button(key="undo_edit").click().run()
+    assert store.get("experience") == UPLOADED["experience"]
+    assert store.can_redo
+
+    at.sidebar.button(key="redo_edit").click().run()
+    assert store.get("experience")[0]["team"] == "Platform"
+    assert not store.can_redo
+
+
+def test_reuploading_same_file_reapplies_it(app):
+    at, store = app
+    data = json.dumps({**UPLOADED, "experience": [{"company": "Initech"}]}).encode("utf-8")
+    uploader = at.file_uploader(key="upload_combined")
+    uploader.set_value(("resume.json", data, "application/json")).run()
+    assert store.get("experience") == [{"company": "Initech"}]
+    versions = len(store.history())
+
+    # Kept across reruns, the same file is not applied again over later edits
+    store.set("experience", [{"company": "Edited"}])
+    at.run()
+    assert store.get("experience") == [{"company": "Edited"}]
+    assert len(store.history()) == versions + 1
+
+    at.file_uploader(key="upload_combined").clear().run()
+    at.file_uploader(key="upload_combined").set_value(("resume.json", data, "application/json")).run()
+    assert store.get("experience") == [{"company": "Initech"}]
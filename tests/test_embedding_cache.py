@@ -0,0 +1,75 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from embedding_cache import SharedEmbeddingCache, phrase_key
+
+
+@pytest.fixture
+def cache():
+    cache = SharedEmbeddingCache(capacity=8, dim=4)
+    yield cache
+    cache.close()
+
+
+def vectors(n, start=0.0):
+    return np.arange(start, start + n * 4, dtype=np.float32).reshape(n, 4)
+
+
+def test_hits_and_misses(cache):
+    cache.put_many(["python", "sql"], vectors(2))
+    found = cache.get_many(["python", "kafka", "sql"])
+    assert sorted(found) == ["python", "sql"]
+    np.testing.assert_array_equal(found["python"], vectors(2)[0])
+    np.testing.assert_array_equal(found["sql"], vectors(2)[1])
+    assert cache.get_many(["kafka"]) == {}
+    assert len(cache) == 2
+
+
+def test_hit_is_a_copy(cache):
+    cache.put_many(["python"], vectors(1))
+    cache.get_many(["python"])["python"][:] = -1
+    np.testing.assert_array_equal(cache.get_many(["python"])["python"], vectors(1)[0])
+
+
+def test_put_same_phrase_replaces_in_place(cache):
+    cache.put_many(["python"], vectors(1))
+    cache.put_many(["python"], vectors(1, start=100.0))
+    assert len(cache) == 1
+    np.testing.assert_array_equal(cache.get_many(["python"])["python"], vectors(1, start=100.0)[0])
+
+
+def test_full_probe_overwrites_home_slot(cache):
+    phrases = [f"skill {i}" for i in range(cache.capacity)]
+    cache.put_many(phrases, vectors(len(phrases)))
+    assert len(cache) == cache.capacity
+
+    # Every slot is taken, so the newcomer evicts whoever sits in its home slot
+    newcomer = "one more skill"
+    home = phrase_key(newcomer) % cache.capacity
+    evicted = next(phrase for phrase in phrases if np.uint64(phrase_key(phrase)) == cache._keys[home])
+    cache.put_many([newcomer], vectors(1, start=500.0))
+
+    assert len(cache) == cache.capacity
+    found = cache.get_many(phrases + [newcomer])
+    assert evicted not in found
+    assert len(found) == cache.capacity
+    np.testing.assert_array_equal(found[newcomer], vectors(1, start=500.0)[0])
+    for i, phrase in enumerate(phrases):
+        if phrase != evicted:
+            np.testing.assert_array_equal(found[phrase], vectors(len(phrases))[i])
+
+
+def _put_in_child(cache):
+    cache.put_many(["written by child"], vectors(1, start=7.0))
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_forked_worker_writes_are_visible(cache):
+    process = multiprocessing.get_context("fork").Process(target=_put_in_child, args=(cache,))
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+    np.testing.assert_array_equal(cache.get_many(["written by child"])["written by child"],
+                                  vectors(1, start=7.0)[0])
@@ -0,0 +1,58 @@
+from jd_profile import JDProfile, ProfileLibrary, compile_jd_profile
+
+JD_TEXT = "Data Engineer\nBuild Python and Spark pipelines on AWS."
+
+
+class FakeScorer:
+    """Stands in for ATSScorer: keywords differ by source, no models needed"""
+
+    def __init__(self, keyword_source: str):
+        self.keyword_source = keyword_source
+        self.compiled = 0
+
+    def jd_keywords(self, jd_text):
+        self.compiled += 1
+        if self.keyword_source == "spacy":
+            return [("pipelines", 0.8), ("spark", 0.6)]
+        return [("python", 1.0), ("aws", 0.9)]
+
+    def lemmatize_terms(self, terms):
+        return [term.rstrip("s") for term in terms]
+
+
+def test_header_round_trips_keyword_source(tmp_path):
+    profile = compile_jd_profile(FakeScorer("skills"), JD_TEXT, embed=False)
+    path = str(tmp_path / "profile.jdp")
+    profile.save(path)
+
+    loaded = JDProfile.load(path)
+    assert loaded.keyword_source == "skills"
+    assert loaded.keywords == ["python", "aws"]
+
+
+def test_library_does_not_reuse_profile_across_sources(tmp_path):
+    library = ProfileLibrary(str(tmp_path))
+    spacy_scorer = FakeScorer("spacy")
+    compiled = library.get_or_compile(spacy_scorer, JD_TEXT, embed=False)
+    assert compiled.keyword_source == "spacy"
+    assert library.get(compiled.jd_hash, "skills") is None
+
+    skills_scorer = FakeScorer("skills")
+    profile = library.get_or_compile(skills_scorer, JD_TEXT, embed=False)
+    assert skills_scorer.compiled == 1
+    assert profile.keyword_source == "skills"
+    assert profile.keywords == ["python", "aws"]
+
+    # Both profiles are kept and each source loads its own
+    assert library.get(compiled.jd_hash, "spacy").keywords == ["pipelines", "spark"]
+    assert library.get(compiled.jd_hash, "skills").keywords == ["python", "aws"]
+    library.get_or_compile(skills_scorer, JD_TEXT, embed=False)
+    assert skills_scorer.compiled == 1
+
+
+def test_mismatched_header_is_not_served(tmp_path):
+    library = ProfileLibrary(str(tmp_path))
+    profile = compile_jd_profile(FakeScorer("both"), JD_TEXT, embed=False)
+    # A file saved under the spaCy name by hand still carries its real source
+    profile.save(library.path_for(profile.jd_hash, "spacy"))
+    assert library.get(profile.jd_hash, "spacy") is None
@@ -0,0 +1,66 @@
+from resume_store import ResumeStore
+
+ACME = {"company": "Acme", "title": "Engineer"}
+GLOBEX = {"company": "Globex", "title": "Lead"}
+PERSON = {"name": "Ada"}
+
+
+def test_undo_redo_across_set_and_update():
+    store = ResumeStore()
+    assert store.set("experience", [ACME])
+    assert store.update({"experience": [ACME, GLOBEX], "personal_information": [PERSON]})
+    assert [entry["sections"] for entry in store.history()] == [
+        [], ["experience"], ["personal_information", "experience"]
+    ]
+
+    # The update is one step: both sections go back together
+    assert store.undo()
+    assert store.get("experience") == [ACME]
+    assert store.get("personal_information") == []
+    assert store.undo()
+    assert store.get("experience") == []
+    assert not store.can_undo and not store.undo()
+
+    assert store.redo() and store.redo()
+    assert store.get("experience") == [ACME, GLOBEX]
+    assert store.get("personal_information") == [PERSON]
+    assert not store.can_redo and not store.redo()
+
+
+def test_unchanged_set_is_not_a_version():
+    store = ResumeStore()
+    store.set("experience", [ACME])
+    version = store.version
+    assert not store.set("experience", [dict(ACME)])
+    assert not store.update({"experience": [ACME], "projects": []})
+    assert store.version == version
+    assert len(store.history()) == 2
+
+
+def test_new_edit_cuts_redo_branch():
+    store = ResumeStore()
+    store.set("experience", [ACME])
+    store.set("experience", [ACME, GLOBEX])
+    store.undo()
+    assert store.can_redo
+
+    store.set("education", [{"school": "MIT"}])
+    assert not store.can_redo
+    assert not store.redo()
+    assert store.get("experience") == [ACME]
+    assert [entry["sections"] for entry in store.history()] == [[], ["experience"], ["education"]]
+    assert store.history()[-1]["current"]
+
+
+def test_undo_and_redo_update_derived_artifacts():
+    store = ResumeStore()
+    store.set("experience", [ACME])
+    first_hash = store.content_hash()
+    store.set("experience", [GLOBEX])
+    second_hash = store.content_hash()
+    assert second_hash != first_hash
+
+    store.undo()
+    assert store.content_hash() == first_hash
+    store.redo()
+    assert store.content_hash() == second_hash